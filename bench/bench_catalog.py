@@ -0,0 +1,193 @@
+"""
+Catalog Benchmark
+Reruns the keyword, compare, statistics and basket speed claims on a generate_catalog catalog.
+
+Every section is seeded from ``generate_catalog`` (``--seed``), so runs
+are reproducible and comparable between machines:
+
+- keywords: ``--keywords`` product names (10k by default) as base-price
+  keywords, looked up in ``--lookups`` product titles (1M) with the
+  KeywordMatcher, uncached and with its cache, against the linear
+  substring scan it replaced on the first ``--scan-lookups`` titles
+- compare: dict ``compare`` vs ``compare_matrix`` on ``--products``
+  products x ``--stores`` stores, with and without the opt-in dispersion
+  statistics, against the pre-statistics reference in bench_compare.py
+- basket: ``BasketOptimizer`` for 10, 200 and 1000 items at max_stores
+  1..5 and 8 over the same stores (exact and heuristic search)
+
+Runs are interleaved and the best of ``--repeat`` is kept. Each section
+ends with the claim it checks and whether this run met it.
+
+Usage:
+    python bench/bench_catalog.py [--seed 0] [--keywords 10000] [--lookups 1000000]
+                                  [--products 200000] [--stores 20] [--repeat 3]
+                                  [--only keywords compare basket]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT / "src"), str(ROOT / "tests"), str(ROOT / "bench")]
+
+from basket_optimizer import BasketOptimizer  # noqa: E402
+from bench_compare import compare_reference  # noqa: E402
+from comparison_engine import ComparisonEngine  # noqa: E402
+from keyword_matcher import KeywordMatcher  # noqa: E402
+from price_snapshot import PriceSnapshot  # noqa: E402
+from synthetic_catalog import generate_catalog  # noqa: E402
+
+
+BASKET_ITEMS = [10, 200, 1000]
+BASKET_STORES = [1, 2, 3, 4, 5, 8]
+
+
+def linear_scan(table: dict, name: str):
+    """Base-price lookup as PriceScraper did it before KeywordMatcher."""
+    for key, price in table.items():
+        if key in name.lower():
+            return price
+    return None
+
+
+def best_of(runs: dict, repeat: int) -> dict:
+    """Run each callable ``repeat`` times, interleaved; returns the best seconds by label."""
+    best = {label: float('inf') for label in runs}
+    for _ in range(repeat):
+        for label, run in runs.items():
+            start = time.perf_counter()
+            run()
+            best[label] = min(best[label], time.perf_counter() - start)
+    return best
+
+
+def verdict(met: bool) -> str:
+    """Claim outcome for the summary line."""
+    return 'met' if met else 'NOT MET'
+
+
+def keyword_titles(seed: int, n_keywords: int, n_lookups: int) -> tuple:
+    """Keyword table from a catalog's products and titles drawn from it, ~10% unknown."""
+    catalog = generate_catalog(n_keywords + n_keywords // 9, n_stores=5, seed=seed)
+    best = np.nanmin(catalog.prices, axis=1)
+    table = {
+        name.lower(): round(float(price), 2)
+        for name, price in zip(catalog.products[:n_keywords], best.tolist())
+    }
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, len(catalog.products), n_lookups).tolist()
+    stores = rng.integers(0, len(catalog.stores), n_lookups).tolist()
+    titles = [
+        f"{catalog.stores[store]} {catalog.products[row]} (refurbished)"
+        for row, store in zip(rows, stores)
+    ]
+    return table, titles
+
+
+def bench_keywords(args) -> None:
+    table, titles = keyword_titles(args.seed, args.keywords, args.lookups)
+    scanned = titles[:args.scan_lookups]
+    
+    start = time.perf_counter()
+    matcher = KeywordMatcher(table)
+    build = time.perf_counter() - start
+    uncached = KeywordMatcher(table, cache_size=0)
+    expected = [linear_scan(table, title) for title in scanned]
+    if [uncached.match(title) for title in scanned] != expected:
+        raise SystemExit("keywords: KeywordMatcher differs from the linear scan")
+    
+    best = best_of({
+        'linear scan': lambda: [linear_scan(table, title) for title in scanned],
+        'matcher, uncached': lambda: [uncached.match(title) for title in titles],
+        'matcher, cached': lambda: [matcher.match(title) for title in titles],
+    }, args.repeat)
+    counts = {'linear scan': len(scanned)}
+    
+    print(f"\nkeywords: {len(table)} keywords, {len(titles)} lookups "
+          f"({len(set(titles))} distinct), automaton built in {build:.2f}s")
+    print(f"{'path':>22} {'lookups':>8} {'time':>7} {'us/lookup':>10} {'speedup':>8}")
+    per_lookup = {label: best[label] / counts.get(label, len(titles)) for label in best}
+    for label, elapsed in best.items():
+        print(f"{label:>22} {counts.get(label, len(titles)):8d} {elapsed:6.2f}s "
+              f"{per_lookup[label] * 1e6:10.2f} {per_lookup['linear scan'] / per_lookup[label]:7.0f}x")
+    speedup = per_lookup['linear scan'] / per_lookup['matcher, uncached']
+    print(f"claim: the uncached matcher is >= 10x faster per lookup than the keyword scan: "
+          f"{speedup:.0f}x, {verdict(speedup >= 10)}")
+
+
+def bench_compare(args) -> None:
+    catalog = generate_catalog(args.products, args.stores, seed=args.seed)
+    prices = catalog.to_price_dict()
+    engine = ComparisonEngine()
+    
+    def matrix():
+        results = engine.compare_matrix(catalog.products, catalog.stores, catalog.prices)
+        return results.median_price
+    
+    best = best_of({
+        'reference (no stats)': lambda: compare_reference(prices),
+        'compare': lambda: engine.compare(prices),
+        'compare, dispersion': lambda: engine.compare(prices, dispersion=True),
+        'compare_matrix': matrix,
+    }, args.repeat)
+    
+    print(f"\ncompare: {len(prices)} products x {args.stores} stores")
+    reference = best['reference (no stats)']
+    print(f"{'path':>22} {'time':>7} {'us/product':>11} {'vs reference':>13}")
+    for label, elapsed in best.items():
+        print(f"{label:>22} {elapsed:6.2f}s {elapsed / len(prices) * 1e6:11.2f} {elapsed / reference:12.2f}x")
+    speedup = best['compare, dispersion'] / best['compare_matrix']
+    print(f"claim: compare_matrix is >= 20x faster than dict compare with the same "
+          f"statistics: {speedup:.0f}x, {verdict(speedup >= 20)}")
+    overhead = best['compare'] / reference
+    print(f"claim: dict compare without dispersion is within 15% of the pre-statistics "
+          f"reference: {overhead:.2f}x, {verdict(overhead <= 1.15)}")
+
+
+def bench_basket(args) -> None:
+    catalog = generate_catalog(max(BASKET_ITEMS), args.stores, seed=args.seed)
+    optimizer = BasketOptimizer(PriceSnapshot(catalog.products, catalog.stores, catalog.prices))
+    
+    print(f"\nbasket: {args.stores} stores, best of {args.repeat}, ms (h: heuristic search)")
+    print(f"{'items':>6}" + ''.join(f"{f'N={n}':>9}" for n in BASKET_STORES))
+    worst = {}
+    for n_items in BASKET_ITEMS:
+        items = catalog.products[:n_items]
+        row = f"{n_items:6d}"
+        for max_stores in BASKET_STORES:
+            method = optimizer.optimize(items, max_stores)['method']
+            elapsed = best_of({'optimize': lambda: optimizer.optimize(items, max_stores)},
+                              args.repeat)['optimize']
+            worst[n_items] = max(worst.get(n_items, 0), elapsed)
+            row += f"{elapsed * 1000:8.1f}{'h' if method == 'heuristic' else ' '}"
+        print(row)
+    print(f"claim: a 200-item basket over {args.stores} stores takes under 100 ms at every N: "
+          f"{worst[200] * 1000:.1f} ms worst, {verdict(worst[200] < 0.1)}")
+
+
+SECTIONS = {'keywords': bench_keywords, 'compare': bench_compare, 'basket': bench_basket}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--keywords', type=int, default=10_000)
+    parser.add_argument('--lookups', type=int, default=1_000_000)
+    parser.add_argument('--scan-lookups', type=int, default=2_000)
+    parser.add_argument('--products', type=int, default=200_000)
+    parser.add_argument('--stores', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', choices=list(SECTIONS), nargs='+', default=list(SECTIONS))
+    args = parser.parse_args()
+    
+    print(f"seed {args.seed}")
+    for name in args.only:
+        SECTIONS[name](args)
+
+
+if __name__ == '__main__':
+    main()
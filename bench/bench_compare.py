@@ -0,0 +1,90 @@
+"""
+Compare Benchmark
+Cost of the dict comparison path, with and without the dispersion statistics.
+
+Compares a ``generate_catalog`` catalog in ``{product: {store: price}}``
+form (200k products x 5 stores by default) with ``compare(prices)``,
+``compare(prices, dispersion=True)`` (adds median, std dev and
+dispersion) and, as the reference, the comparison as it was before those
+statistics existed. The vectorized ``compare_matrix`` on the same prices
+is shown for scale. Runs are interleaved and the best of ``--repeat`` is
+kept, since a single run on a busy machine varies by 20% or more.
+
+Usage:
+    python bench/bench_compare.py [--products 200000] [--stores 5] [--repeat 5]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT / "src"), str(ROOT / "tests")]
+
+from comparison_engine import ComparisonEngine  # noqa: E402
+from synthetic_catalog import generate_catalog  # noqa: E402
+
+
+def compare_reference(prices: dict) -> dict:
+    """ComparisonEngine.compare for dicts before median/std dev/dispersion were added."""
+    results = {}
+    for product_name, store_prices in prices.items():
+        if not store_prices:
+            continue
+        best_store = min(store_prices, key=store_prices.get)
+        best_price = store_prices[best_store]
+        prices_list = list(store_prices.values())
+        average_price = sum(prices_list) / len(prices_list)
+        max_price = max(prices_list)
+        price_range = max_price - best_price
+        savings_percentage = (price_range / max_price * 100) if max_price > 0 else 0
+        results[product_name] = {
+            'best_deal': {'store': best_store, 'price': best_price},
+            'all_prices': store_prices,
+            'statistics': {
+                'average_price': round(average_price, 2),
+                'max_price': max_price,
+                'min_price': best_price,
+                'price_range': round(price_range, 2),
+                'savings_percentage': round(savings_percentage, 2)
+            }
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--products', type=int, default=200_000)
+    parser.add_argument('--stores', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    
+    catalog = generate_catalog(args.products, args.stores, seed=0)
+    prices = catalog.to_price_dict()
+    engine = ComparisonEngine()
+    runs = {
+        'reference (no stats)': lambda: compare_reference(prices),
+        'compare': lambda: engine.compare(prices),
+        'compare, dispersion': lambda: engine.compare(prices, dispersion=True),
+        'compare_matrix': lambda: engine.compare_matrix(
+            catalog.products, catalog.stores, catalog.prices
+        ).median_price,
+    }
+    
+    best = {label: float('inf') for label in runs}
+    for _ in range(args.repeat):
+        for label, run in runs.items():
+            start = time.perf_counter()
+            run()
+            best[label] = min(best[label], time.perf_counter() - start)
+    
+    print(f"{len(prices)} products x {args.stores} stores, best of {args.repeat}")
+    reference = best['reference (no stats)']
+    print(f"{'path':>22} {'time':>7} {'us/product':>11} {'vs reference':>13}")
+    for label, elapsed in best.items():
+        print(f"{label:>22} {elapsed:6.2f}s {elapsed / len(prices) * 1e6:11.2f} {elapsed / reference:12.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Parallel Compare Benchmark
+Serial compare_matrix vs compare_parallel by worker count.
+
+Generates a reproducible catalog with ``generate_catalog`` and compares
+it serially (``ComparisonEngine.compare_matrix``) and with
+``compare_parallel`` for every worker count from 1 to ``--workers``
+(default: the CPU count), taking the best of ``--repeat`` runs. Parallel
+results are checked against the serial ones before their time is shown.
+
+Usage:
+    python bench/bench_parallel_compare.py [--products 1000000] [--stores 20]
+                                           [--workers N] [--repeat 3] [--seed 0]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT / "src"), str(ROOT / "tests")]
+
+from comparison_engine import ComparisonEngine  # noqa: E402
+from parallel_compare import compare_parallel  # noqa: E402
+from synthetic_catalog import generate_catalog  # noqa: E402
+
+
+# Arrays that must match exactly between the serial and parallel results
+CHECKED = ('min_price', 'max_price', 'best_store_index', 'count', 'average_price',
+           'std_dev', 'median_price')
+
+
+def best_of(repeat: int, func) -> tuple:
+    """Run ``func`` ``repeat`` times; returns (last result, fastest seconds)."""
+    fastest = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        fastest = min(fastest, time.perf_counter() - start)
+    return result, fastest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--products', type=int, default=1_000_000)
+    parser.add_argument('--stores', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    catalog = generate_catalog(args.products, args.stores, seed=args.seed)
+    engine = ComparisonEngine()
+    print(f"{args.products} products x {args.stores} stores, {os.cpu_count()} CPUs, "
+          f"best of {args.repeat}")
+    
+    def serial_run():
+        results = engine.compare_matrix(catalog.products, catalog.stores, catalog.prices)
+        # Medians are lazy in the serial path; the workers always compute them
+        assert results.median_price is not None
+        return results
+    
+    serial, serial_time = best_of(args.repeat, serial_run)
+    print(f"{'mode':>10} {'time':>7} {'speedup':>8}")
+    print(f"{'serial':>10} {serial_time:6.2f}s {1:7.2f}x")
+    for workers in range(1, args.workers + 1):
+        parallel, elapsed = best_of(args.repeat, lambda: compare_parallel(
+            catalog.products, catalog.stores, catalog.prices, workers
+        ))
+        for name in CHECKED:
+            if not np.array_equal(getattr(serial, name), getattr(parallel, name), equal_nan=True):
+                raise SystemExit(f"{workers} workers: {name} differs from the serial result")
+        print(f"{f'{workers} procs':>10} {elapsed:6.2f}s {serial_time / elapsed:7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""
+Parse Benchmark
+Page parse throughput in the fetching process vs ScrapePipeline's parser pool.
+
+Builds ``--pages`` synthetic product pages of ``--size`` bytes (500 KB by
+default) with the price near the end, and parses them with two adapters:
+the shipped RegexStoreAdapter, and an HTML adapter that decodes the page
+and walks it with html.parser, standing in for CPU-heavy extraction.
+Each is timed inline (one process, as a plain PriceScraper and
+ScrapePipeline's default do) and on a process pool with each
+``--workers`` count, the way ScrapePipeline(parse_workers=N) parses:
+adapters installed once per process, pages written into a shared memory
+block and each task given (store, block, offset, length). The time
+includes writing the pages into shared memory. The 'pickled' row parses
+the same pages sent through the pool's pipe instead, as the pipeline
+used to, and 'shared only' hands the pages over without parsing them,
+which is the floor the pool can't go below.
+
+Usage:
+    python bench/bench_parse.py [--pages 40] [--size 500000] [--workers 1 2 4]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+from typing import Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT / "src"), str(ROOT / "tests")]
+
+import price_scraper  # noqa: E402
+from price_scraper import (RegexStoreAdapter, StoreAdapter, _init_parser,  # noqa: E402
+                           _parse_shared, _share_pages)
+
+
+class _PriceParser(HTMLParser):
+    """Collects the text of the element with class 'price'."""
+    
+    def __init__(self):
+        super().__init__()
+        self.in_price = False
+        self.price: Optional[str] = None
+    
+    def handle_starttag(self, tag, attrs):
+        self.in_price = ('class', 'price') in attrs
+    
+    def handle_data(self, data):
+        if self.in_price and self.price is None:
+            self.price = data.strip().lstrip('$')
+
+
+class HTMLStoreAdapter(StoreAdapter):
+    """Adapter that parses the page as HTML, like a scraper built on an HTML parser."""
+    
+    def build_url(self, product_name: str) -> str:
+        """Pages are generated locally, so there is nothing to fetch."""
+        return ''
+    
+    def parse_price(self, page: bytes) -> Optional[float]:
+        """Decode the page and read the price element's text."""
+        parser = _PriceParser()
+        parser.feed(page.decode('utf-8'))
+        return float(parser.price) if parser.price else None
+
+
+ADAPTERS = {
+    'regex': RegexStoreAdapter(''),
+    'html': HTMLStoreAdapter(),
+}
+
+
+def make_page(index: int, size: int) -> bytes:
+    """A product page of about ``size`` bytes with its price near the end."""
+    row = f'<li class="item"><a href="/p/{index}">Related product {index}</a> <span>4.5 stars</span></li>\n'
+    body = row * max(0, (size - 200) // len(row))
+    price = 10 + index % 900 + 0.99
+    return (f'<html><body><ul>\n{body}</ul>'
+            f'<div class="price">${price:.2f}</div>'
+            f'<script>{{"price": "{price:.2f}"}}</script></body></html>').encode('utf-8')
+
+
+def _page_size(store: str, page: bytes) -> int:
+    """Pool task that only receives the page (starts the workers)."""
+    return len(page)
+
+
+def _parse_pickled(store: str, page: bytes) -> Optional[float]:
+    """Pool task parsing a page pickled through the pipe."""
+    return price_scraper._parser_adapters[store].parse_price(page)
+
+
+def _shared_size(store: str, block_name: str, offset: int, length: int) -> int:
+    """Pool task that only attaches to the shared page."""
+    block = shared_memory.SharedMemory(name=block_name)
+    try:
+        return len(block.buf[offset:offset + length])
+    finally:
+        block.close()
+
+
+def pool_map(pool, task, name: str, pages) -> list:
+    """Write ``pages`` into shared memory and run ``task`` on each span."""
+    block, spans = _share_pages(pages)
+    try:
+        return list(pool.map(task, [name] * len(pages), [block.name] * len(pages),
+                             *zip(*spans)))
+    finally:
+        block.close()
+        block.unlink()
+
+
+def timed(func) -> tuple:
+    """Run ``func``; returns (result, seconds)."""
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--pages', type=int, default=40)
+    parser.add_argument('--size', type=int, default=500_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    args = parser.parse_args()
+    
+    pages = [make_page(i, args.size) for i in range(args.pages)]
+    # Pools are started before any block exists; have them share one tracker
+    resource_tracker.ensure_running()
+    megabytes = sum(len(page) for page in pages) / 1e6
+    print(f"{args.pages} pages of {len(pages[0]) / 1000:.0f} KB, {os.cpu_count()} CPUs")
+    print(f"{'adapter':>8} {'mode':>12} {'time':>7} {'pages/s':>8} {'MB/s':>7} {'startup':>8}")
+    
+    for name, adapter in ADAPTERS.items():
+        expected, elapsed = timed(lambda: [adapter.parse_price(page) for page in pages])
+        print(f"{name:>8} {'inline':>12} {elapsed:6.2f}s {args.pages / elapsed:8.1f} "
+              f"{megabytes / elapsed:7.1f} {'':>8}")
+        for workers in args.workers:
+            stores = {name: adapter}
+            start = time.perf_counter()
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_parser,
+                                     initargs=(stores,)) as pool:
+                # Start every worker before timing the parsing
+                list(pool.map(_page_size, [name] * workers, [b''] * workers))
+                startup = time.perf_counter() - start
+                prices, elapsed = timed(lambda: pool_map(pool, _parse_shared, name, pages))
+                if workers == args.workers[0]:
+                    pickled, pickled_time = timed(lambda: list(pool.map(_parse_pickled, [name] * len(pages), pages)))
+                    if name == 'regex':
+                        _, copy = timed(lambda: pool_map(pool, _shared_size, name, pages))
+            if prices != expected or pickled != expected:
+                raise SystemExit(f"{name}: pool results differ from inline parsing")
+            print(f"{name:>8} {f'{workers} procs':>12} {elapsed:6.2f}s {args.pages / elapsed:8.1f} "
+                  f"{megabytes / elapsed:7.1f} {startup:7.2f}s")
+            if workers == args.workers[0]:
+                print(f"{name:>8} {'pickled':>12} {pickled_time:6.2f}s {args.pages / pickled_time:8.1f} "
+                      f"{megabytes / pickled_time:7.1f}")
+    print(f"{'':>8} {'shared only':>12} {copy:6.2f}s {args.pages / copy:8.1f} {megabytes / copy:7.1f}")
+
+
+if __name__ == '__main__':
+    main()
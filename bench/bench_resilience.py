@@ -0,0 +1,112 @@
+"""
+Resilience Benchmark
+Scrape runs against a local fake store server with faults injected.
+
+Every store is fetched over HTTP from a FakeStoreServer. After a healthy
+run seeds the last known prices, one store is taken down (``--status``,
+503 by default) and the run is repeated with the shipped circuit breaker
+and with the breaker effectively disabled: the breaker stops hammering
+the dead store after ``breaker_threshold`` failures and serves its last
+known prices, marked stale, instead of retrying every pair with backoff.
+The store then comes back answering 404s, and then healthy pages, to show
+half-open trials settling the breaker either way.
+
+Usage:
+    python bench/bench_resilience.py [--products 40] [--latency 0.005]
+                                     [--status 503] [--concurrency 8]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT / "src"), str(ROOT / "tests")]
+
+from fake_store import FakeStoreServer  # noqa: E402
+from price_scraper import PriceScraper, RegexStoreAdapter, add_store  # noqa: E402
+
+
+STORES = ['Amazon', 'Walmart', 'Best Buy', 'Target', 'eBay']
+DOWN = 'Target'
+COOLDOWN = 0.2
+
+
+def make_scraper(server: FakeStoreServer, breaker_threshold: int) -> PriceScraper:
+    """Scraper with an adapter per store pointing at the fake server, without rate limits."""
+    scraper = PriceScraper(pool_size=8, breaker_threshold=breaker_threshold,
+                           breaker_cooldown=COOLDOWN)
+    for store in STORES:
+        add_store(scraper, store, delay=0, max_concurrency=8,
+                  adapter=RegexStoreAdapter(server.url_template(store)))
+    return scraper
+
+
+def scrape(scraper: PriceScraper, server: FakeStoreServer, pairs: list, concurrency: int) -> tuple:
+    """Run one async scrape; returns (prices, seconds, requests to the down store)."""
+    before = server.store_requests.get(DOWN, 0)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        prices = asyncio.run(scraper.get_prices_async(pairs, concurrency))
+    elapsed = time.perf_counter() - start
+    return prices, elapsed, server.store_requests.get(DOWN, 0) - before
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--products', type=int, default=40)
+    parser.add_argument('--latency', type=float, default=0.005)
+    parser.add_argument('--status', type=int, default=503)
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args()
+    
+    pairs = [(f"Product {i:05d}", store) for i in range(args.products) for store in STORES]
+    down_pairs = args.products
+    
+    print(f"{len(pairs)} pairs, {args.latency * 1000:.0f} ms per request, "
+          f"{DOWN} down with HTTP {args.status}")
+    print(f"{'run':>22} {'time':>7} {DOWN + ' reqs':>12} {'stale':>6} {'missing':>8} {'breaker':>10}")
+    
+    def report(label, scraper, prices, elapsed, requests):
+        served = sum(len(store_prices) for store_prices in prices.values())
+        stale = sum(1 for pair in scraper.stale_prices if pair[1] == DOWN)
+        print(f"{label:>22} {elapsed:6.2f}s {requests:12d} {stale:6d} "
+              f"{len(pairs) - served:8d} {scraper.breaker(DOWN).state:>10}")
+    
+    with FakeStoreServer(latency=args.latency) as server:
+        healthy = make_scraper(server, breaker_threshold=5)
+        expected, elapsed, requests = scrape(healthy, server, pairs, args.concurrency)
+        report('healthy', healthy, expected, elapsed, requests)
+        healthy.close()
+        
+        server.down(DOWN, args.status)
+        for label, threshold in (('down, breaker', 5), ('down, no breaker', len(pairs) * 10)):
+            scraper = make_scraper(server, breaker_threshold=threshold)
+            scraper.remember_prices(expected)
+            prices, elapsed, requests = scrape(scraper, server, pairs, args.concurrency)
+            report(label, scraper, prices, elapsed, requests)
+            if prices != expected:
+                raise SystemExit(f"{label}: stale fallbacks differ from the last known prices")
+            if label == 'down, breaker':
+                recovering = scraper
+            else:
+                scraper.close()
+        
+        # Half-open trials: a 404 proves the store is up, as does a good page
+        for label, status in (('back with 404s', 404), ('back up', None)):
+            time.sleep(COOLDOWN)
+            server.down(DOWN, status)
+            prices, elapsed, requests = scrape(recovering, server, pairs, args.concurrency)
+            report(label, recovering, prices, elapsed, requests)
+        recovering.close()
+        if prices != expected:
+            raise SystemExit("prices after recovery differ from the healthy run")
+    print(f"({down_pairs} pairs per store; 'missing' pairs got no price at all)")
+
+
+if __name__ == '__main__':
+    main()
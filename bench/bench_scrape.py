@@ -0,0 +1,95 @@
+"""
+Scrape Benchmark
+Sequential vs asyncio scraping against a local fake store server.
+
+Every (product, store) pair is a real HTTP request to a FakeStoreServer
+that answers after ``--latency`` seconds. The sequential run is
+``PriceComparisonApp.scrape_prices``; the async runs are
+``scrape_prices_async`` at each ``--concurrency``, once with per-store
+limits loose enough that only the global concurrency cap binds, and
+once with the shipped per-store limits (delay 0.5s, burst 5, 4 in
+flight), which cap throughput at the sum of the stores' allowances
+(5 stores x 2 requests/s, after each store's burst of 5).
+
+Usage:
+    python bench/bench_scrape.py [--products 80] [--latency 0.02]
+                                 [--concurrency 1 2 4 8 16 32]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path[:0] = [str(ROOT / "src"), str(ROOT / "tests")]
+
+from fake_store import FakeStoreServer  # noqa: E402
+from main import PriceComparisonApp  # noqa: E402
+from price_scraper import PriceScraper, RegexStoreAdapter, add_store  # noqa: E402
+
+
+STORES = ['Amazon', 'Walmart', 'Best Buy', 'Target', 'eBay']
+
+# (label, per-store settings) for the async runs
+LIMITS = {
+    'loose': lambda concurrency: {'delay': 0, 'burst': 1, 'max_concurrency': concurrency},
+    'shipped': lambda concurrency: {'delay': 0.5, 'burst': 5, 'max_concurrency': 4},
+}
+
+
+def make_scraper(server: FakeStoreServer, limits: dict, pool_size: int) -> PriceScraper:
+    """Scraper with an adapter per store pointing at the fake server."""
+    scraper = PriceScraper(pool_size=pool_size)
+    for store in STORES:
+        add_store(scraper, store, adapter=RegexStoreAdapter(server.url_template(store)), **limits)
+    return scraper
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--products', type=int, default=80)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+    
+    products = [{'name': f"Product {i:05d}", 'stores': STORES} for i in range(args.products)]
+    pairs = args.products * len(STORES)
+    pool_size = max(args.concurrency)
+    
+    with FakeStoreServer(latency=args.latency) as server, tempfile.TemporaryDirectory() as data_dir:
+        app = PriceComparisonApp(data_dir)
+        app.scraper = make_scraper(server, LIMITS['loose'](pool_size), pool_size)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = app.scrape_prices(products)
+        sequential = time.perf_counter() - start
+        app.scraper.close()
+        
+        print(f"{pairs} pairs, {args.latency * 1000:.0f} ms per request")
+        print(f"sequential: {sequential:6.2f}s  {pairs / sequential:7.1f} pairs/s")
+        print(f"{'limits':>8} {'conc':>5} {'time':>7} {'pairs/s':>8} {'speedup':>8} {'of cap':>7}")
+        for label, limits in LIMITS.items():
+            # The shipped limits bind long before the concurrency cap, so
+            # one run at the highest concurrency shows their ceiling
+            levels = args.concurrency if label == 'loose' else [max(args.concurrency)]
+            for concurrency in levels:
+                app.scraper = make_scraper(server, limits(concurrency), pool_size)
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    prices = asyncio.run(app.scrape_prices_async(products, concurrency))
+                elapsed = time.perf_counter() - start
+                app.scraper.close()
+                if prices != expected:
+                    raise SystemExit(f"async results differ from sequential at concurrency {concurrency}")
+                speedup = sequential / elapsed
+                print(f"{label:>8} {concurrency:5d} {elapsed:6.2f}s {pairs / elapsed:8.1f} "
+                      f"{speedup:7.1f}x {speedup / concurrency:6.0%}")
+
+
+if __name__ == '__main__':
+    main()
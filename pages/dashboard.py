@@ -17,6 +17,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
 from price_scraper import PriceScraper
 from comparison_engine import ComparisonEngine
+from refresh_tracker import RefreshTracker
 from report_generator import ReportGenerator
 from user_manager import UserManager
 
@@ -41,19 +42,22 @@ def load_products(products_file: str = "products.json"):
         return []
 
 
-def load_price_history(data_dir: str = "data"):
-    """Load historical price data if available."""
-    data_file = Path(data_dir) / "prices.json"
-    if data_file.exists():
-        with open(data_file, 'r') as f:
-            return json.load(f)
-    return None
+@st.cache_resource
+def get_comparison_engine():
+    """Comparison engine shared by all sessions, so its result cache is too."""
+    return ComparisonEngine()
 
 
-def scrape_and_compare_prices(products):
-    """Scrape prices and perform comparison."""
+def scrape_and_compare_prices(products, incremental=False, data_dir: str = "data"):
+    """
+    Scrape prices and perform comparison.
+    
+    With ``incremental``, only prices whose staleness budget has run out
+    are re-scraped; the rest come from the refresh tracker.
+    """
     scraper = PriceScraper()
     engine = ComparisonEngine()
+    tracker = RefreshTracker(Path(data_dir) / "refresh_state.json")
     
     # Scrape prices
     prices = {}
@@ -65,7 +69,11 @@ def scrape_and_compare_prices(products):
         product_prices = {}
         
         for store in product.get('stores', []):
-            price = scraper.get_price(product_name, store)
+            if incremental and not tracker.is_due(product_name, store):
+                price = tracker.cached_price(product_name, store)
+            else:
+                price = scraper.get_price(product_name, store)
+                tracker.record(product_name, store, price)
             if price:
                 product_prices[store] = price
         
@@ -80,8 +88,10 @@ def scrape_and_compare_prices(products):
         
         progress_bar.progress((idx + 1) / len(products))
     
+    tracker.save()
+    
     # Compare prices
-    comparison_results = engine.compare(prices)
+    comparison_results = engine.compare(prices, dispersion=True)
     
     # Add metadata to comparison results
     for product_name in comparison_results:
@@ -220,13 +230,22 @@ def create_store_performance_chart(comparison_results):
 
 def create_price_range_table(comparison_results):
     """Create a table showing price ranges for each product."""
+    if hasattr(comparison_results, 'to_dataframe'):
+        # Vectorized results build the table straight from their arrays
+        df = comparison_results.to_dataframe()
+        for column in ('Best Price', 'Average Price', 'Max Price', 'Savings', 'Median Price', 'Std Dev'):
+            df[column] = df[column].map('${:.2f}'.format)
+        for column in ('Savings %', 'Dispersion'):
+            df[column] = df[column].map('{:.1f}%'.format)
+        return df
+    
     data = []
     
     for product, result in comparison_results.items():
         best = result['best_deal']
         stats = result['statistics']
         
-        data.append({
+        row = {
             'Product': product,
             'Best Store': best['store'],
             'Best Price': f"${best['price']:.2f}",
@@ -234,7 +253,12 @@ def create_price_range_table(comparison_results):
             'Max Price': f"${stats['max_price']:.2f}",
             'Savings': f"${stats['price_range']:.2f}",
             'Savings %': f"{stats['savings_percentage']:.1f}%"
-        })
+        }
+        if 'median_price' in stats:
+            row['Median Price'] = f"${stats['median_price']:.2f}"
+            row['Std Dev'] = f"${stats['std_dev']:.2f}"
+            row['Dispersion'] = f"{stats['dispersion_score']:.1f}%"
+        data.append(row)
     
     return pd.DataFrame(data)
 
@@ -299,7 +323,13 @@ def main():
             help="Choose whether to scrape live prices or load previously saved data"
         )
         
+        incremental = False
         if refresh_option == "Live Scraping":
+            incremental = st.checkbox(
+                "Only refresh stale prices",
+                value=True,
+                help="Re-scrape only prices that are due; reuse recently fetched ones"
+            )
             if st.button("🔄 Scrape Prices Now", use_container_width=True):
                 st.session_state.scrape_now = True
         
@@ -340,17 +370,18 @@ def main():
     # Check if we should scrape or load saved data
     if refresh_option == "Live Scraping" or st.session_state.get("scrape_now", False):
         st.info("📊 Scraping prices from stores...")
-        prices, comparison_results = scrape_and_compare_prices(products)
+        prices, comparison_results = scrape_and_compare_prices(products, incremental)
         st.success("✅ Prices scraped successfully!")
     else:
         # Load saved data
-        price_history = load_price_history()
-        if price_history and 'prices' in price_history:
-            scraper = PriceScraper()
-            engine = ComparisonEngine()
-            comparison_results = engine.compare(price_history['prices'])
-            prices = price_history['prices']
-            last_updated = price_history.get('timestamp', 'Unknown')
+        # The binary snapshot is mapped rather than parsed; fall back to JSON
+        data_file = Path("data") / "prices.snap"
+        if not data_file.exists():
+            data_file = Path("data") / "prices.json"
+        if data_file.exists():
+            # Memoized by file mtime/size, so reruns skip parsing and comparing
+            comparison_results = get_comparison_engine().compare_file(data_file)
+            last_updated = comparison_results.timestamp or 'Unknown'
             st.info(f"📊 Loaded saved data from {last_updated}")
         else:
             st.warning("⚠️ No saved data found. Please scrape prices first.")
@@ -425,11 +456,12 @@ def main():
     if filter_type == "All Products":
         best_deals = {p: comparison_results[p] for p in comparison_results}
     elif filter_type == "Top Deals":
-        best_deals = dict(sorted(
-            comparison_results.items(),
-            key=lambda x: x[1]['statistics']['price_range'],
-            reverse=True
-        )[:top_n])
+        engine = get_comparison_engine()
+        # Saved results are memoized by compare_file and keep their index,
+        # so reruns don't rebuild it
+        best_deals = engine.top_deals(
+            comparison_results, top_n, engine.build_index(comparison_results)
+        )
     else:  # Best by Store
         best_deals = {}
         for product, result in comparison_results.items():
@@ -522,7 +554,7 @@ def main():
     
     with col2:
         if st.button("📊 Export as JSON"):
-            json_data = json.dumps(comparison_results, indent=2)
+            json_data = json.dumps(dict(comparison_results), indent=2)
             st.download_button(
                 label="Download JSON",
                 data=json_data,
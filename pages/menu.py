@@ -6,6 +6,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from user_manager import UserManager
+from price_repository import PriceRepository
 
 # Configure page
 st.set_page_config(
@@ -269,26 +270,32 @@ for idx, brand in enumerate(brands):
 
 st.divider()
 
+@st.cache_resource
+def get_price_repository():
+    """Price database shared by all sessions, seeded from prices.json on first use."""
+    repository = PriceRepository("data/prices.db")
+    if not repository.summary()['prices'] and Path("data/prices.json").exists():
+        repository.import_json("data/prices.json")
+    return repository
+
 # Stats section
 st.subheader("📈 Quick Stats")
 
 col1, col2, col3, col4 = st.columns(4)
 
-import json
 try:
-    with open("data/prices.json", "r") as f:
-        price_data = json.load(f)
-        num_products = len(price_data.get('prices', {}))
-        num_stores = len(set([store for product in price_data.get('prices', {}).values() for store in product.keys()]))
-        
-        with col1:
-            st.metric("📦 Products", num_products)
-        with col2:
-            st.metric("🏪 Stores", num_stores)
-        with col3:
-            st.metric("💰 Last Updated", price_data.get('timestamp', 'Never')[:10])
-        with col4:
-            st.metric("📊 Tracked", f"{num_products * num_stores} prices")
+    summary = get_price_repository().summary()
+    if not summary['prices']:
+        raise ValueError("no prices yet")
+    
+    with col1:
+        st.metric("📦 Products", summary['products'])
+    with col2:
+        st.metric("🏪 Stores", summary['stores'])
+    with col3:
+        st.metric("💰 Last Updated", (summary['last_updated'] or 'Never')[:10])
+    with col4:
+        st.metric("📊 Tracked", f"{summary['prices']} prices")
 except:
     with col1:
         st.metric("📦 Products", "—")
@@ -38,13 +38,9 @@ def load_products():
     except FileNotFoundError:
         return []
 
-@st.cache_data
-def load_price_history():
-    try:
-        with open("data/prices.json", "r") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return None
+@st.cache_resource
+def get_comparison_engine():
+    return ComparisonEngine()
 
 def create_search_filters(comparison_results):
     """Extract filter options from comparison results"""
@@ -118,16 +114,23 @@ st.divider()
 
 # Load data
 products = load_products()
-price_history = load_price_history()
-
-if not price_history or 'prices' not in price_history:
+engine = get_comparison_engine()
+# The binary snapshot is mapped rather than parsed; fall back to JSON
+data_file = Path("data") / "prices.snap"
+if not data_file.exists():
+    data_file = Path("data") / "prices.json"
+try:
+    # Memoized by file mtime/size, shared across sessions
+    category_results = engine.compare_file(data_file)
+except (FileNotFoundError, ValueError):
+    category_results = None
+
+if not category_results:
     st.warning("⚠️ No price data available. Please scrape prices from the dashboard first.")
     st.stop()
 
 # Prepare comparison data from categories
 scraper = PriceScraper()
-engine = ComparisonEngine()
-category_results = engine.compare(price_history['prices'])
 
 # Create comparison results for individual products
 comparison_results = {}
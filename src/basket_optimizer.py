@@ -0,0 +1,213 @@
+"""
+Basket Optimizer Module
+Finds the cheapest way to buy a shopping list from a limited number of stores.
+"""
+
+from itertools import combinations
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from price_snapshot import PriceSnapshot
+
+
+class BasketOptimizer:
+    """
+    Chooses at most ``max_stores`` stores for a shopping list so that
+    buying every item at the cheapest of the chosen stores costs least.
+    
+    Every store subset is scored at once with NumPy: the cost of a subset
+    is the sum over items of the lowest price among its stores. When the
+    number of subsets is small enough the search is exact; otherwise a
+    greedy pick from a few starting stores is refined by swapping stores
+    until no swap helps.
+    Subsets that leave items unavailable always lose to ones that don't.
+    """
+    
+    def __init__(self, prices: Union[Dict[str, Dict[str, float]], PriceSnapshot],
+                 exact_limit: int = 5000, batch_size: int = 2048, restarts: int = 8):
+        """
+        Initialize the optimizer.
+        
+        Args:
+            prices: ``{product: {store: price}}`` dict or a PriceSnapshot
+            exact_limit: Largest number of store subsets to search exhaustively
+            batch_size: Subsets scored per vectorized step of the exact search
+            restarts: Starting stores tried by the heuristic search
+        """
+        if not isinstance(prices, PriceSnapshot):
+            prices = PriceSnapshot.from_dict(prices)
+        self.snapshot = prices
+        self.exact_limit = exact_limit
+        self.batch_size = max(1, batch_size)
+        self.restarts = max(1, restarts)
+    
+    def optimize(self, items: Union[List[str], Dict[str, float]],
+                 max_stores: int = 2) -> Dict[str, Any]:
+        """
+        Find the cheapest store subset for a shopping list.
+        
+        Args:
+            items: Product names, or a mapping of product name to quantity
+            max_stores: Maximum number of stores to shop at
+        
+        Returns:
+            Dictionary with the chosen stores, where to buy each item, the
+            basket total, items that can't be bought and the search method
+        
+        Raises:
+            ValueError: If a quantity is not a positive number
+        """
+        if not isinstance(items, dict):
+            items = {item: 1 for item in items}
+        
+        snapshot = self.snapshot
+        names, rows, quantities, unavailable = [], [], [], []
+        for item, quantity in items.items():
+            # Also rejects NaN; a zero quantity would divide by zero in _plan
+            if not quantity > 0:
+                raise ValueError(f"Quantity of {item!r} must be positive, got {quantity!r}")
+            try:
+                row = snapshot.product_row(item)
+            except KeyError:
+                unavailable.append(item)
+                continue
+            if not snapshot.mask[row].any():
+                unavailable.append(item)
+                continue
+            names.append(item)
+            rows.append(row)
+            quantities.append(quantity)
+        
+        if not names or max_stores < 1:
+            return self._plan([], names, None, [], unavailable + names, None)
+        
+        # Line cost of each item at each store; missing prices cost a
+        # penalty larger than any complete basket
+        costs = snapshot.prices[rows].astype(np.float64) * np.asarray(quantities, dtype=np.float64)[:, None]
+        missing = np.isnan(costs)
+        penalty = float(np.nanmax(costs)) * len(names) + 1
+        costs[missing] = penalty
+        
+        n_stores = costs.shape[1]
+        size = min(max_stores, n_stores)
+        if _subset_count(n_stores, size) <= self.exact_limit:
+            chosen = self._exact(costs, size)
+            method = 'exact'
+        else:
+            chosen = self._greedy_swap(costs, size)
+            method = 'heuristic'
+        
+        chosen_costs = costs[:, chosen]
+        picks = chosen_costs.argmin(axis=1)
+        line_costs = chosen_costs[np.arange(len(names)), picks]
+        bought = line_costs < penalty
+        return self._plan(chosen, names, picks, line_costs, unavailable + [
+            name for name, ok in zip(names, bought.tolist()) if not ok
+        ], method, quantities, bought)
+    
+    def _exact(self, costs: np.ndarray, size: int) -> List[int]:
+        """Score every subset of ``size`` stores in vectorized batches."""
+        best_total = np.inf
+        best = None
+        subsets = combinations(range(costs.shape[1]), size)
+        while True:
+            batch = np.array(list(_take(subsets, self.batch_size)), dtype=np.intp)
+            if not len(batch):
+                break
+            # (items, subsets, size) -> cheapest store per item per subset
+            totals = costs[:, batch].min(axis=2).sum(axis=0)
+            index = int(totals.argmin())
+            if totals[index] < best_total:
+                best_total = totals[index]
+                best = batch[index].tolist()
+        return best
+    
+    def _greedy_swap(self, costs: np.ndarray, size: int) -> List[int]:
+        """
+        Greedy fill from the best few starting stores, then swap stores
+        while it helps; the cheapest local optimum wins.
+        """
+        single_totals = costs.sum(axis=0)
+        starts = np.argsort(single_totals, kind='stable')[:self.restarts].tolist()
+        best_total = np.inf
+        best = None
+        for start in starts:
+            chosen = [start]
+            current = costs[:, start].copy()
+            while len(chosen) < size:
+                # Basket total after adding each candidate store
+                totals = np.minimum(current[:, None], costs).sum(axis=0)
+                totals[chosen] = np.inf
+                store = int(totals.argmin())
+                chosen.append(store)
+                np.minimum(current, costs[:, store], out=current)
+            
+            total = self._swap(costs, chosen, current.sum())
+            if total < best_total:
+                best_total = total
+                best = sorted(chosen)
+        return best
+    
+    @staticmethod
+    def _swap(costs: np.ndarray, chosen: List[int], total: float) -> float:
+        """Replace stores in ``chosen`` one at a time until no swap lowers the total."""
+        improved = True
+        while improved:
+            improved = False
+            for position in range(len(chosen)):
+                # Cheapest line cost without the store at this position
+                others = chosen[:position] + chosen[position + 1:]
+                rest = costs[:, others].min(axis=1) if others else np.full(costs.shape[0], np.inf)
+                totals = np.minimum(rest[:, None], costs).sum(axis=0)
+                totals[others] = np.inf
+                store = int(totals.argmin())
+                if totals[store] < total - 1e-9:
+                    chosen[position] = store
+                    total = totals[store]
+                    improved = True
+        return total
+    
+    def _plan(self, chosen: List[int], names: List[str], picks: Optional[np.ndarray],
+              line_costs, unavailable: List[str], method: Optional[str],
+              quantities: Optional[List[float]] = None,
+              bought: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """Build the result dict for a chosen store subset."""
+        stores = self.snapshot.stores
+        assignments = {}
+        used = set()
+        if picks is not None:
+            for name, pick, line_cost, quantity, ok in zip(
+                    names, picks.tolist(), line_costs.tolist(), quantities, bought.tolist()):
+                if not ok:
+                    continue
+                store = stores[chosen[pick]]
+                used.add(store)
+                assignments[name] = {
+                    'store': store,
+                    'price': round(line_cost / quantity, 2),
+                    'quantity': quantity,
+                    'cost': round(line_cost, 2)
+                }
+        return {
+            # Stores that end up with no items are dropped from the plan
+            'stores': [stores[index] for index in chosen if stores[index] in used],
+            'items': assignments,
+            'total': round(sum(item['cost'] for item in assignments.values()), 2),
+            'unavailable': unavailable,
+            'method': method
+        }
+
+
+def _subset_count(n: int, k: int) -> int:
+    """Number of ways to choose k of n stores (math.comb needs Python 3.8)."""
+    count = 1
+    for i in range(k):
+        count = count * (n - i) // (i + 1)
+    return count
+
+
+def _take(iterator, n: int):
+    """Yield up to ``n`` values from an iterator."""
+    for _, value in zip(range(n), iterator):
+        yield value
@@ -3,55 +3,602 @@ Comparison Engine Module
 Handles comparing prices and finding best deals.
 """
 
-from typing import Dict, Any
+import math
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from operator import mul
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from basket_optimizer import BasketOptimizer
+from durable_io import file_version
+from price_index import PriceIndex
+from price_snapshot import PriceSnapshot
+
+
+# Rows folded per block by matrix_statistics
+_FOLD_BLOCK_ROWS = 16384
+
+
+def store_order(stores: List[str]) -> List[int]:
+    """
+    Column indexes of ``stores`` sorted by store name.
+    
+    Ties for the best price go to the store whose name sorts first, in
+    every comparison path: a snapshot's column order depends on which
+    store each product happened to list first, so it can't be used.
+    """
+    return sorted(range(len(stores)), key=lambda column: str(stores[column]))
+
+
+def matrix_statistics(prices: np.ndarray, out: Optional[Dict[str, np.ndarray]] = None,
+                      median: bool = False,
+                      column_order: Optional[List[int]] = None) -> Dict[str, np.ndarray]:
+    """
+    Compute per-row min, max, best column, total, sum of squares and count
+    of a price matrix.
+    
+    Walks the matrix one store column at a time, folding each column into
+    running vectors, a cache-sized block of rows at a time. Columns are
+    contiguous in column-major (Fortran) order, which makes every step a
+    fast streaming ufunc call; input with non-contiguous columns is
+    converted once.
+    
+    Args:
+        prices: 2-D price matrix with NaN where a store has no price
+        out: Preallocated output arrays to fill, keyed like the result
+        median: Also compute 'median_price' (see row_medians)
+        column_order: Order to fold the columns in; ties for the best
+            price go to the first of them (default: left to right, see
+            store_order)
+        
+    Returns:
+        Arrays keyed 'min_price', 'max_price', 'best_store_index', 'total',
+        'sum_squares' and 'count', plus 'median_price' if requested
+    """
+    if prices.strides[0] != prices.itemsize:
+        prices = np.asfortranarray(prices)
+    rows = prices.shape[0]
+    if out is None:
+        out = {
+            'min_price': np.empty(rows),
+            'max_price': np.empty(rows),
+            'best_store_index': np.empty(rows, dtype=np.intp),
+            'total': np.empty(rows),
+            'sum_squares': np.empty(rows),
+            'count': np.empty(rows, dtype=np.intp)
+        }
+        if median:
+            out['median_price'] = np.empty(rows)
+    # Fold blocks of rows small enough for the running vectors to stay in cache
+    for start in range(0, rows, _FOLD_BLOCK_ROWS):
+        block = slice(start, start + _FOLD_BLOCK_ROWS)
+        _fold_columns(prices[block], {name: array[block] for name, array in out.items()}, column_order)
+    
+    if 'median_price' in out:
+        out['median_price'][...] = row_medians(prices, out['count'])
+    return out
+
+
+def _fold_columns(prices: np.ndarray, out: Dict[str, np.ndarray],
+                  column_order: Optional[List[int]] = None) -> None:
+    """Fold the store columns of one block of rows into its output slices."""
+    rows = prices.shape[0]
+    min_price, max_price = out['min_price'], out['max_price']
+    best_store_index, total, sum_squares = out['best_store_index'], out['total'], out['sum_squares']
+    min_price.fill(np.inf)
+    max_price.fill(-np.inf)
+    best_store_index.fill(0)
+    total.fill(0)
+    sum_squares.fill(0)
+    # Counting in bytes is much cheaper than widening the mask every column
+    count = np.zeros(rows, dtype=np.uint8 if prices.shape[1] < 256 else np.intp)
+    present = np.empty(rows, dtype=bool)
+    lower = np.empty(rows, dtype=bool)
+    value = np.empty(rows)
+    square = np.empty(rows)
+    
+    if column_order is None:
+        column_order = range(prices.shape[1])
+    for store_index in column_order:
+        column = prices[:, store_index]
+        # Strictly lower, so ties keep the first store folded
+        np.less(column, min_price, out=lower)
+        np.copyto(best_store_index, store_index, where=lower)
+        np.fmin(min_price, column, out=min_price)
+        np.fmax(max_price, column, out=max_price)
+    # Sums are folded left to right whatever the tie order, so the rounded
+    # averages match compare() on dicts listing the stores in column order;
+    # the block is still in cache from the pass above
+    for store_index in range(prices.shape[1]):
+        column = prices[:, store_index]
+        np.equal(column, column, out=present)
+        np.add(count, present.view(np.uint8), out=count, casting='unsafe')
+        # fmax(column, fmin(column, 0)) is the price, or 0 where it is NaN;
+        # two plain ufuncs are several times faster than a masked add
+        np.fmin(column, 0, out=value)
+        np.fmax(column, value, out=value)
+        total += value
+        np.multiply(value, value, out=square)
+        sum_squares += square
+    out['count'][...] = count
+
+
+def row_medians(prices: np.ndarray, count: np.ndarray) -> np.ndarray:
+    """
+    Median of the present prices of every row.
+    
+    Sorts each row once (NaN sorts last) and averages the middle one or two
+    of its ``count`` present prices. This is several times faster than
+    np.nanmedian and stays quiet for rows with no prices, which get NaN.
+    
+    Args:
+        prices: 2-D price matrix with NaN where a store has no price
+        count: Number of present prices in each row
+        
+    Returns:
+        Median price of every row
+    """
+    ordered = np.sort(prices, axis=1)
+    upper = count // 2
+    lower = np.maximum(count - 1, 0) // 2
+    low = np.take_along_axis(ordered, lower[:, None], axis=1)[:, 0]
+    high = np.take_along_axis(ordered, np.minimum(upper, prices.shape[1] - 1)[:, None], axis=1)[:, 0]
+    medians = (low.astype(np.float64) + high) / 2
+    medians[count == 0] = np.nan
+    return medians
+
+
+class MatrixComparison(Mapping):
+    """
+    Vectorized comparison results for a product × store price matrix.
+    
+    Statistics are held as arrays (one entry per product row). The object
+    is also a read-only mapping with the same ``{product: result}`` shape
+    as ``ComparisonEngine.compare``; each per-product dict is built only
+    when it is looked up.
+    """
+    
+    def __init__(self, products: List[str], stores: List[str], prices: np.ndarray,
+                 statistics: Optional[Dict[str, np.ndarray]] = None,
+                 timestamp: Optional[str] = None):
+        """
+        Compute statistics for every row.
+        
+        Args:
+            products: Product name of each row
+            stores: Store name of each column
+            prices: 2-D price matrix with NaN where a store has no price
+            statistics: Precomputed output of matrix_statistics(prices)
+            timestamp: When the prices were scraped
+        """
+        self.products = products
+        self.stores = stores
+        self.prices = prices
+        self.timestamp = timestamp
+        
+        if statistics is None:
+            statistics = matrix_statistics(prices, column_order=store_order(stores))
+        self.min_price = statistics['min_price']
+        self.max_price = statistics['max_price']
+        self.best_store_index = statistics['best_store_index']
+        total = statistics['total']
+        count = statistics['count']
+        self.count = count
+        self._median_price = statistics.get('median_price')
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.average_price = total / count
+            self.price_range = self.max_price - self.min_price
+            self.savings_percentage = np.where(
+                self.max_price > 0, self.price_range / self.max_price * 100, 0
+            )
+            variance = statistics['sum_squares'] / count - self.average_price ** 2
+            self.std_dev = np.sqrt(np.maximum(variance, 0))
+            self.dispersion_score = np.where(
+                self.average_price > 0, self.std_dev / self.average_price * 100, 0
+            )
+        
+        # Products with no prices at all are left out, as in compare()
+        self.rows = np.flatnonzero(count > 0)
+        self._row_of: Optional[Dict[str, int]] = None
+        self._index: Optional[PriceIndex] = None
+        self._basket_optimizer: Optional[BasketOptimizer] = None
+    
+    @property
+    def median_price(self) -> np.ndarray:
+        """Median price of every row, computed on first use."""
+        if self._median_price is None:
+            self._median_price = row_medians(self.prices, self.count)
+        return self._median_price
+    
+    def index(self) -> PriceIndex:
+        """
+        Sorted price/savings index over the results, built on first use.
+        
+        The index is kept with the results, so memoized results (e.g. from
+        compare_file) are indexed once; it is shared and must not be updated.
+        """
+        if self._index is None:
+            self._index = PriceIndex.build(self)
+        return self._index
+    
+    def basket_optimizer(self) -> BasketOptimizer:
+        """Basket optimizer over the compared prices, built on first use and shared."""
+        if self._basket_optimizer is None:
+            snapshot = PriceSnapshot(self.products, self.stores, self.prices, timestamp=self.timestamp)
+            self._basket_optimizer = BasketOptimizer(snapshot)
+        return self._basket_optimizer
+    
+    def _row(self, product_name: str) -> int:
+        """Get the matrix row of a product, raising KeyError if it has no prices."""
+        if self._row_of is None:
+            self._row_of = {self.products[row]: row for row in self.rows.tolist()}
+        return self._row_of[product_name]
+    
+    def result(self, row: int) -> Dict[str, Any]:
+        """Build the comparison result dict of one row."""
+        all_prices = {
+            store: price
+            for store, price in zip(self.stores, self.prices[row].tolist())
+            if price == price
+        }
+        best_price = float(self.min_price[row])
+        max_price = float(self.max_price[row])
+        median_price = float(self.median_price[row])
+        if self.prices.dtype != np.float64:
+            # Undo float32 representation error in whole-cent prices
+            all_prices = {store: round(price, 2) for store, price in all_prices.items()}
+            best_price = round(best_price, 2)
+            max_price = round(max_price, 2)
+        return {
+            'best_deal': {
+                'store': self.stores[self.best_store_index[row]],
+                'price': best_price
+            },
+            'all_prices': all_prices,
+            'statistics': {
+                'average_price': round(float(self.average_price[row]), 2),
+                'max_price': max_price,
+                'min_price': best_price,
+                'price_range': round(float(self.price_range[row]), 2),
+                'savings_percentage': round(float(self.savings_percentage[row]), 2),
+                'median_price': round(median_price, 2),
+                'std_dev': round(float(self.std_dev[row]), 2),
+                'dispersion_score': round(float(self.dispersion_score[row]), 2)
+            }
+        }
+    
+    def __getitem__(self, product_name: str) -> Dict[str, Any]:
+        return self.result(self._row(product_name))
+    
+    def __contains__(self, product_name: object) -> bool:
+        # A row lookup, without building the result dict as Mapping's would
+        try:
+            self._row(product_name)
+        except (KeyError, TypeError):
+            return False
+        return True
+    
+    def __iter__(self) -> Iterator[str]:
+        for row in self.rows.tolist():
+            yield self.products[row]
+    
+    def __len__(self) -> int:
+        return len(self.rows)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Materialize every result as a plain dict."""
+        return {self.products[row]: self.result(row) for row in self.rows.tolist()}
+    
+    def to_dataframe(self):
+        """Build a pandas DataFrame of per-product statistics, one row per product."""
+        import pandas as pd
+        rows = self.rows
+        stores = np.asarray(self.stores, dtype=object)
+        return pd.DataFrame({
+            'Product': np.asarray(self.products, dtype=object)[rows],
+            'Best Store': stores[self.best_store_index[rows]],
+            'Best Price': self.min_price[rows],
+            'Average Price': self.average_price[rows].round(2),
+            'Max Price': self.max_price[rows],
+            'Savings': self.price_range[rows].round(2),
+            'Savings %': self.savings_percentage[rows].round(2),
+            'Median Price': self.median_price[rows].round(2),
+            'Std Dev': self.std_dev[rows].round(2),
+            'Dispersion': self.dispersion_score[rows].round(2)
+        })
+    
+    def total_savings(self) -> float:
+        """Sum of the price range of every product."""
+        return float(self.price_range[self.rows].round(2).sum())
 
 
 class ComparisonEngine:
-    """Compares prices across stores and finds best deals."""
+    """
+    Compares prices across stores and finds best deals.
     
-    def compare(self, prices: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
+    Results for snapshots and price files are memoized in a bounded LRU
+    cache, keyed by the snapshot's content hash or the file's path, mtime
+    and size, so repeated comparisons of unchanged data (e.g. Streamlit
+    reruns) are returned without recomputing. The cache is thread-safe, so
+    one engine can be shared between sessions. Plain dict input is mutable
+    and is always compared afresh.
+    """
+    
+    def __init__(self, cache_size: int = 32):
+        """
+        Initialize the engine.
+        
+        Args:
+            cache_size: Maximum number of memoized results (0 disables the cache)
+        """
+        self.cache_size = max(0, cache_size)
+        self._cache: 'OrderedDict[Hashable, MatrixComparison]' = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache_lock = threading.Lock()
+    
+    def compare(self, prices: Union[Dict[str, Dict[str, float]], PriceSnapshot],
+                dispersion: bool = False) -> Dict[str, Any]:
         """
         Compare prices for all products.
         
         Args:
-            prices: Dictionary with product names as keys and store prices as values
+            prices: Dictionary with product names as keys and store prices as
+                values, or a PriceSnapshot (compared with the vectorized path
+                and memoized by content hash)
+            dispersion: Also report 'median_price', 'std_dev' and
+                'dispersion_score' for dict input (they nearly double its
+                cost); vectorized results always have them
             
         Returns:
-            Dictionary with comparison results including best deals
+            Dictionary with comparison results including best deals; a tie
+            for the best price goes to the store name that sorts first
+            (before the vectorized paths, dict input gave it to the store
+            listed first, which a snapshot cannot reproduce)
         """
+        if isinstance(prices, PriceSnapshot):
+            key = ('snapshot', prices.content_hash())
+            results = self._cached(key)
+            if results is None:
+                results = MatrixComparison(prices.products, prices.stores, prices.prices,
+                                           timestamp=prices.timestamp)
+                self._remember(key, results)
+            return results
+        
         results = {}
         
         for product_name, store_prices in prices.items():
             if not store_prices:
                 continue
+            results[product_name] = self._compare_product(store_prices, dispersion)
+        
+        return results
+    
+    def compare_file(self, path: Union[str, Path]) -> MatrixComparison:
+        """
+        Compare the prices saved in a ``prices.json`` file or a binary
+        ``.snap`` snapshot (see PriceSnapshot.save_binary).
+        
+        Results are memoized by the version of the file (see
+        durable_io.file_version), so an unchanged file is neither re-read
+        nor re-compared. The version is taken from the open file, so the
+        results always match the key even if the file is replaced while
+        it is read.
+        
+        Args:
+            path: Path to the prices file
             
-            # Find best deal
-            best_store = min(store_prices, key=store_prices.get)
-            best_price = store_prices[best_store]
+        Returns:
+            Vectorized results, with the file's timestamp
+        """
+        path = Path(path).resolve()
+        with open(path, 'rb') as f:
+            key = ('file', str(path)) + file_version(f)
+            results = self._cached(key)
+            if results is None:
+                if path.suffix == '.snap':
+                    snapshot = PriceSnapshot.open_binary(f)
+                else:
+                    snapshot = PriceSnapshot.from_json_file(f)
+                results = MatrixComparison(snapshot.products, snapshot.stores, snapshot.prices,
+                                           timestamp=snapshot.timestamp)
+                self._remember(key, results)
+        return results
+    
+    def _cached(self, key: Hashable) -> Optional[MatrixComparison]:
+        """Look up memoized results, counting the hit or miss."""
+        with self._cache_lock:
+            results = self._cache.get(key)
+            if results is None:
+                self.cache_misses += 1
+            else:
+                self.cache_hits += 1
+                self._cache.move_to_end(key)
+            return results
+    
+    def _remember(self, key: Hashable, results: MatrixComparison) -> None:
+        """Memoize results, evicting the least recently used beyond cache_size."""
+        if not self.cache_size:
+            return
+        with self._cache_lock:
+            if key[0] == 'file':
+                # Older versions of the same file can never be hit again
+                for stale in [k for k in self._cache if k[:2] == key[:2]]:
+                    del self._cache[stale]
+            self._cache[key] = results
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+    
+    def invalidate(self, path: Optional[Union[str, Path]] = None) -> None:
+        """
+        Drop memoized results.
+        
+        Args:
+            path: Only drop results for this prices file (default: drop all)
+        """
+        with self._cache_lock:
+            if path is None:
+                self._cache.clear()
+                return
+            path = str(Path(path).resolve())
+            for key in [k for k in self._cache if k[0] == 'file' and k[1] == path]:
+                del self._cache[key]
+    
+    def cache_stats(self) -> Dict[str, int]:
+        """Get memoization counters."""
+        with self._cache_lock:
+            return {
+                'entries': len(self._cache),
+                'max_entries': self.cache_size,
+                'hits': self.cache_hits,
+                'misses': self.cache_misses
+            }
+    
+    def compare_stream(self, records: Iterable[Tuple[str, str, Optional[float]]],
+                       expected_stores: Optional[Union[int, Mapping]] = None,
+                       dispersion: bool = False) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Compare prices arriving as a stream of (product, store, price) records.
+        
+        Each product's result is yielded as soon as the product is complete,
+        so only products still in flight are held in memory. Without
+        ``expected_stores`` a product is complete when the next record is
+        for a different product, so records must be grouped by product: a
+        product whose records are split into several runs is yielded once
+        per run, each time compared over that run's prices only. With it,
+        a product is complete once that many records have arrived for it,
+        so records may interleave. Products still open when the stream
+        ends are yielded last. Records with a price of None count towards
+        completion but are not compared.
+        
+        Args:
+            records: Iterable of (product, store, price) records
+            expected_stores: Record count per product, either one number for
+                every product or a mapping of product name to count
+            dispersion: Also report median, std dev and dispersion (see compare)
+            
+        Yields:
+            (product name, comparison result) pairs
+        """
+        in_flight = {}
+        received = {}
+        current = None
+        
+        for product_name, store, price in records:
+            if expected_stores is None and product_name != current:
+                if current is not None:
+                    store_prices = in_flight.pop(current, None)
+                    if store_prices:
+                        yield current, self._compare_product(store_prices, dispersion)
+                current = product_name
             
-            # Calculate statistics
-            prices_list = list(store_prices.values())
-            average_price = sum(prices_list) / len(prices_list)
-            max_price = max(prices_list)
-            price_range = max_price - best_price
-            savings_percentage = (price_range / max_price * 100) if max_price > 0 else 0
+            store_prices = in_flight.setdefault(product_name, {})
+            if price is not None:
+                store_prices[store] = price
             
-            results[product_name] = {
-                'best_deal': {
-                    'store': best_store,
-                    'price': best_price
-                },
-                'all_prices': store_prices,
-                'statistics': {
-                    'average_price': round(average_price, 2),
-                    'max_price': max_price,
-                    'min_price': best_price,
-                    'price_range': round(price_range, 2),
-                    'savings_percentage': round(savings_percentage, 2)
-                }
-            }
+            if expected_stores is not None:
+                if isinstance(expected_stores, Mapping):
+                    expected = expected_stores.get(product_name)
+                else:
+                    expected = expected_stores
+                received[product_name] = received.get(product_name, 0) + 1
+                if expected is not None and received[product_name] >= expected:
+                    del received[product_name]
+                    in_flight.pop(product_name)
+                    if store_prices:
+                        yield product_name, self._compare_product(store_prices, dispersion)
         
-        return results
+        for product_name, store_prices in in_flight.items():
+            if store_prices:
+                yield product_name, self._compare_product(store_prices, dispersion)
+    
+    def _compare_product(self, store_prices: Dict[str, float],
+                         dispersion: bool = False) -> Dict[str, Any]:
+        """
+        Compare one product's store prices.
+        
+        With ``dispersion``, one sort of the prices gives the median, and
+        the sum of squares is a single C-level pass over them.
+        """
+        best_store = min(store_prices, key=store_prices.get)
+        best_price = store_prices[best_store]
+        prices_list = list(store_prices.values())
+        if prices_list.count(best_price) > 1:
+            # Ties go to the store name that sorts first, as in MatrixComparison
+            best_store = min(store for store, price in store_prices.items() if price == best_price)
+        
+        # Calculate statistics
+        count = len(prices_list)
+        average_price = sum(prices_list) / count
+        max_price = max(prices_list)
+        price_range = max_price - best_price
+        savings_percentage = (price_range / max_price * 100) if max_price > 0 else 0
+        
+        statistics = {
+            'average_price': round(average_price, 2),
+            'max_price': max_price,
+            'min_price': best_price,
+            'price_range': round(price_range, 2),
+            'savings_percentage': round(savings_percentage, 2)
+        }
+        if dispersion:
+            ordered = sorted(prices_list)
+            middle = count // 2
+            if count % 2:
+                statistics['median_price'] = ordered[middle]
+            else:
+                statistics['median_price'] = round((ordered[middle - 1] + ordered[middle]) / 2, 2)
+            
+            variance = sum(map(mul, ordered, ordered)) / count - average_price * average_price
+            std_dev = math.sqrt(variance) if variance > 0 else 0.0
+            statistics['std_dev'] = round(std_dev, 2)
+            statistics['dispersion_score'] = round(std_dev / average_price * 100, 2) if average_price > 0 else 0
+        
+        return {
+            'best_deal': {
+                'store': best_store,
+                'price': best_price
+            },
+            'all_prices': store_prices,
+            'statistics': statistics
+        }
+    
+    def compare_matrix(self, products: List[str], stores: List[str],
+                       prices: np.ndarray) -> MatrixComparison:
+        """
+        Compare prices held as a dense product × store matrix.
+        
+        Args:
+            products: Product name of each row
+            stores: Store name of each column
+            prices: 2-D price matrix with NaN where a store has no price
+            
+        Returns:
+            Vectorized results, usable like the dict returned by compare()
+        """
+        return MatrixComparison(products, stores, np.asarray(prices))
+    
+    def compare_parallel(self, prices: PriceSnapshot, workers: Optional[int] = None,
+                         shards: Optional[int] = None) -> MatrixComparison:
+        """
+        Compare a snapshot across CPU cores (see parallel_compare).
+        
+        Args:
+            prices: Snapshot to compare
+            workers: Number of worker processes (default: CPU count)
+            shards: Number of product ranges to split into (default: 4 per worker)
+            
+        Returns:
+            Vectorized results, identical to compare(prices)
+        """
+        from parallel_compare import compare_parallel
+        return compare_parallel(prices.products, prices.stores, prices.prices, workers, shards)
     
     def get_best_deals_by_store(self, comparison_results: Dict[str, Any]) -> Dict[str, list]:
         """Get all best deals grouped by store."""
@@ -69,9 +616,72 @@ class ComparisonEngine:
         
         return deals_by_store
     
+    def optimize_basket(self, prices: Union[Dict[str, Dict[str, float]], PriceSnapshot, MatrixComparison],
+                        items: Union[List[str], Dict[str, float]],
+                        max_stores: int = 2) -> Dict[str, Any]:
+        """
+        Find the cheapest way to buy a shopping list from at most
+        ``max_stores`` stores (see BasketOptimizer).
+        
+        A dict is converted to a PriceSnapshot on every call, since it may
+        have changed; to optimize many baskets over the same prices, pass a
+        snapshot or vectorized results (e.g. from compare_file), which keep
+        their optimizer and product lookup between calls.
+        
+        Args:
+            prices: ``{product: {store: price}}`` dict, a PriceSnapshot or
+                vectorized comparison results
+            items: Product names, or a mapping of product name to quantity
+            max_stores: Maximum number of stores to shop at
+            
+        Returns:
+            Dictionary with the chosen stores, where to buy each item, the
+            basket total, items that can't be bought and the search method
+        
+        Raises:
+            ValueError: If a quantity is not a positive number
+        """
+        if isinstance(prices, MatrixComparison):
+            return prices.basket_optimizer().optimize(items, max_stores)
+        return BasketOptimizer(prices).optimize(items, max_stores)
+    
+    def build_index(self, comparison_results: Dict[str, Any]) -> PriceIndex:
+        """
+        Build a sorted price/savings index over comparison results.
+        
+        Vectorized results keep their index (see MatrixComparison.index), so
+        indexing a memoized result again costs nothing.
+        """
+        if isinstance(comparison_results, MatrixComparison):
+            return comparison_results.index()
+        return PriceIndex.build(comparison_results)
+    
+    def top_deals(self, comparison_results: Dict[str, Any], top_n: int,
+                  index: Optional[PriceIndex] = None) -> Dict[str, Any]:
+        """Get the top N products by potential savings, largest first."""
+        if index is not None:
+            return {product: comparison_results[product] for product in index.top_savings(top_n)}
+        return dict(sorted(
+            comparison_results.items(),
+            key=lambda x: x[1]['statistics']['price_range'],
+            reverse=True
+        )[:top_n])
+    
     def filter_by_price_range(self, comparison_results: Dict[str, Any], 
-                             min_price: float, max_price: float) -> Dict[str, Any]:
-        """Filter products by price range."""
+                             min_price: float, max_price: float,
+                             index: Optional[PriceIndex] = None) -> Dict[str, Any]:
+        """
+        Filter products by price range.
+        
+        With an index the lookup is two bisects, and results come back
+        cheapest first instead of in input order.
+        """
+        if index is not None:
+            return {
+                product: comparison_results[product]
+                for product in index.in_price_range(min_price, max_price)
+            }
+        
         filtered = {}
         
         for product, result in comparison_results.items():
@@ -103,3 +713,271 @@ class ComparisonEngine:
                     }
         
         return drops
+    
+    def find_price_drops_over_history(self, timestamps, products: List[str],
+                                      best_prices: np.ndarray,
+                                      min_drop_percentage: float = 0.0) -> Dict[str, Any]:
+        """
+        Find drops in the latest snapshot against 7-day low, 30-day median
+        and all-time low baselines (see PriceDropDetector).
+        """
+        detector = PriceDropDetector(min_drop_percentage=min_drop_percentage)
+        return detector.detect(timestamps, products, best_prices)
+
+
+class PriceDropDetector:
+    """
+    Finds price drops against rolling baselines over a full price history.
+    
+    Works on a (time × product) matrix of best prices and compares one
+    snapshot against the 7-day low, the 30-day median and the all-time low
+    of the snapshots before it. The minimum baselines come from a single
+    sweep over the history rows; only the 30-day window is read twice,
+    for the median.
+    """
+    
+    DAY = 24 * 3600
+    
+    def __init__(self, week_days: float = 7, month_days: float = 30,
+                 min_drop_percentage: float = 0.0):
+        """
+        Initialize the detector.
+        
+        Args:
+            week_days: Length of the short window whose low is a baseline
+            month_days: Length of the long window whose median is a baseline
+            min_drop_percentage: Smallest drop (in %) to report
+        """
+        self.week = week_days * self.DAY
+        self.month = month_days * self.DAY
+        self.min_drop_percentage = min_drop_percentage
+    
+    @staticmethod
+    def to_seconds(timestamps) -> np.ndarray:
+        """
+        Convert timestamps (ISO strings, datetimes or datetime64) to epoch
+        seconds. Timezone-aware ones are converted to UTC; naive ones are
+        taken as UTC, as NumPy does.
+        """
+        times = np.asarray(timestamps)
+        if times.dtype.kind in 'iuf':
+            return times.astype(np.float64)
+        if times.dtype.kind in 'OU':
+            # datetime64 has no time zones: convert aware times up front
+            # rather than leave NumPy to warn about each one
+            times = np.array([_utc_naive(value) for value in times.tolist()], dtype='datetime64[us]')
+        return times.astype('datetime64[us]').astype(np.int64) / 1e6
+    
+    @staticmethod
+    def best_price_matrix(history: List[Tuple[Any, Mapping]]) -> Tuple[np.ndarray, List[str], np.ndarray]:
+        """
+        Build a (time × product) best-price matrix from comparison results.
+        
+        Args:
+            history: (timestamp, comparison results) pairs in time order
+            
+        Returns:
+            (timestamps, products, best price matrix with NaN where missing)
+        """
+        products: Dict[str, int] = {}
+        for _, results in history:
+            for product_name in results:
+                products.setdefault(product_name, len(products))
+        
+        matrix = np.full((len(history), len(products)), np.nan)
+        for row, (_, results) in enumerate(history):
+            if hasattr(results, 'min_price'):
+                columns = [products[results.products[r]] for r in results.rows.tolist()]
+                matrix[row, columns] = results.min_price[results.rows]
+            else:
+                for product_name, result in results.items():
+                    matrix[row, products[product_name]] = result['best_deal']['price']
+        timestamps = PriceDropDetector.to_seconds([t for t, _ in history])
+        return timestamps, list(products), matrix
+    
+    def baselines(self, timestamps, best_prices: np.ndarray,
+                  at: int = -1) -> Dict[str, np.ndarray]:
+        """
+        Compute the baseline arrays for snapshot ``at``.
+        
+        Args:
+            timestamps: Time of each row, ascending
+            best_prices: (time × product) best-price matrix, NaN where missing
+            at: Row to evaluate; earlier rows form the history
+            
+        Returns:
+            Arrays (one entry per product) keyed 'current', 'week_low',
+            'month_median' and 'all_time_low'; NaN where there is no history
+        """
+        times = self.to_seconds(timestamps)
+        at = at % len(times)
+        now = times[at]
+        week_start = int(np.searchsorted(times, now - self.week, side='left'))
+        month_start = int(np.searchsorted(times, now - self.month, side='left'))
+        week_start = min(week_start, at)
+        month_start = min(month_start, at)
+        
+        products = best_prices.shape[1]
+        older_low = np.full(products, np.nan)
+        week_low = np.full(products, np.nan)
+        # One sweep: rows before the week window only feed the all-time
+        # low, rows inside it feed the week low (fmin skips NaN)
+        if week_start > 0:
+            np.fmin.reduce(best_prices[:week_start], axis=0, out=older_low)
+        if at > week_start:
+            np.fmin.reduce(best_prices[week_start:at], axis=0, out=week_low)
+        all_time_low = np.fmin(older_low, week_low)
+        
+        month_median = np.full(products, np.nan)
+        if at > month_start:
+            window = best_prices[month_start:at]
+            with np.errstate(invalid='ignore'):
+                has_data = ~np.isnan(window).all(axis=0)
+                month_median[has_data] = np.nanmedian(window[:, has_data], axis=0)
+        
+        return {
+            'current': np.asarray(best_prices[at], dtype=np.float64),
+            'week_low': week_low,
+            'month_median': month_median,
+            'all_time_low': all_time_low
+        }
+    
+    def detect(self, timestamps, products: List[str], best_prices: np.ndarray,
+               at: int = -1) -> Dict[str, Any]:
+        """
+        Find products whose price at snapshot ``at`` dropped below a baseline.
+        
+        Returns:
+            Dictionary keyed by product with the current price, each baseline,
+            the drop percentage against each baseline and whether the price
+            is a new all-time low
+        """
+        stats = self.baselines(timestamps, best_prices, at)
+        current = stats['current']
+        drops = {}
+        with np.errstate(invalid='ignore', divide='ignore'):
+            percentages = {
+                name: (stats[name] - current) / stats[name] * 100
+                for name in ('week_low', 'month_median', 'all_time_low')
+            }
+            threshold = max(self.min_drop_percentage, 0.0)
+            flagged = np.zeros(len(current), dtype=bool)
+            for percentage in percentages.values():
+                flagged |= percentage > threshold
+        
+        for column in np.flatnonzero(flagged).tolist():
+            entry = {'current_price': float(current[column])}
+            for name in ('week_low', 'month_median', 'all_time_low'):
+                baseline = stats[name][column]
+                entry[name] = None if np.isnan(baseline) else round(float(baseline), 2)
+                percentage = percentages[name][column]
+                entry[f'drop_vs_{name}'] = round(float(percentage), 2) if percentage > 0 else 0.0
+            entry['is_all_time_low'] = bool(percentages['all_time_low'][column] > 0)
+            drops[products[column]] = entry
+        return drops
+
+
+def _utc_naive(value: Union[str, datetime]) -> datetime:
+    """Parse an ISO timestamp if needed and express it as a naive UTC datetime."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class IncrementalComparisonEngine(ComparisonEngine):
+    """
+    Keeps comparison results up to date as individual prices change.
+    
+    After an initial load, ``apply_updates`` takes (product, store, price)
+    changes and recomputes only the affected products. Best deals by
+    store and total savings are maintained alongside, so both stay
+    current in O(changes), as is a PriceIndex over the results.
+    """
+    
+    def __init__(self, prices: Optional[Dict[str, Dict[str, float]]] = None):
+        """
+        Initialize the engine.
+        
+        Args:
+            prices: Initial prices to compare
+        """
+        super().__init__()
+        self.prices: Dict[str, Dict[str, float]] = {}
+        self.results: Dict[str, Any] = {}
+        self.best_deals: Dict[str, Dict[str, float]] = {}
+        self.total_savings = 0.0
+        self.index = PriceIndex()
+        if prices:
+            self.load(prices)
+    
+    def load(self, prices: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
+        """Replace all state with a full comparison of ``prices``."""
+        self.prices = {product: dict(store_prices) for product, store_prices in prices.items()}
+        self.results = {}
+        self.best_deals = {}
+        self.total_savings = 0.0
+        for product_name in self.prices:
+            self._refresh(product_name, index=False)
+        self.index = PriceIndex.build(self.results)
+        return self.results
+    
+    def apply_updates(self, updates: Iterable[Tuple[str, str, Optional[float]]]) -> Set[str]:
+        """
+        Apply price changes and recompute the affected products.
+        
+        Args:
+            updates: (product, store, new price) tuples; a price of None
+                removes that store's price
+            
+        Returns:
+            Names of the products whose results were recomputed
+        """
+        changed = set()
+        for product_name, store, price in updates:
+            if price is None:
+                # Removing a price of an unknown product changes nothing
+                store_prices = self.prices.get(product_name)
+                if store_prices is None or store_prices.pop(store, None) is None:
+                    continue
+            else:
+                store_prices = self.prices.setdefault(product_name, {})
+                if store_prices.get(store) == price:
+                    continue
+                store_prices[store] = price
+            changed.add(product_name)
+        
+        for product_name in changed:
+            self._refresh(product_name)
+        return changed
+    
+    def _refresh(self, product_name: str, index: bool = True) -> None:
+        """Recompute one product and patch the maintained aggregates."""
+        old = self.results.pop(product_name, None)
+        if old is not None:
+            self.best_deals[old['best_deal']['store']].pop(product_name, None)
+            self.total_savings -= old['statistics']['price_range']
+        
+        store_prices = self.prices.get(product_name)
+        result = self._compare_product(dict(store_prices)) if store_prices else None
+        if index:
+            self.index.update(product_name, result)
+        if result is None:
+            self.prices.pop(product_name, None)
+            return
+        
+        self.results[product_name] = result
+        best = result['best_deal']
+        self.best_deals.setdefault(best['store'], {})[product_name] = best['price']
+        self.total_savings += result['statistics']['price_range']
+    
+    def get_best_deals_by_store(self, comparison_results: Optional[Dict[str, Any]] = None) -> Dict[str, list]:
+        """Get all best deals grouped by store, from the maintained aggregate by default."""
+        if comparison_results is not None:
+            return super().get_best_deals_by_store(comparison_results)
+        return {
+            store: [{'product': product, 'price': price} for product, price in deals.items()]
+            for store, deals in self.best_deals.items()
+            if deals
+        }
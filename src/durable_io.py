@@ -0,0 +1,115 @@
+"""
+Durable IO Module
+Crash-safe writes and versioned reads for files shared by the app and the pages.
+"""
+
+import json
+import os
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Iterator, Tuple, Union
+
+
+def fsync_directory(directory: Union[str, Path]) -> None:
+    """Flush a directory entry change (a rename) to disk, where the OS allows it."""
+    try:
+        fd = os.open(str(directory), os.O_RDONLY)
+    except OSError:
+        # Windows can't open directories; its renames are journaled anyway
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _create_temp(path: Path) -> Tuple[int, str]:
+    """
+    Create a uniquely named file next to ``path``.
+    
+    Unlike tempfile.mkstemp (always 0600), the file is created with 0666
+    and the kernel applies the process umask, so it gets the permissions
+    open() would give without reading the umask (which means setting it
+    for every thread).
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+    while True:
+        temp_name = str(path.with_name(f".{path.name}.{uuid.uuid4().hex[:12]}.tmp"))
+        try:
+            return os.open(temp_name, flags, 0o666), temp_name
+        except FileExistsError:
+            continue
+
+
+@contextmanager
+def atomic_open(path: Union[str, Path], mode: str = 'w', fsync: bool = True,
+                **open_kwargs) -> Iterator[IO]:
+    """
+    Open a temporary file that replaces ``path`` when the block exits.
+    
+    The file is written next to ``path``, flushed, fsynced and renamed over
+    it, then the directory is fsynced so the rename survives a crash.
+    Readers see either the old file or the new one, never a partial write,
+    and a reader that already has the old file open keeps reading it. If
+    the block raises, the temporary file is removed and ``path`` is left
+    untouched.
+    
+    Args:
+        path: File to replace
+        mode: 'w' or 'wb'
+        fsync: Flush data and rename to disk (off for throwaway files)
+        **open_kwargs: Passed to ``open``, e.g. encoding or newline
+    
+    Yields:
+        The temporary file object
+    """
+    path = Path(path)
+    fd, temp_name = _create_temp(path)
+    try:
+        with open(fd, mode, **open_kwargs) as f:
+            # Keep the mode of the file being replaced; a new file keeps the
+            # mode the umask gave the temporary file, as open() would
+            try:
+                os.chmod(temp_name, os.stat(path).st_mode & 0o777)
+            except FileNotFoundError:
+                pass
+            yield f
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        os.replace(temp_name, path)
+    except BaseException:
+        try:
+            os.unlink(temp_name)
+        except FileNotFoundError:
+            pass
+        raise
+    if fsync:
+        fsync_directory(path.parent)
+
+
+def atomic_write(path: Union[str, Path], data: Union[str, bytes], fsync: bool = True) -> None:
+    """Replace ``path`` with ``data`` (see atomic_open)."""
+    with atomic_open(path, 'wb' if isinstance(data, bytes) else 'w', fsync) as f:
+        f.write(data)
+
+
+def atomic_write_json(path: Union[str, Path], data: Any, fsync: bool = True, **dump_kwargs) -> None:
+    """Replace ``path`` with ``data`` as JSON (see atomic_open)."""
+    with atomic_open(path, 'w', fsync) as f:
+        json.dump(data, f, **dump_kwargs)
+
+
+def file_version(f: IO) -> Tuple[int, int, int, int]:
+    """
+    Identify the version of an open file.
+    
+    Files written with atomic_open are replaced rather than rewritten, so
+    the (device, inode, mtime, size) of the open descriptor names exactly
+    the contents being read, whatever happens to the path meanwhile.
+    """
+    info = os.fstat(f.fileno())
+    return info.st_dev, info.st_ino, info.st_mtime_ns, info.st_size
@@ -0,0 +1,152 @@
+"""
+HTTP Pool Module
+Keep-alive HTTP connection pools shared across scraping requests.
+"""
+
+import http.client
+import threading
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+class HTTPResponse:
+    """A fully read HTTP response."""
+    
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+    
+    def header(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        """Get a response header by case-insensitive name."""
+        return self.headers.get(name.lower(), default)
+
+
+class HTTPConnectionPool:
+    """Pool of keep-alive connections to a single host."""
+    
+    def __init__(self, scheme: str, host: str, port: Optional[int] = None,
+                 maxsize: int = 4, timeout: float = 10.0):
+        """
+        Initialize the pool.
+        
+        Args:
+            scheme: 'http' or 'https'
+            host: Host name to connect to
+            port: Port, or None for the scheme's default
+            maxsize: Maximum number of open connections to the host
+            timeout: Socket timeout in seconds
+        """
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.maxsize = max(1, maxsize)
+        self.timeout = timeout
+        self.connections_created = 0
+        self.requests_sent = 0
+        self._idle = []
+        self._open = 0
+        self._closed = False
+        self._condition = threading.Condition()
+    
+    def _new_connection(self) -> http.client.HTTPConnection:
+        """Open a new connection to the host."""
+        if self.scheme == 'https':
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+    
+    def _checkout(self) -> http.client.HTTPConnection:
+        """Take an idle connection, or open one if the pool has room."""
+        with self._condition:
+            while not self._idle and self._open >= self.maxsize:
+                self._condition.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._open += 1
+            self.connections_created += 1
+        return self._new_connection()
+    
+    def _checkin(self, connection: http.client.HTTPConnection, reusable: bool) -> None:
+        """Return a connection to the pool, or discard it."""
+        with self._condition:
+            if reusable and not self._closed:
+                self._idle.append(connection)
+            else:
+                connection.close()
+                self._open -= 1
+            self._condition.notify()
+    
+    def request(self, method: str, path: str,
+                headers: Optional[Dict[str, str]] = None) -> HTTPResponse:
+        """Send a request over a pooled connection and read the full response."""
+        connection = self._checkout()
+        try:
+            connection.request(method, path, headers=headers or {})
+            response = connection.getresponse()
+            body = response.read()
+        except Exception:
+            self._checkin(connection, reusable=False)
+            raise
+        
+        with self._condition:
+            self.requests_sent += 1
+        self._checkin(connection, reusable=not response.will_close)
+        headers = {name.lower(): value for name, value in response.getheaders()}
+        return HTTPResponse(response.status, headers, body)
+    
+    def close(self) -> None:
+        """Close all idle connections."""
+        with self._condition:
+            self._closed = True
+            for connection in self._idle:
+                connection.close()
+                self._open -= 1
+            self._idle = []
+
+
+class PoolManager:
+    """Hands out one connection pool per host."""
+    
+    def __init__(self, pool_size: int = 4, timeout: float = 10.0):
+        """
+        Initialize the pool manager.
+        
+        Args:
+            pool_size: Maximum number of open connections per host
+            timeout: Socket timeout in seconds
+        """
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.pools: Dict[Tuple[str, str, Optional[int]], HTTPConnectionPool] = {}
+        self._lock = threading.Lock()
+    
+    def pool_for(self, url: str) -> HTTPConnectionPool:
+        """Get the connection pool for a URL's host."""
+        parts = urlsplit(url)
+        key = (parts.scheme or 'http', parts.hostname or '', parts.port)
+        with self._lock:
+            pool = self.pools.get(key)
+            if pool is None:
+                pool = HTTPConnectionPool(*key, maxsize=self.pool_size, timeout=self.timeout)
+                self.pools[key] = pool
+            return pool
+    
+    def request(self, method: str, url: str,
+                headers: Optional[Dict[str, str]] = None) -> HTTPResponse:
+        """Send a request to a full URL over its host's pool."""
+        parts = urlsplit(url)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        return self.pool_for(url).request(method, path, headers)
+    
+    def connections_created(self) -> int:
+        """Total number of connections opened across all hosts."""
+        return sum(pool.connections_created for pool in self.pools.values())
+    
+    def close(self) -> None:
+        """Close every pool."""
+        with self._lock:
+            for pool in self.pools.values():
+                pool.close()
+            self.pools = {}
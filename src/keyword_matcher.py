@@ -0,0 +1,118 @@
+"""
+Keyword Matcher Module
+Finds which known keyword a product name contains using an Aho-Corasick automaton.
+"""
+
+import csv
+import json
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+
+class KeywordMatcher:
+    """
+    Matches text against many keywords in a single pass.
+    
+    When several keywords occur in the text, the one added first wins,
+    the same as testing the keywords one by one in order.
+    """
+    
+    def __init__(self, table: Dict[str, Any], cache_size: int = 65536):
+        """
+        Build the automaton.
+        
+        Args:
+            table: Values keyed by keyword; keywords match case-insensitively
+            cache_size: Number of recent match results to memoize
+        """
+        self.keywords: List[str] = []
+        self.values: List[Any] = []
+        for keyword, value in table.items():
+            if keyword:
+                self.keywords.append(keyword.lower())
+                self.values.append(value)
+        
+        self._build()
+        self.match = lru_cache(maxsize=cache_size)(self._match)
+    
+    def _build(self) -> None:
+        """Build the goto, failure and output tables."""
+        none = len(self.keywords)
+        goto: List[Dict[str, int]] = [{}]
+        output: List[int] = [none]
+        
+        for priority, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    output.append(none)
+                state = next_state
+            output[state] = min(output[state], priority)
+        
+        # Breadth-first pass: link each state to its longest proper suffix
+        # state and fold that suffix's best keyword into its own output
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                suffix = fail[state]
+                while suffix and char not in goto[suffix]:
+                    suffix = fail[suffix]
+                fail[next_state] = goto[suffix].get(char, 0)
+                output[next_state] = min(output[next_state], output[fail[next_state]])
+        
+        self._goto = goto
+        self._fail = fail
+        self._output = output
+    
+    def _match(self, text: str) -> Optional[Any]:
+        """Get the value of the first-added keyword contained in the text."""
+        goto, fail, output = self._goto, self._fail, self._output
+        best = len(self.keywords)
+        state = 0
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state] < best:
+                best = output[state]
+                if best == 0:
+                    break
+        
+        return self.values[best] if best < len(self.values) else None
+    
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+
+def load_keyword_table(path: Union[str, Path]) -> Dict[str, float]:
+    """
+    Load a keyword to price table from a file.
+    
+    JSON files hold an object of ``{keyword: price}``; CSV files hold
+    ``keyword,price`` rows with an optional header.
+    """
+    path = Path(path)
+    if path.suffix.lower() == '.json':
+        with open(path, 'r') as f:
+            return {str(k): float(v) for k, v in json.load(f).items()}
+    
+    table = {}
+    with open(path, 'r', newline='') as f:
+        for row in csv.reader(f):
+            if len(row) < 2 or not row[0].strip():
+                continue
+            try:
+                table[row[0].strip()] = float(row[1])
+            except ValueError:
+                # Header or malformed row
+                continue
+    return table
@@ -3,22 +3,60 @@ Price Comparison App
 A simple Python application to compare prices across different stores and products.
 """
 
+import asyncio
 import json
 from datetime import datetime
+from functools import cached_property
 from pathlib import Path
+from typing import Optional
+from durable_io import atomic_open, atomic_write, atomic_write_json
+from price_history import PriceHistory
+from price_repository import PriceRepository
 from price_scraper import PriceScraper
+from price_snapshot import PriceSnapshot
+from refresh_tracker import RefreshTracker
+from response_cache import ResponseCache
 from comparison_engine import ComparisonEngine
 from report_generator import ReportGenerator
+from scrape_scheduler import ScrapeScheduler
+from user_manager import UserManager
 
 
 class PriceComparisonApp:
     def __init__(self, data_dir: str = "data"):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
-        self.scraper = PriceScraper()
         self.engine = ComparisonEngine()
         self.reporter = ReportGenerator()
         self.prices_file = self.data_dir / "prices.json"
+        self.snapshot_file = self.data_dir / "prices.snap"
+
+    # The stores below open files or databases, so each is only created
+    # when a run first needs it; assigning one replaces it as before
+
+    @cached_property
+    def scraper(self) -> PriceScraper:
+        return PriceScraper(cache=ResponseCache(self.data_dir / "http_cache.json"))
+
+    @cached_property
+    def history(self) -> PriceHistory:
+        return PriceHistory(self.data_dir / "history")
+
+    @cached_property
+    def repository(self) -> PriceRepository:
+        return PriceRepository(self.data_dir / "prices.db")
+
+    @cached_property
+    def tracker(self) -> RefreshTracker:
+        return RefreshTracker(self.data_dir / "refresh_state.json")
+
+    @cached_property
+    def scheduler(self) -> ScrapeScheduler:
+        return ScrapeScheduler(self.tracker)
+
+    @cached_property
+    def users(self) -> UserManager:
+        return UserManager(str(self.data_dir))
 
     def load_products(self, products_file: str) -> list:
         """Load products from a JSON file."""
@@ -29,6 +67,14 @@ class PriceComparisonApp:
             print(f"Products file '{products_file}' not found.")
             return []
 
+    def load_saved_prices(self) -> dict:
+        """Load the prices saved by the previous run, if any."""
+        try:
+            with open(self.prices_file, 'r') as f:
+                return json.load(f).get('prices', {})
+        except (FileNotFoundError, ValueError):
+            return {}
+
     def scrape_prices(self, products: list) -> dict:
         """Scrape prices for all products."""
         print("Scraping prices from stores...")
@@ -50,24 +96,148 @@ class PriceComparisonApp:
         
         return prices
 
-    def save_prices(self, prices: dict) -> None:
-        """Save prices to a JSON file with timestamp."""
+    def iter_price_records(self, products: list):
+        """
+        Scrape prices one at a time, yielding (product, store, price) records.
+        
+        Records for a product are yielded together, and a failed scrape
+        yields a price of None, so the stream can be fed straight into
+        ComparisonEngine.compare_stream without holding every price.
+        """
+        for product in products:
+            product_name = product.get('name', 'Unknown')
+            for store in product.get('stores', []):
+                yield product_name, store, self.scraper.get_price(product_name, store) or None
+
+    def run_stream(self, products: list) -> None:
+        """Scrape, compare and write the report as one stream of records."""
+        print("Streaming prices into the report...")
+        results = self.engine.compare_stream(self.iter_price_records(products), dispersion=True)
+        report_file = self.data_dir / "price_report.txt"
+        with atomic_open(report_file, 'w') as f:
+            # The scraper marks a pair stale as it is fetched, before its
+            # product's result comes out of the stream
+            count = self.reporter.write_stream(results, f, self.scraper.stale_prices)
+        self.scraper.close()
+        print(f"Report for {count} products saved to {report_file}")
+
+    async def scrape_prices_async(self, products: list, concurrency: int = 10) -> dict:
+        """Scrape prices for all products with concurrent store fetches."""
+        print(f"Scraping prices from stores (concurrency={concurrency})...")
+        pairs = [
+            (product.get('name', 'Unknown'), store)
+            for product in products
+            for store in product.get('stores', [])
+        ]
+        return await self.scraper.get_prices_async(pairs, concurrency)
+
+    def scrape_prices_incremental(self, products: list,
+                                  concurrency: Optional[int] = None,
+                                  time_budget: Optional[float] = None) -> dict:
+        """
+        Re-scrape only the prices whose staleness budget has run out.
+        
+        Due prices are scraped in priority order (most-favorited and
+        stalest first), so a cycle cut short by ``time_budget`` still
+        refreshes what users watch; with ``concurrency`` each store's due
+        prices are fetched in that order, and no fetch starts after the
+        budget. Fresh prices are merged with the tracked ones, so the
+        result still covers every product and store.
+        """
+        pairs = [
+            (product.get('name', 'Unknown'), store)
+            for product in products
+            for store in product.get('stores', [])
+        ]
+        due = self.tracker.due_pairs(pairs)
+        print(f"Refreshing {len(due)} of {len(pairs)} prices...")
+        
+        self.scheduler.set_favorites(*self.users.get_favorite_counts())
+        self.scheduler.extend(due)
+        
+        def record(product_name, store, price):
+            if not self.scraper.is_stale(product_name, store):
+                self.tracker.record(product_name, store, price)
+        
+        def fetch(product_name, store):
+            price = self.scraper.get_price(product_name, store)
+            record(product_name, store, price)
+            return price
+        
+        if concurrency:
+            items = []
+            item = self.scheduler.pop()
+            while item is not None:
+                items.append(item)
+                item = self.scheduler.pop()
+            
+            def done(index, price):
+                product_name, store, band, enqueued_at = items[index]
+                record(product_name, store, price)
+                self.scheduler.complete(band, enqueued_at)
+            
+            fresh = asyncio.run(self.scraper.get_prices_async(
+                [item[:2] for item in items], concurrency, time_budget, done
+            ))
+        else:
+            fresh = self.scheduler.drain(fetch, time_budget)
+        # Whatever the budget cut off is still due next cycle
+        self.scheduler.clear()
+        
+        # Merge fresh prices over the tracked ones
+        prices = {}
+        for product_name, store in pairs:
+            price = fresh.get(product_name, {}).get(store)
+            if not price:
+                price = self.tracker.cached_price(product_name, store)
+            if price:
+                prices.setdefault(product_name, {})[store] = price
+        
+        self.tracker.save()
+        return prices
+
+    def stale_pairs(self, prices: dict) -> set:
+        """Get the (product, store) pairs of ``prices`` that are stale fallbacks."""
+        return {
+            (product_name, store) for product_name, store in self.scraper.stale_prices
+            if store in prices.get(product_name, {})
+        }
+
+    def save_prices(self, prices: dict, stale: Optional[set] = None) -> None:
+        """
+        Save prices to a JSON file with timestamp and as a binary snapshot
+        for the pages to map, append them to the price history so earlier
+        runs are kept, and update the price repository the menu page reads.
+        Files are replaced atomically, so the pages never read a partial one.
+        
+        ``stale`` pairs (last known prices of stores that were down) are
+        listed in prices.json, left out of the history and keep their
+        previous update time in the repository.
+        """
+        stale = sorted(stale or ())
         data = {
             'timestamp': datetime.now().isoformat(),
             'prices': prices
         }
-        with open(self.prices_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        if stale:
+            data['stale'] = [list(pair) for pair in stale]
+        atomic_write_json(self.prices_file, data, indent=2)
+        PriceSnapshot.from_dict(prices, timestamp=data['timestamp']).save_binary(self.snapshot_file)
+        self.history.stop_compaction()
+        self.history.append(prices, data['timestamp'], stale)
+        self.repository.upsert_prices(prices, data['timestamp'], replace=True, stale=stale)
         print(f"Prices saved to {self.prices_file}")
+        if stale:
+            print(f"{len(stale)} prices are stale (stores down, last known prices kept)")
 
     def compare_prices(self, prices: dict) -> dict:
         """Compare prices and find best deals."""
         print("Comparing prices...")
-        return self.engine.compare(prices)
+        return self.engine.compare(prices, dispersion=True)
 
-    def generate_report(self, comparison_results: dict) -> str:
-        """Generate a price comparison report."""
-        return self.reporter.generate(comparison_results)
+    def generate_report(self, comparison_results: dict, stale: Optional[set] = None) -> str:
+        """Generate a price comparison report, marking ``stale`` prices."""
+        return self.reporter.generate(comparison_results, stale or ())
 
     def display_best_deals(self, comparison_results: dict) -> None:
         """Display best deals in a formatted way."""
@@ -85,8 +255,19 @@ class PriceComparisonApp:
                     savings = price - best_deal['price']
                     print(f"    {store}: ${price:.2f} (+${savings:.2f})")
 
-    def run(self, products_file: str = "products.json") -> None:
-        """Run the price comparison process."""
+    def run(self, products_file: str = "products.json",
+            concurrency: Optional[int] = None, incremental: bool = False,
+            time_budget: Optional[float] = None, stream: bool = False) -> None:
+        """
+        Run the price comparison process.
+        
+        Pass ``concurrency`` to scrape with the asyncio engine instead of
+        fetching one price at a time, and ``incremental`` to only re-scrape
+        prices that have gone stale, favorites first, within ``time_budget``
+        seconds. With ``stream`` each product is compared and written to the
+        report as soon as its prices are in, keeping memory flat for large
+        catalogs; prices.json is not updated in this mode.
+        """
         print("Starting Price Comparison App...")
         
         # Load products
@@ -94,15 +275,32 @@ class PriceComparisonApp:
         if not products:
             print("No products to compare. Please create a products.json file.")
             return
-        
-        # Scrape prices
-        prices = self.scrape_prices(products)
+        self.repository.upsert_products(products)
+        # Downsample old history in the background while scraping
+        self.history.start_compaction()
+        try:
+            # Scrape prices, falling back to last run's prices for stores that are down
+            self.scraper.remember_prices(self.load_saved_prices())
+            if stream:
+                self.run_stream(products)
+                return
+            if incremental:
+                prices = self.scrape_prices_incremental(products, concurrency, time_budget)
+            elif concurrency:
+                prices = asyncio.run(self.scrape_prices_async(products, concurrency))
+            else:
+                prices = self.scrape_prices(products)
+            self.scraper.close()
+        finally:
+            # Also when the scrape fails or finds nothing
+            self.history.stop_compaction()
         if not prices:
             print("No prices found.")
             return
         
-        # Save prices
-        self.save_prices(prices)
+        # Save prices, noting which ones are fallbacks for stores that were down
+        stale = self.stale_pairs(prices)
+        self.save_prices(prices, stale)
         
         # Compare prices
         comparison_results = self.compare_prices(prices)
@@ -111,10 +309,9 @@ class PriceComparisonApp:
         self.display_best_deals(comparison_results)
         
         # Generate report
-        report = self.generate_report(comparison_results)
+        report = self.generate_report(comparison_results, stale)
         report_file = self.data_dir / "price_report.txt"
-        with open(report_file, 'w') as f:
-            f.write(report)
+        atomic_write(report_file, report)
         print(f"\nReport saved to {report_file}")
 
 
@@ -0,0 +1,115 @@
+"""
+Parallel Compare Module
+Splits a price matrix into product shards compared on a process pool.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from comparison_engine import MatrixComparison, matrix_statistics, store_order
+
+
+# Per-row statistics written by the workers, in block order
+_OUTPUTS = (
+    ('min_price', np.float64),
+    ('max_price', np.float64),
+    ('total', np.float64),
+    ('sum_squares', np.float64),
+    ('median_price', np.float64),
+    ('best_store_index', np.intp),
+    ('count', np.intp),
+)
+
+
+def _output_views(buffer, rows: int) -> Dict[str, np.ndarray]:
+    """Lay the per-row output arrays out over one shared buffer."""
+    views = {}
+    offset = 0
+    for name, dtype in _OUTPUTS:
+        views[name] = np.ndarray((rows,), dtype=dtype, buffer=buffer, offset=offset)
+        offset += rows * np.dtype(dtype).itemsize
+    return views
+
+
+def _output_nbytes(rows: int) -> int:
+    """Size of the shared output block for ``rows`` products."""
+    return sum(rows * np.dtype(dtype).itemsize for _, dtype in _OUTPUTS)
+
+
+def _compare_shard(input_name: str, shape: Tuple[int, int], dtype: str,
+                   output_name: str, start: int, stop: int, column_order: List[int]) -> None:
+    """Compute statistics for rows [start, stop) straight into shared memory."""
+    source = shared_memory.SharedMemory(name=input_name)
+    target = shared_memory.SharedMemory(name=output_name)
+    try:
+        prices = np.ndarray(shape, dtype=dtype, buffer=source.buf, order='F')
+        outputs = _output_views(target.buf, shape[0])
+        matrix_statistics(
+            prices[start:stop],
+            out={name: view[start:stop] for name, view in outputs.items()},
+            column_order=column_order
+        )
+        del prices, outputs
+    finally:
+        source.close()
+        target.close()
+
+
+def compare_parallel(products: List[str], stores: List[str], prices: np.ndarray,
+                     workers: Optional[int] = None,
+                     shards: Optional[int] = None) -> MatrixComparison:
+    """
+    Compare a product × store price matrix on a process pool.
+    
+    The matrix is placed in shared memory once, in column-major order;
+    each worker attaches to it and to a shared output block and fills the
+    statistics for its product range in place, so no price data is
+    pickled. Requires Python 3.8+ for ``multiprocessing.shared_memory``.
+    
+    Args:
+        products: Product name of each row
+        stores: Store name of each column
+        prices: 2-D price matrix with NaN where a store has no price
+        workers: Number of worker processes (default: CPU count)
+        shards: Number of product ranges to split into (default: 4 per worker)
+        
+    Returns:
+        Vectorized results, identical to ComparisonEngine.compare_matrix
+    """
+    prices = np.asarray(prices)
+    rows = prices.shape[0]
+    workers = workers or os.cpu_count() or 1
+    shards = max(1, min(shards or workers * 4, rows or 1))
+    
+    source = shared_memory.SharedMemory(create=True, size=max(1, prices.nbytes))
+    target = shared_memory.SharedMemory(create=True, size=max(1, _output_nbytes(rows)))
+    try:
+        shared = np.ndarray(prices.shape, dtype=prices.dtype, buffer=source.buf, order='F')
+        shared[...] = prices
+        del shared
+        
+        bounds = np.linspace(0, rows, shards + 1).astype(int).tolist()
+        column_order = store_order(stores)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_compare_shard, source.name, prices.shape, prices.dtype.str,
+                            target.name, start, stop, column_order)
+                for start, stop in zip(bounds[:-1], bounds[1:])
+                if stop > start
+            ]
+            for future in futures:
+                future.result()
+        
+        # Copy the merged per-row results out before the block is freed
+        statistics = {name: view.copy() for name, view in _output_views(target.buf, rows).items()}
+    finally:
+        source.close()
+        source.unlink()
+        target.close()
+        target.unlink()
+    
+    return MatrixComparison(products, stores, prices, statistics)
@@ -0,0 +1,692 @@
+"""
+Price History Module
+Append-only log of every scraped price, delta-encoded and compressed in
+daily segments, with old days compacted to daily min/max/close.
+"""
+
+import json
+import os
+import threading
+import zlib
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from durable_io import atomic_open
+
+
+class PriceHistory:
+    """
+    Append-only store of timestamped (product, store, price) snapshots.
+    
+    Each snapshot is appended to the segment for its day (``YYYY-MM-DD.seg``)
+    as zlib-compressed blocks. The first snapshot of a day, and every
+    ``keyframe_every``-th one after it, is a keyframe holding every price,
+    split into chunks of ``keyframe_chunk`` products sorted by name. The
+    others are deltas holding only the (product, store) cells that changed,
+    with ``None`` for prices that disappeared. Since most prices don't
+    change between snapshots, deltas are a small fraction of a keyframe.
+    
+    A sidecar index (``YYYY-MM-DD.idx``) gets one tab-separated
+    ``timestamp, offset, length, kind, last product`` line (ending in a
+    tab, so torn lines can be told apart) per block. Appending touches only
+    the end of those two files. Reads pick segments by day from their file
+    names and replay the day from its keyframes; a product lookup only
+    decompresses the keyframe chunk whose name range holds the product.
+    
+    ``compact`` downsamples days older than ``raw_days`` to one
+    ``YYYY-MM-DD.daily`` file of min/max/close prices per (product, store)
+    and deletes days older than ``daily_days``. ``start_compaction`` runs it
+    on a background thread. Only one process should append at a time, since
+    deltas are computed against the last appended snapshot.
+    """
+    
+    SEGMENT_SUFFIX = '.seg'
+    INDEX_SUFFIX = '.idx'
+    DAILY_SUFFIX = '.daily'
+    
+    def __init__(self, directory: Union[str, Path], keyframe_every: int = 24,
+                 keyframe_chunk: int = 100, raw_days: int = 30,
+                 daily_days: Optional[int] = None, compression_level: int = 6):
+        """
+        Initialize the store.
+        
+        Args:
+            directory: Directory holding the segment, index and daily files
+            keyframe_every: Delta snapshots between keyframes within a day
+            keyframe_chunk: Products per compressed keyframe block
+            raw_days: Days of full-resolution history kept by ``compact``
+            daily_days: Days of daily history kept by ``compact`` (None: forever)
+            compression_level: zlib level for new blocks
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.keyframe_every = max(1, keyframe_every)
+        self.keyframe_chunk = max(1, keyframe_chunk)
+        self.raw_days = max(1, raw_days)
+        self.daily_days = daily_days
+        self.compression_level = compression_level
+        # Complete index lines read so far, by segment day
+        self._indexes: Dict[str, bytes] = {}
+        # Day, prices and deltas since the keyframe of the last append
+        self._state: Optional[Tuple[str, Dict[str, Dict[str, float]], int]] = None
+        # Reentrant: append rebuilds its state through _index under the lock
+        self._lock = threading.RLock()
+        self._compactor: Optional[threading.Thread] = None
+        self._stop_compaction = threading.Event()
+    
+    @staticmethod
+    def _parse_time(value: Union[str, datetime]) -> datetime:
+        """Accept an ISO timestamp string or a datetime."""
+        return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+    
+    def _segment_path(self, day: str) -> Path:
+        """Path of the compressed blocks segment for a day."""
+        return self.directory / f"{day}{self.SEGMENT_SUFFIX}"
+    
+    def _index_path(self, day: str) -> Path:
+        """Path of the block index for a day."""
+        return self.directory / f"{day}{self.INDEX_SUFFIX}"
+    
+    def _daily_path(self, day: str) -> Path:
+        """Path of the downsampled prices for a compacted day."""
+        return self.directory / f"{day}{self.DAILY_SUFFIX}"
+    
+    def append(self, prices: Dict[str, Dict[str, float]],
+               timestamp: Optional[Union[str, datetime]] = None,
+               stale: Iterable[Tuple[str, str]] = ()) -> int:
+        """
+        Append one snapshot of prices.
+        
+        Args:
+            prices: ``{product: {store: price}}`` dictionary
+            timestamp: When the prices were scraped (default: now)
+            stale: (product, store) pairs whose price is a fallback from an
+                earlier scrape; they are left out, so a store outage shows
+                as a gap in the history rather than as an unchanged price
+        
+        Returns:
+            Number of (product, store) cells written
+        """
+        moment = self._parse_time(timestamp) if timestamp else datetime.now()
+        stamp = moment.isoformat()
+        day = moment.date().isoformat()
+        stale = set(stale)
+        current = {
+            product_name: {
+                store: price for store, price in store_prices.items()
+                if price is not None and (product_name, store) not in stale
+            }
+            for product_name, store_prices in prices.items()
+        }
+        current = {product_name: store_prices for product_name, store_prices in current.items() if store_prices}
+        
+        with self._lock:
+            if self._state is None or self._state[0] != day:
+                self._state = self._last_state(day)
+            state = self._state
+            # Forget the state until the write succeeds
+            self._state = None
+            
+            if state is None or state[2] + 1 >= self.keyframe_every:
+                blocks, cells = self._keyframe(current)
+                deltas = 0
+            else:
+                changes = _changes(state[1], current)
+                blocks = [('d', '', _encode(changes, self.compression_level))]
+                cells = len(changes)
+                deltas = state[2] + 1
+            
+            with open(self._segment_path(day), 'ab') as f:
+                base = f.tell()
+                f.write(b"".join(blob for _, _, blob in blocks))
+            # The index is written after the blocks it points to, so a crash
+            # in between leaves unindexed blocks rather than dangling entries
+            lines = []
+            offset = base
+            for kind, last, blob in blocks:
+                lines.append(f"{stamp}\t{offset}\t{len(blob)}\t{kind}\t{json.dumps(last)}\t\n")
+                offset += len(blob)
+            with open(self._index_path(day), 'a+b') as f:
+                size = f.seek(0, os.SEEK_END)
+                if size:
+                    f.seek(size - 1)
+                    if f.read(1) != b"\n":
+                        # Terminate a line torn by an interrupted append
+                        f.write(b"\n")
+                f.write("".join(lines).encode('utf-8'))
+            self._state = (day, current, deltas)
+        return cells
+    
+    def _keyframe(self, prices: Dict[str, Dict[str, float]]) -> Tuple[List[Tuple[str, str, bytes]], int]:
+        """Encode a full snapshot as chunks of products sorted by name."""
+        names = sorted(prices)
+        blocks = []
+        cells = 0
+        for start in range(0, len(names), self.keyframe_chunk):
+            chunk = names[start:start + self.keyframe_chunk]
+            rows = [
+                (product_name, store, price)
+                for product_name in chunk
+                for store, price in prices[product_name].items()
+            ]
+            cells += len(rows)
+            blocks.append(('k', chunk[-1], _encode(rows, self.compression_level)))
+        if not blocks:
+            # An empty snapshot still records its timestamp
+            blocks.append(('k', '', _encode([], self.compression_level)))
+        return blocks, cells
+    
+    def _last_state(self, day: str) -> Optional[Tuple[str, Dict[str, Dict[str, float]], int]]:
+        """Rebuild the latest snapshot of a day from its segment, if it has one."""
+        entries = self._entries(self._index(day))
+        if not entries:
+            return None
+        # Replay from the last keyframe only
+        start = len(entries) - 1
+        while start > 0 and entries[start][3] != 'k':
+            start -= 1
+        while start > 0 and entries[start - 1][3] == 'k' and entries[start - 1][0] == entries[start][0]:
+            start -= 1
+        state: Dict[str, Dict[str, float]] = {}
+        deltas = -1
+        for stamp, prices in self._replay(day, entries[start:]):
+            state = prices
+            deltas += 1
+        return day, state, max(deltas, 0)
+    
+    def days(self, since: Optional[Union[str, datetime]] = None,
+             until: Optional[Union[str, datetime]] = None) -> List[str]:
+        """List the days that have history, oldest first, within [since, until]."""
+        first = self._parse_time(since).date().isoformat() if since else None
+        last = self._parse_time(until).date().isoformat() if until else None
+        days = sorted({
+            path.name[:-len(path.suffix)]
+            for suffix in (self.SEGMENT_SUFFIX, self.DAILY_SUFFIX)
+            for path in self.directory.glob(f"*{suffix}")
+        })
+        return [
+            day for day in days
+            if (first is None or day >= first) and (last is None or day <= last)
+        ]
+    
+    def _index(self, day: str) -> bytes:
+        """
+        Get a segment's index, reading only what was appended since last time.
+        
+        A partially written last line is left for the next read.
+        """
+        path = self._index_path(day)
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            return b""
+        with self._lock:
+            data = self._indexes.get(day, b"")
+            if len(data) != size:
+                with open(path, 'rb') as f:
+                    f.seek(len(data))
+                    tail = f.read()
+                data += tail[:tail.rfind(b"\n") + 1]
+                self._indexes[day] = data
+            return data
+    
+    @staticmethod
+    def _entries(index: bytes) -> List[Tuple[str, int, int, str, str]]:
+        """Parse index lines into (timestamp, offset, length, kind, last product), in append order."""
+        entries = []
+        for line in index.decode('utf-8').splitlines():
+            fields = line.split('\t')
+            # Complete lines end with a tab; torn ones are skipped
+            if len(fields) == 6 and fields[5] == '':
+                entries.append((fields[0], int(fields[1]), int(fields[2]), fields[3], json.loads(fields[4])))
+        return entries
+    
+    def _read_blocks(self, day: str, entries: List[Tuple[str, int, int, str, str]]) -> Tuple[bytes, int]:
+        """Read the part of a segment that holds the given blocks, and its offset."""
+        if not entries:
+            return b"", 0
+        start = min(entry[1] for entry in entries)
+        with open(self._segment_path(day), 'rb') as f:
+            f.seek(start)
+            return f.read(max(entry[1] + entry[2] for entry in entries) - start), start
+    
+    def _replay(self, day: str, entries: Optional[List[Tuple[str, int, int, str, str]]] = None
+                ) -> Iterator[Tuple[str, Dict[str, Dict[str, float]]]]:
+        """
+        Rebuild every snapshot of a raw day in order.
+        
+        The yielded dict is the live replay state; copy it to keep it.
+        """
+        if entries is None:
+            entries = self._entries(self._index(day))
+        if not entries:
+            return
+        data, base = self._read_blocks(day, entries)
+        
+        state: Dict[str, Dict[str, float]] = {}
+        current_stamp = None
+        previous_kind = None
+        for stamp, offset, length, kind, _ in entries:
+            if stamp != current_stamp:
+                if current_stamp is not None:
+                    yield current_stamp, state
+                current_stamp = stamp
+                previous_kind = None
+            if kind == 'k' and previous_kind != 'k':
+                # A new keyframe replaces everything before it
+                state = {}
+            previous_kind = kind
+            for product_name, store, price in _decode(data[offset - base:offset - base + length]):
+                if price is None:
+                    store_prices = state.get(product_name)
+                    if store_prices is not None:
+                        store_prices.pop(store, None)
+                        if not store_prices:
+                            del state[product_name]
+                else:
+                    state.setdefault(product_name, {})[store] = price
+        yield current_stamp, state
+    
+    def _product_replay(self, day: str, product_name: str) -> Iterator[Tuple[str, Dict[str, float]]]:
+        """
+        Rebuild one product's prices at every snapshot of a raw day,
+        decompressing only the keyframe chunk that can hold it.
+        """
+        entries = self._entries(self._index(day))
+        if not entries:
+            return
+        wanted = []
+        in_keyframe = False
+        found = False
+        for entry in entries:
+            if entry[3] == 'k':
+                if not in_keyframe or entry[0] != wanted[-1][0]:
+                    found = False
+                in_keyframe = True
+                # Chunks are sorted, so the first one ending at or after the
+                # product is the only one that can hold it
+                if not found and product_name <= entry[4]:
+                    found = True
+                    wanted.append(entry)
+                    continue
+                wanted.append(entry[:2] + (0,) + entry[3:])
+            else:
+                in_keyframe = False
+                wanted.append(entry)
+        data, base = self._read_blocks(day, [entry for entry in wanted if entry[2]])
+        
+        store_prices: Dict[str, float] = {}
+        current_stamp = None
+        previous_kind = None
+        for stamp, offset, length, kind, _ in wanted:
+            if stamp != current_stamp:
+                if current_stamp is not None:
+                    yield current_stamp, store_prices
+                current_stamp = stamp
+                previous_kind = None
+            if kind == 'k' and previous_kind != 'k':
+                store_prices = {}
+            previous_kind = kind
+            if not length:
+                continue
+            for store, price in _product_rows(data[offset - base:offset - base + length], product_name):
+                if price is None:
+                    store_prices.pop(store, None)
+                else:
+                    store_prices[store] = price
+        yield current_stamp, store_prices
+    
+    def _write_daily(self, day: str, stamp: str, bars: Dict[Tuple[str, str], List[float]]) -> None:
+        """
+        Write a compacted day: a JSON header line with the close timestamp
+        and the (last product, length) of each chunk, then the chunks of
+        (product, store, close, min, max) rows, sorted by product. Most
+        prices don't move within a day, so min and max are left out when
+        they equal the close.
+        """
+        by_product: Dict[str, List[tuple]] = {}
+        for (product_name, store), (low, high, close) in bars.items():
+            row = (product_name, store, close) if low == high else (product_name, store, close, low, high)
+            by_product.setdefault(product_name, []).append(row)
+        names = sorted(by_product)
+        chunks = []
+        for start in range(0, len(names), self.keyframe_chunk):
+            chunk = names[start:start + self.keyframe_chunk]
+            rows = [row for product_name in chunk for row in by_product[product_name]]
+            chunks.append((chunk[-1], _encode(rows, self.compression_level)))
+        header = {'t': stamp, 'c': [[last, len(blob)] for last, blob in chunks]}
+        
+        with atomic_open(self._daily_path(day), 'wb') as f:
+            f.write(json.dumps(header).encode('utf-8') + b"\n")
+            f.write(b"".join(blob for _, blob in chunks))
+    
+    def _read_daily(self, day: str, product_name: Optional[str] = None
+                    ) -> Tuple[str, List[Tuple[str, str, float, float, float]]]:
+        """
+        Read a compacted day as its close timestamp and (product, store,
+        min, max, close) rows, only decompressing the chunk that can hold
+        ``product_name`` if given.
+        """
+        with open(self._daily_path(day), 'rb') as f:
+            header = json.loads(f.readline().decode('utf-8'))
+            if product_name is None:
+                rows = []
+                for _, length in header['c']:
+                    rows.extend(_decode(f.read(length)))
+            else:
+                rows = []
+                for last, length in header['c']:
+                    if product_name <= last:
+                        rows = [(product_name, *row) for row in _product_rows(f.read(length), product_name)]
+                        break
+                    f.seek(length, os.SEEK_CUR)
+        return header['t'], [_daily_row(*row) for row in rows]
+    
+    def product_history(self, product_name: str,
+                        since: Optional[Union[str, datetime]] = None,
+                        until: Optional[Union[str, datetime]] = None
+                        ) -> List[Tuple[str, str, float]]:
+        """
+        Get every recorded price of one product, oldest first.
+        
+        Compacted days give one row per store: the day's closing price.
+        
+        Args:
+            product_name: Product to look up
+            since: Earliest timestamp to include
+            until: Latest timestamp to include
+        
+        Returns:
+            List of (timestamp, store, price) rows
+        """
+        since_stamp = self._parse_time(since).isoformat() if since else None
+        until_stamp = self._parse_time(until).isoformat() if until else None
+        
+        def wanted(stamp):
+            return (since_stamp is None or stamp >= since_stamp) and (until_stamp is None or stamp <= until_stamp)
+        
+        rows = []
+        for day in self.days(since, until):
+            if self._daily_path(day).exists():
+                stamp, daily = self._read_daily(day, product_name)
+                if wanted(stamp):
+                    rows.extend(
+                        (stamp, store, close)
+                        for row_product, store, _, _, close in daily
+                        if row_product == product_name
+                    )
+                continue
+            for stamp, store_prices in self._product_replay(day, product_name):
+                if wanted(stamp):
+                    rows.extend((stamp, store, price) for store, price in store_prices.items())
+        return rows
+    
+    def recent_history(self, product_name: str, days: float = 90) -> List[Tuple[str, str, float]]:
+        """Get one product's prices over the last ``days`` days."""
+        return self.product_history(product_name, since=datetime.now() - timedelta(days=days))
+    
+    def snapshots(self, since: Optional[Union[str, datetime]] = None,
+                  until: Optional[Union[str, datetime]] = None
+                  ) -> Iterator[Tuple[str, Dict[str, Dict[str, float]]]]:
+        """
+        Replay appended snapshots in order, e.g. for PriceDropDetector.
+        
+        Compacted days give one snapshot of closing prices.
+        
+        Args:
+            since: Earliest timestamp to include
+            until: Latest timestamp to include
+        
+        Yields:
+            (timestamp, ``{product: {store: price}}``) pairs
+        """
+        since_stamp = self._parse_time(since).isoformat() if since else None
+        until_stamp = self._parse_time(until).isoformat() if until else None
+        for day in self.days(since, until):
+            if self._daily_path(day).exists():
+                stamp, daily = self._read_daily(day)
+                replay = [(stamp, _group((product_name, store, close) for product_name, store, _, _, close in daily))]
+            else:
+                replay = self._replay(day)
+            for stamp, prices in replay:
+                if (since_stamp is None or stamp >= since_stamp) and (until_stamp is None or stamp <= until_stamp) and prices:
+                    yield stamp, {product_name: dict(store_prices) for product_name, store_prices in prices.items()}
+    
+    def _bars(self, day: str) -> Tuple[str, Dict[Tuple[str, str], List[float]]]:
+        """
+        Get the close timestamp and [min, max, close] of every (product,
+        store) in the last snapshot of a raw day.
+        
+        Unchanged cells keep their price, so every stored row (keyframe or
+        delta) is a price change and the bars can be folded over the rows
+        without rebuilding each snapshot. Cells removed by a delta, or left
+        out of a later keyframe, are dropped unless they come back, so the
+        compacted day replays as the day's last snapshot.
+        """
+        entries = self._entries(self._index(day))
+        data, base = self._read_blocks(day, entries)
+        bars: Dict[Tuple[str, str], List[float]] = {}
+        live = set()
+        current_stamp = None
+        previous_kind = None
+        for stamp, offset, length, kind, _ in entries:
+            if stamp != current_stamp:
+                current_stamp = stamp
+                previous_kind = None
+            if kind == 'k' and previous_kind != 'k':
+                # A new keyframe replaces everything before it
+                live = set()
+            previous_kind = kind
+            for product_name, store, price in _decode(data[offset - base:offset - base + length]):
+                cell = (product_name, store)
+                if price is None:
+                    live.discard(cell)
+                    continue
+                live.add(cell)
+                bar = bars.get(cell)
+                if bar is None:
+                    bars[cell] = [price, price, price]
+                else:
+                    if price < bar[0]:
+                        bar[0] = price
+                    elif price > bar[1]:
+                        bar[1] = price
+                    bar[2] = price
+        return entries[-1][0], {cell: bar for cell, bar in bars.items() if cell in live}
+    
+    def daily_bars(self, product_name: str,
+                   since: Optional[Union[str, datetime]] = None,
+                   until: Optional[Union[str, datetime]] = None
+                   ) -> List[Tuple[str, str, float, float, float]]:
+        """
+        Get one product's daily lowest, highest and closing price per store.
+        
+        Args:
+            product_name: Product to look up
+            since: Earliest day to include
+            until: Latest day to include
+        
+        Returns:
+            List of (day, store, min, max, close) rows, oldest first
+        """
+        rows = []
+        for day in self.days(since, until):
+            if self._daily_path(day).exists():
+                _, daily = self._read_daily(day, product_name)
+                rows.extend(
+                    (day, store, low, high, close)
+                    for row_product, store, low, high, close in daily
+                    if row_product == product_name
+                )
+                continue
+            if not self._entries(self._index(day)):
+                continue
+            _, bars = self._bars(day)
+            rows.extend(
+                (day, store, low, high, close)
+                for (row_product, store), (low, high, close) in bars.items()
+                if row_product == product_name
+            )
+        return rows
+    
+    def compact(self, now: Optional[Union[str, datetime]] = None) -> Dict[str, int]:
+        """
+        Apply the retention policy.
+        
+        Raw days older than ``raw_days`` are replaced by a daily file of
+        min/max/close prices, and days older than ``daily_days`` are
+        deleted. The daily file is written atomically before the raw
+        segment is removed, so an interrupted compaction is finished by
+        the next one.
+        
+        Args:
+            now: Reference time for the ages (default: now)
+        
+        Returns:
+            Dictionary with the number of days downsampled and deleted
+        """
+        today = (self._parse_time(now) if now else datetime.now()).date()
+        result = {'downsampled': 0, 'deleted': 0}
+        for day in self.days():
+            age = (today - date.fromisoformat(day)).days
+            if self.daily_days is not None and age > self.daily_days:
+                self._remove(day, self._daily_path(day))
+                result['deleted'] += 1
+            elif age > self.raw_days and self._segment_path(day).exists():
+                daily_path = self._daily_path(day)
+                if not daily_path.exists() and self._entries(self._index(day)):
+                    self._write_daily(day, *self._bars(day))
+                self._remove(day)
+                result['downsampled'] += 1
+        return result
+    
+    def _remove(self, day: str, *paths: Path) -> None:
+        """Delete a day's raw segment and index, plus any extra files."""
+        with self._lock:
+            for path in (self._segment_path(day), self._index_path(day)) + paths:
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+            self._indexes.pop(day, None)
+            if self._state is not None and self._state[0] == day:
+                self._state = None
+    
+    def start_compaction(self, interval: float = 3600) -> threading.Thread:
+        """
+        Run ``compact`` now and then every ``interval`` seconds on a daemon thread.
+        
+        Returns:
+            The compaction thread (the running one if already started)
+        """
+        if self._compactor is not None and self._compactor.is_alive():
+            return self._compactor
+        self._stop_compaction = threading.Event()
+        self._compactor = threading.Thread(
+            target=self._compaction_loop, args=(interval, self._stop_compaction),
+            name='price-history-compaction', daemon=True
+        )
+        self._compactor.start()
+        return self._compactor
+    
+    def stop_compaction(self) -> None:
+        """Stop the compaction thread, waiting for a pass in progress to finish."""
+        self._stop_compaction.set()
+        if self._compactor is not None:
+            self._compactor.join()
+            self._compactor = None
+    
+    def _compaction_loop(self, interval: float, stop: threading.Event) -> None:
+        """Compact until ``stop`` is set."""
+        while not stop.is_set():
+            try:
+                self.compact()
+            except (OSError, ValueError) as e:
+                print(f"Error compacting price history: {e}")
+            stop.wait(interval)
+
+
+def _changes(old: Dict[str, Dict[str, float]],
+             new: Dict[str, Dict[str, float]]) -> List[Tuple[str, str, Optional[float]]]:
+    """Get the cells that differ between two snapshots, with None for removed prices."""
+    changes = []
+    for product_name, store_prices in new.items():
+        old_prices = old.get(product_name, {})
+        for store, price in store_prices.items():
+            if old_prices.get(store) != price:
+                changes.append((product_name, store, price))
+    for product_name, old_prices in old.items():
+        store_prices = new.get(product_name, {})
+        for store in old_prices:
+            if store not in store_prices:
+                changes.append((product_name, store, None))
+    return changes
+
+
+def _encode(rows: Iterable[tuple], level: int) -> bytes:
+    """
+    Compress (product, store, *values) rows as one block.
+    
+    Product and store names are stored once per block and rows refer to
+    them by position, which keeps the JSON small before compression.
+    """
+    products: Dict[str, int] = {}
+    stores: Dict[str, int] = {}
+    table = []
+    for product_name, store, *values in rows:
+        table.append([
+            products.setdefault(product_name, len(products)),
+            stores.setdefault(store, len(stores))
+        ] + values)
+    payload = {'p': list(products), 's': list(stores), 'r': table}
+    return zlib.compress(json.dumps(payload, separators=(',', ':')).encode('utf-8'), level)
+
+
+def _load(blob: bytes) -> Dict[str, Any]:
+    """Decompress a block into its payload."""
+    return json.loads(zlib.decompress(blob).decode('utf-8'))
+
+
+def _rows(payload: Dict[str, Any]) -> List[tuple]:
+    """Expand a payload's rows back to (product, store, *values) tuples."""
+    products, stores = payload['p'], payload['s']
+    return [(products[row[0]], stores[row[1]], *row[2:]) for row in payload['r']]
+
+
+def _decode(blob: bytes) -> List[tuple]:
+    """Decompress a block into (product, store, price) rows."""
+    return _rows(_load(blob))
+
+
+def _daily_row(product_name: str, store: str, close: float, low: Optional[float] = None,
+               high: Optional[float] = None) -> Tuple[str, str, float, float, float]:
+    """Expand a stored daily row to (product, store, min, max, close)."""
+    if low is None:
+        return product_name, store, close, close, close
+    return product_name, store, low, high, close
+
+
+def _product_rows(blob: bytes, product_name: str) -> List[tuple]:
+    """
+    Decompress a block and get one product's (store, *values) rows,
+    skipping the JSON parse when the product's name isn't in the block.
+    """
+    raw = zlib.decompress(blob)
+    if json.dumps(product_name).encode('utf-8') not in raw:
+        return []
+    payload = json.loads(raw.decode('utf-8'))
+    try:
+        position = payload['p'].index(product_name)
+    except ValueError:
+        return []
+    stores = payload['s']
+    return [(stores[row[1]], *row[2:]) for row in payload['r'] if row[0] == position]
+
+
+def _group(rows: Iterable[Tuple[str, str, float]]) -> Dict[str, Dict[str, float]]:
+    """Group (product, store, price) rows as ``{product: {store: price}}``."""
+    prices: Dict[str, Dict[str, float]] = {}
+    for product_name, store, price in rows:
+        prices.setdefault(product_name, {})[store] = price
+    return prices
@@ -0,0 +1,118 @@
+"""
+Price Index Module
+Sorted best-price and savings keys for fast range and top-N queries.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+
+class PriceIndex:
+    """
+    Index over comparison results, sorted by best price and by savings.
+    
+    Range queries on best price are two bisects and a slice; the top-k
+    products by savings (``price_range``) are the first k entries of the
+    savings order. Both orders are by (key, product name), so products
+    tied on a key come out in name order and an update can bisect
+    straight to a product's entry. Entries can be updated one product at
+    a time.
+    """
+    
+    def __init__(self):
+        self._prices: List[float] = []
+        self._price_products: List[str] = []
+        # Savings are stored negated so ascending order means biggest first
+        self._savings: List[float] = []
+        self._savings_products: List[str] = []
+        self._entries: Dict[str, Tuple[float, float]] = {}
+    
+    @classmethod
+    def build(cls, comparison_results: Mapping[str, Any]) -> 'PriceIndex':
+        """Build an index over a full set of comparison results."""
+        index = cls()
+        if hasattr(comparison_results, 'min_price'):
+            # Vectorized results: sort the arrays directly
+            rows = comparison_results.rows
+            products = np.asarray(comparison_results.products, dtype=object)[rows]
+            prices = comparison_results.min_price[rows]
+            if comparison_results.prices.dtype != np.float64:
+                # Match the whole-cent prices MatrixComparison.result reports
+                prices = prices.round(2)
+            savings = -comparison_results.price_range[rows].round(2)
+        else:
+            products = np.asarray(list(comparison_results), dtype=object)
+            prices = np.array([r['best_deal']['price'] for r in comparison_results.values()], dtype=float)
+            savings = -np.array([r['statistics']['price_range'] for r in comparison_results.values()], dtype=float)
+        
+        # Put products in name order, so stable key sorts order ties by name
+        if len(products) > 1 and not (products[:-1] <= products[1:]).all():
+            by_name = np.argsort(products.astype(str), kind='stable')
+            products, prices, savings = products[by_name], prices[by_name], savings[by_name]
+        by_price = np.argsort(prices, kind='stable')
+        by_savings = np.argsort(savings, kind='stable')
+        index._prices = prices[by_price].tolist()
+        index._price_products = products[by_price].tolist()
+        index._savings = savings[by_savings].tolist()
+        index._savings_products = products[by_savings].tolist()
+        index._entries = dict(zip(products.tolist(), zip(prices.tolist(), savings.tolist())))
+        return index
+    
+    @staticmethod
+    def _position(keys: List[float], products: List[str], key: float, product_name: str) -> int:
+        """Bisect to (key, product_name) in a sorted key list and its parallel product list."""
+        low = bisect_left(keys, key)
+        high = bisect_right(keys, key, low)
+        # Products sharing a key are in name order
+        return bisect_left(products, product_name, low, high)
+    
+    @classmethod
+    def _remove(cls, keys: List[float], products: List[str], key: float, product_name: str) -> None:
+        """Remove one product from a sorted key list and its parallel product list."""
+        position = cls._position(keys, products, key, product_name)
+        del keys[position]
+        del products[position]
+    
+    @classmethod
+    def _insert(cls, keys: List[float], products: List[str], key: float, product_name: str) -> None:
+        """Insert one product into a sorted key list and its parallel product list."""
+        position = cls._position(keys, products, key, product_name)
+        keys.insert(position, key)
+        products.insert(position, product_name)
+    
+    def update(self, product_name: str, result: Optional[Dict[str, Any]]) -> None:
+        """Re-index one product from its new result, or drop it if the result is None."""
+        old = self._entries.pop(product_name, None)
+        if old is not None:
+            self._remove(self._prices, self._price_products, old[0], product_name)
+            self._remove(self._savings, self._savings_products, old[1], product_name)
+        if result is None:
+            return
+        
+        price = result['best_deal']['price']
+        savings = -result['statistics']['price_range']
+        self._insert(self._prices, self._price_products, price, product_name)
+        self._insert(self._savings, self._savings_products, savings, product_name)
+        self._entries[product_name] = (price, savings)
+    
+    def in_price_range(self, min_price: float, max_price: float) -> List[str]:
+        """Get products whose best price is within [min_price, max_price], cheapest first."""
+        low = bisect_left(self._prices, min_price)
+        high = bisect_right(self._prices, max_price)
+        return self._price_products[low:high]
+    
+    def top_savings(self, k: int) -> List[str]:
+        """Get the k products with the largest potential savings, largest first."""
+        return self._savings_products[:max(0, k)]
+    
+    def cheapest(self, k: int) -> List[str]:
+        """Get the k products with the lowest best price, cheapest first."""
+        return self._price_products[:max(0, k)]
+    
+    def __contains__(self, product_name: object) -> bool:
+        return product_name in self._entries
+    
+    def __len__(self) -> int:
+        return len(self._entries)
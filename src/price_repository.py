@@ -0,0 +1,284 @@
+"""
+Price Repository Module
+SQLite-backed storage of current prices and product details for indexed queries.
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from price_snapshot import PriceSnapshot
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    name TEXT PRIMARY KEY,
+    category TEXT,
+    company TEXT,
+    image TEXT
+);
+CREATE TABLE IF NOT EXISTS prices (
+    product TEXT NOT NULL,
+    store TEXT NOT NULL,
+    price REAL NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (product, store)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_prices_store ON prices (store);
+CREATE INDEX IF NOT EXISTS idx_prices_updated_at ON prices (updated_at);
+CREATE INDEX IF NOT EXISTS idx_products_category ON products (category);
+"""
+
+
+class PriceRepository:
+    """
+    Current price of every (product, store) pair in an SQLite database.
+    
+    The database runs in WAL mode, so Streamlit sessions can keep reading
+    while a scrape writes. Each thread gets its own connection. Prices are
+    keyed by (product, store) with indexes on store, update time and
+    product category, and writes are batched upserts in one transaction.
+    """
+    
+    def __init__(self, path: Union[str, Path] = "data/prices.db", batch_size: int = 1000):
+        """
+        Open (and if needed create) the database.
+        
+        Args:
+            path: SQLite database file
+            batch_size: Rows per executemany call when upserting
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = max(1, batch_size)
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # WAL is safe against corruption with NORMAL; only the last
+            # commits can be lost on power failure
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+    
+    def close(self) -> None:
+        """Close this thread's connection."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+    
+    def _executemany(self, conn: sqlite3.Connection, sql: str, rows: Iterable[tuple]) -> int:
+        """Run a statement over rows in batches of ``batch_size``."""
+        count = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                conn.executemany(sql, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            conn.executemany(sql, batch)
+            count += len(batch)
+        return count
+    
+    def upsert_prices(self, prices: Dict[str, Dict[str, float]],
+                      timestamp: Optional[str] = None, replace: bool = False,
+                      stale: Iterable[Tuple[str, str]] = ()) -> int:
+        """
+        Insert or update prices in one transaction.
+        
+        Args:
+            prices: ``{product: {store: price}}`` dictionary
+            timestamp: When the prices were scraped (default: now)
+            replace: ``prices`` is a full snapshot; delete the rows of
+                pairs it doesn't have, in the same transaction
+            stale: (product, store) pairs whose price is a fallback from an
+                earlier scrape; their rows keep the price and update time
+                they have, and are only inserted if missing
+        
+        Returns:
+            Number of prices written
+        """
+        timestamp = timestamp or datetime.now().isoformat()
+        stale = set(stale)
+        rows = [
+            (product_name, store, price, timestamp)
+            for product_name, store_prices in prices.items()
+            for store, price in store_prices.items()
+            if price is not None
+        ]
+        conn = self._connection()
+        with conn:
+            count = self._executemany(
+                conn,
+                "INSERT OR REPLACE INTO prices (product, store, price, updated_at) VALUES (?, ?, ?, ?)",
+                (row for row in rows if row[:2] not in stale)
+            )
+            if stale:
+                count += self._executemany(
+                    conn,
+                    "INSERT OR IGNORE INTO prices (product, store, price, updated_at) VALUES (?, ?, ?, ?)",
+                    (row for row in rows if row[:2] in stale)
+                )
+            if replace:
+                conn.execute("CREATE TEMP TABLE IF NOT EXISTS snapshot_keys (product TEXT, store TEXT)")
+                conn.execute("DELETE FROM snapshot_keys")
+                self._executemany(
+                    conn,
+                    "INSERT INTO snapshot_keys (product, store) VALUES (?, ?)",
+                    (row[:2] for row in rows)
+                )
+                conn.execute(
+                    "DELETE FROM prices WHERE NOT EXISTS (SELECT 1 FROM snapshot_keys k "
+                    "WHERE k.product = prices.product AND k.store = prices.store)"
+                )
+                conn.execute("DELETE FROM snapshot_keys")
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('last_updated', ?)", (timestamp,)
+            )
+        return count
+    
+    def upsert_products(self, products: List[Dict[str, Any]]) -> int:
+        """
+        Insert or update product details from ``products.json`` entries.
+        
+        Args:
+            products: Product dicts with 'name' and optional 'category',
+                'company' and 'image'
+        
+        Returns:
+            Number of products written
+        """
+        rows = (
+            (product.get('name', 'Unknown'), product.get('category'),
+             product.get('company'), product.get('image'))
+            for product in products
+        )
+        conn = self._connection()
+        with conn:
+            return self._executemany(
+                conn,
+                "INSERT OR REPLACE INTO products (name, category, company, image) VALUES (?, ?, ?, ?)",
+                rows
+            )
+    
+    def import_json(self, path: Union[str, Path]) -> int:
+        """
+        Load a ``prices.json`` file into the database.
+        
+        Args:
+            path: Path to the prices file
+        
+        Returns:
+            Number of prices written
+        """
+        with open(path, 'r') as f:
+            data = json.load(f)
+        return self.upsert_prices(data.get('prices', {}), data.get('timestamp'))
+    
+    def _query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        """Run a read query on this thread's connection."""
+        return self._connection().execute(sql, params).fetchall()
+    
+    @staticmethod
+    def _group(rows: Iterable[Tuple[str, str, float]]) -> Dict[str, Dict[str, float]]:
+        """Group (product, store, price) rows as ``{product: {store: price}}``."""
+        prices: Dict[str, Dict[str, float]] = {}
+        for product_name, store, price in rows:
+            prices.setdefault(product_name, {})[store] = price
+        return prices
+    
+    def last_updated(self) -> Optional[str]:
+        """Timestamp of the most recent upsert."""
+        rows = self._query("SELECT value FROM meta WHERE key = 'last_updated'")
+        return rows[0][0] if rows else None
+    
+    def summary(self) -> Dict[str, Any]:
+        """Get product, store and price counts and the last update time."""
+        # Separate queries, so each can be answered from its own index
+        return {
+            'products': self._query("SELECT COUNT(DISTINCT product) FROM prices")[0][0],
+            'stores': self._query("SELECT COUNT(DISTINCT store) FROM prices")[0][0],
+            'prices': self._query("SELECT COUNT(*) FROM prices")[0][0],
+            'last_updated': self.last_updated()
+        }
+    
+    def stores(self) -> List[str]:
+        """List every store with a price."""
+        return [row[0] for row in self._query("SELECT DISTINCT store FROM prices ORDER BY store")]
+    
+    def categories(self) -> List[str]:
+        """List every product category."""
+        return [
+            row[0] for row in self._query(
+                "SELECT DISTINCT category FROM products WHERE category IS NOT NULL ORDER BY category"
+            )
+        ]
+    
+    def product_prices(self, product_name: str) -> Dict[str, float]:
+        """Get one product's price at each store."""
+        return dict(self._query(
+            "SELECT store, price FROM prices WHERE product = ?", (product_name,)
+        ))
+    
+    def get_prices(self, products: Optional[List[str]] = None, store: Optional[str] = None,
+                   category: Optional[str] = None, since: Optional[str] = None,
+                   min_price: Optional[float] = None,
+                   max_price: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Get prices matching every given filter.
+        
+        Args:
+            products: Only these products
+            store: Only this store
+            category: Only products in this category
+            since: Only prices updated at or after this ISO timestamp
+            min_price: Lowest price to include
+            max_price: Highest price to include
+        
+        Returns:
+            ``{product: {store: price}}`` dictionary
+        """
+        sql = "SELECT prices.product, prices.store, prices.price FROM prices"
+        clauses, params = [], []
+        if category is not None:
+            sql += " JOIN products ON products.name = prices.product"
+            clauses.append("products.category = ?")
+            params.append(category)
+        if products is not None:
+            clauses.append(f"prices.product IN ({', '.join('?' * len(products))})")
+            params.extend(products)
+        if store is not None:
+            clauses.append("prices.store = ?")
+            params.append(store)
+        if since is not None:
+            clauses.append("prices.updated_at >= ?")
+            params.append(since)
+        if min_price is not None:
+            clauses.append("prices.price >= ?")
+            params.append(min_price)
+        if max_price is not None:
+            clauses.append("prices.price <= ?")
+            params.append(max_price)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        return self._group(self._query(sql, tuple(params)))
+    
+    def load_snapshot(self, **filters) -> PriceSnapshot:
+        """Get prices matching ``filters`` (see get_prices) as a PriceSnapshot."""
+        return PriceSnapshot.from_dict(self.get_prices(**filters), timestamp=self.last_updated())
@@ -3,37 +3,166 @@ Price Scraper Module
 Handles scraping prices from different stores.
 """
 
+import asyncio
+import http.client
 import random
-from typing import Optional
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+from urllib.parse import quote_plus
+
+from http_pool import HTTPResponse, PoolManager
+from keyword_matcher import KeywordMatcher, load_keyword_table
+from rate_limiter import StoreRateLimiter
+from resilience import CircuitBreaker, RetryPolicy
+from response_cache import ResponseCache
+from synthetic_catalog import fluctuation, name_key
+
+
+# Mock base prices, matched as keywords within product names
+DEFAULT_BASE_PRICES = {
+    'laptop': 899.99,
+    'smartphone': 699.99,
+    'headphones': 199.99,
+    'usb cable': 9.99,
+    'keyboard': 79.99,
+    'monitor': 299.99,
+    'mouse': 29.99,
+}
+
+
+class ScrapeError(Exception):
+    """Raised when a store page cannot be fetched or parsed."""
+
+
+class TransientScrapeError(ScrapeError):
+    """Raised for store errors worth retrying, such as 5xx or 429 responses."""
+
+
+# Errors that suggest the store, rather than the product page, is in trouble
+RETRYABLE_ERRORS = (OSError, http.client.HTTPException, TransientScrapeError)
+
+
+class StoreAdapter:
+    """
+    Describes how to scrape one store.
+    
+    Subclasses declare how to build a product page URL and how to pull the
+    price out of the page body; the scraper does the fetching.
+    """
+    
+    headers: Dict[str, str] = {'User-Agent': 'StockUp/1.0'}
+    
+    def build_url(self, product_name: str) -> str:
+        """Build the URL of the page listing a product's price."""
+        raise NotImplementedError
+    
+    def parse_price(self, page: bytes) -> Optional[float]:
+        """Extract the price from a page body, or None if it has none."""
+        raise NotImplementedError
+
+
+class RegexStoreAdapter(StoreAdapter):
+    """Store adapter that fills a URL template and matches the price with a regex."""
+    
+    DEFAULT_PRICE_PATTERN = rb'"price"\s*:\s*"?\$?([0-9][0-9,]*(?:\.[0-9]+)?)'
+    
+    def __init__(self, url_template: str, price_pattern: bytes = DEFAULT_PRICE_PATTERN):
+        """
+        Initialize the adapter.
+        
+        Args:
+            url_template: URL with a ``{query}`` placeholder for the product name
+            price_pattern: Regex over the raw page bytes; group 1 is the price
+        """
+        self.url_template = url_template
+        self.price_pattern = re.compile(price_pattern)
+    
+    def build_url(self, product_name: str) -> str:
+        """Build the search URL for a product."""
+        return self.url_template.format(query=quote_plus(product_name))
+    
+    def parse_price(self, page: bytes) -> Optional[float]:
+        """Extract the first price matched in the page."""
+        match = self.price_pattern.search(page)
+        if not match:
+            return None
+        return float(match.group(1).replace(b',', b''))
 
 
 class PriceScraper:
     """Scrapes prices from various stores."""
     
-    def __init__(self):
-        """Initialize the price scraper."""
+    def __init__(self, adapters: Optional[Dict[str, StoreAdapter]] = None,
+                 pool_size: int = 4, timeout: float = 10.0,
+                 cache: Optional[ResponseCache] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 breaker_threshold: int = 5, breaker_cooldown: float = 60.0,
+                 seed: Optional[int] = None, epoch: int = 0):
+        """
+        Initialize the price scraper.
+        
+        Args:
+            adapters: Store adapters keyed by store name; stores without an
+                adapter get mock prices
+            pool_size: Maximum keep-alive connections per host
+            timeout: Socket timeout in seconds
+            cache: Response cache used to send conditional requests
+            retry_policy: Retry and backoff policy for live fetches
+            breaker_threshold: Consecutive failures before a store's circuit opens
+            breaker_cooldown: Seconds a store's circuit stays open
+            seed: Make mock prices a deterministic function of
+                (seed, product, store, epoch) instead of random
+            epoch: Scrape epoch mixed into seeded mock prices
+        """
         self.stores = {
-            'Amazon': {'delay': 0.5, 'variance': 1.2},
-            'Walmart': {'delay': 0.5, 'variance': 1.0},
-            'Best Buy': {'delay': 0.5, 'variance': 1.1},
-            'Target': {'delay': 0.5, 'variance': 0.95},
-            'eBay': {'delay': 0.5, 'variance': 1.15},
+            'Amazon': {'delay': 0.5, 'variance': 1.2, 'burst': 5, 'max_concurrency': 4},
+            'Walmart': {'delay': 0.5, 'variance': 1.0, 'burst': 5, 'max_concurrency': 4},
+            'Best Buy': {'delay': 0.5, 'variance': 1.1, 'burst': 5, 'max_concurrency': 4},
+            'Target': {'delay': 0.5, 'variance': 0.95, 'burst': 5, 'max_concurrency': 4},
+            'eBay': {'delay': 0.5, 'variance': 1.15, 'burst': 5, 'max_concurrency': 4},
         }
+        self.rate_limiter = StoreRateLimiter(self.stores)
+        self.adapters = dict(adapters or {})
+        self.http = PoolManager(pool_size=pool_size, timeout=timeout)
+        self.cache = cache
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.last_known: Dict[Tuple[str, str], float] = {}
+        self.stale_prices: Set[Tuple[str, str]] = set()
+        self.seed = seed
+        self.epoch = epoch
+        self.base_prices = dict(DEFAULT_BASE_PRICES)
+        self._base_price_matcher = KeywordMatcher(self.base_prices)
     
     def get_price(self, product_name: str, store: str) -> Optional[float]:
         """
         Get the price of a product from a specific store.
-        In a real application, this would scrape actual websites.
-        For demo purposes, we generate mock prices.
+        Stores with an adapter are scraped over HTTP, waiting for a token
+        from the store's rate limiter first; for the others we generate
+        mock prices for demo purposes.
         """
+        return self._get_price(product_name, store)
+    
+    def _get_price(self, product_name: str, store: str, pace: bool = True) -> Optional[float]:
+        """Get a price; ``pace=False`` when the caller already took the fetch's token."""
         try:
+            adapter = self.adapters.get(store)
+            if adapter is not None:
+                return self._get_live_price(adapter, product_name, store, pace)
+            
             # Generate a realistic mock price
             base_price = self._get_base_price(product_name)
             if base_price is None:
                 return None
             
             variance = self.stores.get(store, {}).get('variance', 1.0)
-            fluctuation = random.uniform(0.9, 1.1)
+            fluctuation = self._fluctuation(product_name, store)
             
             final_price = base_price * variance * fluctuation
             return round(final_price, 2)
@@ -41,32 +170,446 @@ class PriceScraper:
             print(f"Error scraping price from {store}: {e}")
             return None
     
+    def _fluctuation(self, product_name: str, store: str) -> float:
+        """Get the mock price fluctuation, seeded per (product, store, epoch) if requested."""
+        if self.seed is None:
+            return random.uniform(0.9, 1.1)
+        # The same seeded function as generate_catalog, keyed by names
+        return float(fluctuation(self.seed, self.epoch, name_key(store, product_name)))
+    
+    def breaker(self, store: str) -> CircuitBreaker:
+        """Get the circuit breaker for a store, creating it on first use."""
+        breaker = self.breakers.get(store)
+        if breaker is None:
+            breaker = self.breakers.setdefault(
+                store, CircuitBreaker(self.breaker_threshold, self.breaker_cooldown)
+            )
+        return breaker
+    
+    def is_stale(self, product_name: str, store: str) -> bool:
+        """Check whether the last price returned for a pair was a stale fallback."""
+        return (product_name, store) in self.stale_prices
+    
+    def remember_prices(self, prices: Dict[str, Dict[str, float]]) -> None:
+        """Seed last known prices, e.g. from a previous run, for stale fallbacks."""
+        for product_name, store_prices in prices.items():
+            for store, price in store_prices.items():
+                self.last_known.setdefault((product_name, store), price)
+    
+    def _get_live_price(self, adapter: StoreAdapter, product_name: str,
+                        store: str, pace: bool = True) -> Optional[float]:
+        """
+        Scrape a price with retries, behind the store's circuit breaker.
+        
+        While the store's circuit is open, or once retries are exhausted,
+        the last known price is returned and the pair is marked stale.
+        """
+        try:
+            fetched, price = self._call_store(store, self._fetch_price, adapter, product_name, store,
+                                              pace=pace)
+        except (ScrapeError, ValueError):
+            # The store answered without a price (e.g. a 404); the last
+            # known one no longer stands in for it
+            self.stale_prices.discard((product_name, store))
+            raise
+        if fetched:
+            self._remember(product_name, store, price)
+            return price
+        return self._stale_price(product_name, store)
+    
+    def _call_store(self, store: str, func, *args, pace: bool = True) -> Tuple[bool, object]:
+        """
+        Call ``func`` with retries behind the store's circuit breaker.
+        
+        Every call that gets past the breaker first waits for a token from
+        the store's bucket (unless ``pace`` is False because the caller
+        already took one), so sequential, incremental, streamed and
+        pipelined scrapes are paced like async ones.
+        
+        Returns:
+            (succeeded: bool, result)
+        """
+        breaker = self.breaker(store)
+        if not breaker.allow():
+            return False, None
+        if pace:
+            self.rate_limiter.bucket(store).acquire()
+        # Every call is settled, so a half-open trial that raises anything
+        # still closes or reopens the breaker instead of leaving it stuck
+        settle = breaker.record_failure
+        try:
+            result = self.retry_policy.call(func, *args, retry_on=RETRYABLE_ERRORS)
+            settle = breaker.record_success
+        except RETRYABLE_ERRORS as e:
+            print(f"Error scraping price from {store}: {e}")
+            return False, None
+        except (ScrapeError, ValueError):
+            # Any HTTP response, even a 404 or an unparsable page, shows the store is up
+            settle = breaker.record_success
+            raise
+        finally:
+            settle()
+        return True, result
+    
+    def _remember(self, product_name: str, store: str, price: Optional[float]) -> None:
+        """Record a freshly scraped price as the pair's last known one."""
+        key = (product_name, store)
+        self.stale_prices.discard(key)
+        if price is not None:
+            self.last_known[key] = price
+    
+    def _stale_price(self, product_name: str, store: str) -> Optional[float]:
+        """Get the last known price of a pair and mark it stale."""
+        key = (product_name, store)
+        price = self.last_known.get(key)
+        if price is not None:
+            self.stale_prices.add(key)
+        return price
+    
+    def _fetch_page(self, adapter: StoreAdapter, product_name: str,
+                    store: str) -> Tuple[Optional[HTTPResponse], Optional[float]]:
+        """
+        Fetch a product page through the connection pool.
+        
+        With a response cache, the request is made conditional on the last
+        ETag/Last-Modified seen, and a 304 reuses the cached price without
+        downloading or parsing the page.
+        
+        Returns:
+            (response, None) for a new page, or (None, cached price) on a 304
+        """
+        url = adapter.build_url(product_name)
+        headers = dict(adapter.headers)
+        entry = self.cache.lookup(product_name, store) if self.cache else None
+        if entry is not None:
+            headers.update(ResponseCache.conditional_headers(entry))
+        
+        response = self.http.request('GET', url, headers=headers)
+        if response.status == 304 and entry is not None:
+            self.cache.record_not_modified(entry)
+            return None, entry['price']
+        if response.status == 429 or response.status >= 500:
+            raise TransientScrapeError(f"HTTP {response.status} for {url}")
+        if response.status != 200:
+            raise ScrapeError(f"HTTP {response.status} for {url}")
+        return response, None
+    
+    def _store_page_price(self, product_name: str, store: str, response: HTTPResponse,
+                          price: Optional[float]) -> Optional[float]:
+        """Round a parsed page price and cache it with the page's validators."""
+        if price is not None:
+            price = round(price, 2)
+        if self.cache:
+            self.cache.store(
+                product_name, store,
+                response.header('etag'), response.header('last-modified'),
+                price, len(response.body)
+            )
+        return price
+    
+    def _fetch_price(self, adapter: StoreAdapter, product_name: str,
+                     store: str) -> Optional[float]:
+        """Fetch a product page and parse its price."""
+        response, cached_price = self._fetch_page(adapter, product_name, store)
+        if response is None:
+            return cached_price
+        price = adapter.parse_price(response.body)
+        return self._store_page_price(product_name, store, response, price)
+    
+    async def get_prices_async(self, pairs: Iterable[Tuple[str, str]],
+                               concurrency: int = 10,
+                               time_budget: Optional[float] = None,
+                               on_done: Optional[Callable[[int, Optional[float]], None]] = None
+                               ) -> Dict[str, Dict[str, float]]:
+        """
+        Get prices for many (product, store) pairs concurrently.
+        
+        Each store with an adapter is paced by its own token bucket (from
+        its 'delay' and 'burst' settings), and every store is capped at its
+        'max_concurrency', so a slow store never holds up the others. At
+        most ``concurrency`` fetches are in flight across all stores at once.
+        
+        Args:
+            pairs: Iterable of (product name, store) tuples; each store's
+                pairs are fetched in this order
+            concurrency: Maximum number of fetches in flight
+            time_budget: Seconds after which no new fetch is started; fetches
+                in flight finish, and the pairs not started are left out
+            on_done: Called on the event loop with (index in ``pairs``,
+                price) as each fetch finishes
+            
+        Returns:
+            Dictionary with product names as keys and store prices as values,
+            in the same order as the input pairs
+        """
+        pairs = list(pairs)
+        deadline = time.monotonic() + time_budget if time_budget is not None else None
+        found = [None] * len(pairs)
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+        in_flight = asyncio.Semaphore(max(1, concurrency))
+        
+        # One queue per store, drained by that store's own workers
+        queues = {}
+        for index, (product_name, store) in enumerate(pairs):
+            queues.setdefault(store, []).append((index, product_name))
+        
+        async def worker(store, queue):
+            bucket = self.rate_limiter.bucket(store)
+            live = store in self.adapters
+            for index, product_name in queue:
+                # Only live requests need a rate-limit token: mock stores and
+                # stores with an open circuit are answered locally
+                if live and not self.breaker(store).is_open():
+                    await bucket.acquire_async()
+                async with in_flight:
+                    # Checked after waiting for a token and a slot, either of
+                    # which can outlast the budget
+                    if deadline is not None and time.monotonic() >= deadline:
+                        return
+                    # The token was taken above without blocking a thread
+                    found[index] = await loop.run_in_executor(
+                        executor, self._get_price, product_name, store, False
+                    )
+                if on_done is not None:
+                    on_done(index, found[index])
+        
+        workers = []
+        for store, items in queues.items():
+            queue = iter(items)
+            count = min(self.rate_limiter.max_concurrency(store), len(items))
+            workers.extend(worker(store, queue) for _ in range(count))
+        
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            executor.shutdown(wait=False)
+        
+        prices = {}
+        for (product_name, store), price in zip(pairs, found):
+            if price:
+                prices.setdefault(product_name, {})[store] = price
+        return prices
+    
     def _get_base_price(self, product_name: str) -> Optional[float]:
         """Get base price for a product."""
-        # Mock product prices
-        product_prices = {
-            'laptop': 899.99,
-            'smartphone': 699.99,
-            'headphones': 199.99,
-            'usb cable': 9.99,
-            'keyboard': 79.99,
-            'monitor': 299.99,
-            'mouse': 29.99,
-        }
-        
-        product_lower = product_name.lower()
-        for key, price in product_prices.items():
-            if key in product_lower:
-                return price
+        return self._base_price_matcher.match(product_name)
+    
+    def load_base_prices(self, path: Union[str, Path], replace: bool = False) -> int:
+        """
+        Load keyword base prices from a JSON or CSV file.
         
-        return None
+        Args:
+            path: File with keyword to base price entries
+            replace: Replace the current table instead of extending it
+            
+        Returns:
+            Number of keywords in the table after loading
+        """
+        table = load_keyword_table(path)
+        if replace:
+            self.base_prices = table
+        else:
+            self.base_prices.update(table)
+        self._base_price_matcher = KeywordMatcher(self.base_prices)
+        return len(self.base_prices)
     
     def is_store_available(self, store: str) -> bool:
         """Check if a store is available for scraping."""
         return store in self.stores
+    
+    def close(self) -> None:
+        """Close pooled HTTP connections and persist the response cache."""
+        self.http.close()
+        if self.cache:
+            self.cache.save()
+
+
+# Adapters available to each parser process, set by _init_parser
+_parser_adapters: Dict[str, StoreAdapter] = {}
+
+
+def _init_parser(adapters: Dict[str, StoreAdapter]) -> None:
+    """Install the store adapters in a parser process."""
+    global _parser_adapters
+    _parser_adapters = adapters
+
+
+def _share_pages(pages: List[bytes]) -> Tuple[shared_memory.SharedMemory, List[Tuple[int, int]]]:
+    """
+    Write pages back to back into a new shared memory block.
+    
+    Returns:
+        (block, (offset, length) of each page); the caller unlinks the block
+    """
+    block = shared_memory.SharedMemory(create=True, size=max(1, sum(len(page) for page in pages)))
+    spans = []
+    offset = 0
+    for page in pages:
+        block.buf[offset:offset + len(page)] = page
+        spans.append((offset, len(page)))
+        offset += len(page)
+    return block, spans
+
+
+def _parse_shared(store: str, block_name: str, offset: int, length: int) -> Optional[float]:
+    """Parse a page stored in a shared memory block, in a parser process."""
+    block = shared_memory.SharedMemory(name=block_name)
+    try:
+        # Adapters take bytes; copying out of shared memory is a plain memcpy
+        page = bytes(block.buf[offset:offset + length])
+    finally:
+        block.close()
+    return _parser_adapters[store].parse_price(page)
+
+
+class ScrapePipeline:
+    """
+    Scrapes with separate fetch and parse stages.
+    
+    Pages are fetched on a thread pool (I/O concurrency). By default each
+    fetch thread parses its own page, as PriceScraper does. With
+    ``parse_workers``, pages go to a process pool instead, so CPU-heavy
+    extraction runs on all cores rather than stalling fetches on the GIL:
+    fetched pages are written in batches into shared memory blocks and
+    each task only carries (store, block, offset, length), the way
+    compare_parallel shares its price matrix, so no page is pickled
+    through the pool's pipe. The pool is opt-in because it only wins for
+    adapters whose parsing outweighs the hand-off, on machines with cores
+    to spare (see bench/bench_parse.py). It is only started once a page
+    needs parsing, so runs served from mock stores, caches or stale
+    prices never pay for it.
+    """
+    
+    def __init__(self, scraper: PriceScraper, fetch_workers: int = 8,
+                 parse_workers: Optional[int] = 0, batch_bytes: int = 16_000_000):
+        """
+        Initialize the pipeline.
+        
+        Args:
+            scraper: Scraper providing adapters, connection pools and caches
+            fetch_workers: Number of fetch threads
+            parse_workers: Number of parser processes; 0 parses in the fetch
+                threads, None starts one per CPU
+            batch_bytes: Page bytes gathered into one shared memory block
+                before its pages are sent to the parsers
+        """
+        self.scraper = scraper
+        self.fetch_workers = max(1, fetch_workers)
+        self.parse_workers = parse_workers
+        self.batch_bytes = batch_bytes
+    
+    def _fetch(self, product_name: str, store: str):
+        """Fetch one pair; returns ('page', response) or ('price', price)."""
+        scraper = self.scraper
+        adapter = scraper.adapters.get(store)
+        if adapter is None or self.parse_workers == 0:
+            return 'price', scraper.get_price(product_name, store)
+        
+        fetched, result = scraper._call_store(
+            store, scraper._fetch_page, adapter, product_name, store
+        )
+        if not fetched:
+            return 'price', scraper._stale_price(product_name, store)
+        
+        response, cached_price = result
+        if response is None:
+            scraper._remember(product_name, store, cached_price)
+            return 'price', cached_price
+        return 'page', response
+    
+    def run(self, pairs: Iterable[Tuple[str, str]]) -> Dict[str, Dict[str, float]]:
+        """
+        Scrape many (product, store) pairs.
+        
+        Returns:
+            Dictionary with product names as keys and store prices as values,
+            in the same order as the input pairs
+        """
+        pairs = list(pairs)
+        found: List[Optional[float]] = [None] * len(pairs)
+        parsers: Optional[ProcessPoolExecutor] = None
+        blocks: List[shared_memory.SharedMemory] = []
+        parses = {}
+        
+        def send(batch: List[Tuple[int, HTTPResponse]]) -> None:
+            """Share a batch of pages and queue one parse per page."""
+            nonlocal parsers
+            block, spans = _share_pages([response.body for _, response in batch])
+            blocks.append(block)
+            # Created after the first block, so the parsers share this
+            # process's resource tracker instead of each starting one that
+            # would report the blocks as leaked when it exits
+            if parsers is None:
+                parsers = ProcessPoolExecutor(max_workers=self.parse_workers,
+                                              initializer=_init_parser,
+                                              initargs=(self.scraper.adapters,))
+            for (index, response), (offset, length) in zip(batch, spans):
+                future = parsers.submit(_parse_shared, pairs[index][1], block.name, offset, length)
+                parses[future] = (index, response)
+        
+        try:
+            with ThreadPoolExecutor(max_workers=self.fetch_workers) as fetchers:
+                fetches = {
+                    fetchers.submit(self._fetch, product_name, store): index
+                    for index, (product_name, store) in enumerate(pairs)
+                }
+                batch, batch_size = [], 0
+                for future in as_completed(fetches):
+                    index = fetches[future]
+                    product_name, store = pairs[index]
+                    try:
+                        kind, result = future.result()
+                    except Exception as e:
+                        print(f"Error scraping price from {store}: {e}")
+                        continue
+                    if kind == 'price':
+                        found[index] = result
+                    else:
+                        batch.append((index, result))
+                        batch_size += len(result.body)
+                        if batch_size >= self.batch_bytes:
+                            send(batch)
+                            batch, batch_size = [], 0
+                if batch:
+                    send(batch)
+                
+                for future in as_completed(parses):
+                    index, response = parses[future]
+                    product_name, store = pairs[index]
+                    try:
+                        price = future.result()
+                    except Exception as e:
+                        print(f"Error parsing price from {store}: {e}")
+                        continue
+                    price = self.scraper._store_page_price(product_name, store, response, price)
+                    self.scraper._remember(product_name, store, price)
+                    found[index] = price
+        finally:
+            if parsers is not None:
+                parsers.shutdown()
+            for block in blocks:
+                block.close()
+                block.unlink()
+        
+        prices = {}
+        for (product_name, store), price in zip(pairs, found):
+            if price:
+                prices.setdefault(product_name, {})[store] = price
+        return prices
 
 
 # Mock function to demonstrate adding custom stores
-def add_store(scraper: PriceScraper, store_name: str, delay: float = 0.5, variance: float = 1.0) -> None:
-    """Add a new store to the scraper."""
-    scraper.stores[store_name] = {'delay': delay, 'variance': variance}
+def add_store(scraper: PriceScraper, store_name: str, delay: float = 0.5, variance: float = 1.0,
+              burst: int = 5, max_concurrency: int = 4,
+              adapter: Optional[StoreAdapter] = None) -> None:
+    """Add a new store to the scraper, optionally with an adapter for live scraping."""
+    scraper.stores[store_name] = {
+        'delay': delay,
+        'variance': variance,
+        'burst': burst,
+        'max_concurrency': max_concurrency
+    }
+    scraper.rate_limiter.reset(store_name)
+    if adapter is not None:
+        scraper.adapters[store_name] = adapter
@@ -0,0 +1,303 @@
+"""
+Price Snapshot Module
+Columnar storage for a full set of scraped prices.
+"""
+
+import hashlib
+import json
+import mmap
+import struct
+import sys
+from collections.abc import Sequence
+from pathlib import Path
+from typing import IO, Dict, List, Optional, Union
+
+import numpy as np
+
+from durable_io import atomic_open, atomic_write_json
+
+
+# Binary snapshot layout (little-endian): a fixed header, then the
+# timestamp, the product and store name tables, the float64 price matrix
+# (column-major, 64-byte aligned) and the validity bitmap (one bit per
+# cell, column-major). A name table is n + 1 uint64 offsets into a UTF-8 blob.
+BINARY_MAGIC = b"STKSNAP\x00"
+BINARY_VERSION = 1
+_HEADER = struct.Struct("<8sIIQQQQQQQQ")
+_ALIGNMENT = 64
+
+
+class _NameTable(Sequence):
+    """Read-only list of names that decodes each name only when accessed."""
+    
+    def __init__(self, offsets: np.ndarray, blob: memoryview):
+        self._offsets = offsets
+        self._blob = blob
+    
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("name index out of range")
+        start, stop = self._offsets[index], self._offsets[index + 1]
+        return str(self._blob[start:stop], 'utf-8')
+    
+    def __iter__(self):
+        blob = bytes(self._blob)
+        offsets = self._offsets.tolist()
+        for start, stop in zip(offsets, offsets[1:]):
+            yield blob[start:stop].decode('utf-8')
+
+
+class PriceSnapshot:
+    """
+    Prices for every (product, store) pair held as columns.
+    
+    A snapshot has a product index, a store index, a product × store price
+    matrix in column-major order (one contiguous column per store) and a
+    validity mask. Missing cells are False in the mask and NaN in the matrix.
+    
+    Snapshots can be saved in a binary format and reopened with
+    ``open_binary``, which maps the file instead of reading it: the price
+    matrix is a zero-copy view of the file, and names and the mask are
+    only decoded when used.
+    """
+    
+    def __init__(self, products: List[str], stores: List[str], prices: np.ndarray,
+                 mask: Optional[np.ndarray] = None, timestamp: Optional[str] = None):
+        """
+        Initialize the snapshot.
+        
+        Args:
+            products: Product name of each row
+            stores: Store name of each column
+            prices: 2-D float32 or float64 price matrix
+            mask: Boolean matrix, True where a price exists (default: non-NaN cells)
+            timestamp: When the prices were scraped
+        """
+        self.products = products
+        self.stores = stores
+        self.prices = np.asfortranarray(prices)
+        self._mask = None if mask is None else np.asfortranarray(mask)
+        self._bitmap: Optional[np.ndarray] = None
+        self._mmap: Optional[mmap.mmap] = None
+        self.timestamp = timestamp
+        self._product_index: Optional[Dict[str, int]] = None
+        self._content_hash: Optional[str] = None
+    
+    @property
+    def mask(self) -> np.ndarray:
+        """Boolean matrix, True where a price exists, built on first use."""
+        if self._mask is None:
+            if self._bitmap is not None:
+                bits = np.unpackbits(self._bitmap, count=self.prices.size)
+                self._mask = bits.view(bool).reshape(self.prices.shape, order='F')
+            else:
+                self._mask = np.asfortranarray(~np.isnan(self.prices))
+        return self._mask
+    
+    @classmethod
+    def from_dict(cls, prices: Dict[str, Dict[str, float]], dtype=np.float64,
+                  timestamp: Optional[str] = None) -> 'PriceSnapshot':
+        """Build a snapshot from the ``{product: {store: price}}`` form."""
+        products = list(prices)
+        store_index: Dict[str, int] = {}
+        rows, columns, values = [], [], []
+        for row, store_prices in enumerate(prices.values()):
+            for store, price in store_prices.items():
+                column = store_index.setdefault(store, len(store_index))
+                rows.append(row)
+                columns.append(column)
+                values.append(price)
+        
+        matrix = np.full((len(products), len(store_index)), np.nan, dtype=dtype, order='F')
+        mask = np.zeros(matrix.shape, dtype=bool, order='F')
+        matrix[rows, columns] = values
+        mask[rows, columns] = True
+        return cls(products, list(store_index), matrix, mask, timestamp)
+    
+    @classmethod
+    def from_json_file(cls, path: Union[str, Path, IO], dtype=np.float64) -> 'PriceSnapshot':
+        """Load a snapshot from a ``prices.json`` file, given its path or an open file."""
+        if hasattr(path, 'read'):
+            data = json.load(path)
+        else:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        return cls.from_dict(data.get('prices', {}), dtype, data.get('timestamp'))
+    
+    def to_json_file(self, path: Union[str, Path]) -> None:
+        """Save the snapshot as a ``prices.json`` file, replacing it atomically."""
+        atomic_write_json(path, {'timestamp': self.timestamp, 'prices': self.to_dict()}, indent=2)
+    
+    def save_binary(self, path: Union[str, Path]) -> None:
+        """
+        Save the snapshot in the binary format read by ``open_binary``.
+        
+        Prices are stored as float64 whatever the snapshot's dtype.
+        
+        Args:
+            path: File to write
+        """
+        def name_table(names) -> bytes:
+            encoded = [str(name).encode('utf-8') for name in names]
+            offsets = np.zeros(len(encoded) + 1, dtype='<u8')
+            np.cumsum([len(name) for name in encoded], out=offsets[1:])
+            return offsets.tobytes() + b"".join(encoded)
+        
+        def padding(position: int) -> bytes:
+            return b"\0" * (-position % _ALIGNMENT)
+        
+        n_products, n_stores = self.prices.shape
+        timestamp = (self.timestamp or '').encode('utf-8')
+        products = name_table(self.products)
+        stores = name_table(self.stores)
+        bitmap = np.packbits(self.mask.ravel(order='F'))
+        
+        timestamp_offset = _HEADER.size
+        products_offset = timestamp_offset + len(timestamp)
+        stores_offset = products_offset + len(products)
+        matrix_offset = stores_offset + len(stores)
+        matrix_offset += -matrix_offset % _ALIGNMENT
+        bitmap_offset = matrix_offset + n_products * n_stores * 8
+        
+        header = _HEADER.pack(
+            BINARY_MAGIC, BINARY_VERSION, len(timestamp), n_products, n_stores,
+            products_offset, stores_offset, matrix_offset, bitmap_offset,
+            len(products), len(stores)
+        )
+        # Write a new file and swap it in: truncating a file that another
+        # snapshot has mapped would crash that process on its next read
+        with atomic_open(path, 'wb') as f:
+            f.write(header + timestamp + products + stores)
+            f.write(padding(stores_offset + len(stores)))
+            # Column-major bytes of the matrix, written a column at a time
+            for column in range(n_stores):
+                f.write(np.ascontiguousarray(self.prices[:, column], dtype='<f8').tobytes())
+            f.write(bitmap.tobytes())
+    
+    @classmethod
+    def open_binary(cls, path: Union[str, Path]) -> 'PriceSnapshot':
+        """
+        Open a binary snapshot by memory-mapping it.
+        
+        Nothing but the header is read up front: the price matrix is a
+        read-only view of the mapped file, so pages are loaded only when
+        prices are touched.
+        
+        Args:
+            path: File written by ``save_binary``, or a binary file open on one
+            
+        Returns:
+            Snapshot backed by the file
+        """
+        if hasattr(path, 'fileno'):
+            mapped = mmap.mmap(path.fileno(), 0, access=mmap.ACCESS_READ)
+            path = getattr(path, 'name', path)
+        else:
+            with open(path, 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, timestamp_length, n_products, n_stores, products_offset,
+         stores_offset, matrix_offset, bitmap_offset, products_length,
+         stores_length) = _HEADER.unpack_from(mapped, 0)
+        if magic != BINARY_MAGIC or version != BINARY_VERSION:
+            mapped.close()
+            raise ValueError(f"{path} is not a version {BINARY_VERSION} price snapshot")
+        
+        buffer = memoryview(mapped)
+        
+        def name_table(offset: int, length: int, count: int) -> _NameTable:
+            offsets = np.frombuffer(buffer, dtype='<u8', count=count + 1, offset=offset)
+            blob_start = offset + (count + 1) * 8
+            return _NameTable(offsets, buffer[blob_start:offset + length])
+        
+        prices = np.ndarray((n_products, n_stores), dtype='<f8', buffer=buffer,
+                            offset=matrix_offset, order='F')
+        timestamp = bytes(buffer[_HEADER.size:_HEADER.size + timestamp_length]).decode('utf-8')
+        snapshot = cls(
+            name_table(products_offset, products_length, n_products),
+            name_table(stores_offset, stores_length, n_stores),
+            prices,
+            timestamp=timestamp or None
+        )
+        snapshot._bitmap = np.frombuffer(
+            buffer, dtype=np.uint8, count=(n_products * n_stores + 7) // 8, offset=bitmap_offset
+        )
+        snapshot._mmap = mapped
+        return snapshot
+    
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        """Convert to the ``{product: {store: price}}`` form."""
+        prices = {}
+        for product_name, row, valid in zip(self.products, self.prices.tolist(), self.mask.tolist()):
+            store_prices = {
+                store: price for store, price, ok in zip(self.stores, row, valid) if ok
+            }
+            if store_prices:
+                prices[product_name] = store_prices
+        return prices
+    
+    def to_dataframe(self):
+        """View the prices as a pandas DataFrame (products × stores) without copying."""
+        import pandas as pd
+        return pd.DataFrame(self.prices, index=self.products, columns=self.stores, copy=False)
+    
+    def product_row(self, product_name: str) -> int:
+        """Get the matrix row of a product."""
+        if self._product_index is None:
+            self._product_index = {name: row for row, name in enumerate(self.products)}
+        return self._product_index[product_name]
+    
+    def store_prices(self, product_name: str) -> Dict[str, float]:
+        """Get the store prices of one product."""
+        row = self.product_row(product_name)
+        return {
+            store: price
+            for store, price, ok in zip(self.stores, self.prices[row].tolist(), self.mask[row].tolist())
+            if ok
+        }
+    
+    def content_hash(self) -> str:
+        """
+        Stable hash of the names, prices and mask, e.g. for caching results.
+        
+        Computed once; a snapshot is treated as immutable after that.
+        """
+        if self._content_hash is None:
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(json.dumps([list(self.products), list(self.stores)]).encode('utf-8'))
+            digest.update(str((self.prices.dtype.str, self.prices.shape)).encode('utf-8'))
+            # The transposes of column-major arrays are C-contiguous buffers
+            digest.update(self.prices.T)
+            digest.update(self.mask.T)
+            self._content_hash = digest.hexdigest()
+        return self._content_hash
+    
+    def price_count(self) -> int:
+        """Number of (product, store) pairs with a price."""
+        return int(np.count_nonzero(self.mask))
+    
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by the snapshot, including the name tables."""
+        names = sum(sys.getsizeof(name) for name in self.products)
+        names += sum(sys.getsizeof(name) for name in self.stores)
+        return self.prices.nbytes + self.mask.nbytes + names
+    
+    def __len__(self) -> int:
+        return len(self.products)
+
+
+def estimate_dict_nbytes(prices: Dict[str, Dict[str, float]]) -> int:
+    """Approximate memory used by the ``{product: {store: price}}`` form, for comparison."""
+    total = sys.getsizeof(prices)
+    for product_name, store_prices in prices.items():
+        total += sys.getsizeof(product_name) + sys.getsizeof(store_prices)
+        # Store names are usually shared strings, so only the floats count
+        total += sum(sys.getsizeof(price) for price in store_prices.values())
+    return total
@@ -0,0 +1,106 @@
+"""
+Rate Limiter Module
+Paces scraping requests with one token bucket per store.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+DEFAULT_DELAY = 0.5
+DEFAULT_BURST = 1
+DEFAULT_MAX_CONCURRENCY = 2
+
+
+class TokenBucket:
+    """Token bucket refilled at a fixed rate and capped at a burst size."""
+    
+    def __init__(self, rate: Optional[float], burst: int = DEFAULT_BURST):
+        """
+        Initialize the bucket.
+        
+        Args:
+            rate: Tokens added per second, or None for no limit
+            burst: Maximum number of tokens the bucket can hold
+        """
+        self.rate = rate
+        self.burst = max(1, int(burst))
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_delay(cls, delay: float, burst: int = DEFAULT_BURST) -> 'TokenBucket':
+        """Create a bucket allowing one request every ``delay`` seconds."""
+        return cls(1.0 / delay if delay and delay > 0 else None, burst)
+    
+    def reserve(self) -> float:
+        """Take one token and return how many seconds to wait before using it."""
+        if self.rate is None:
+            return 0.0
+        
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Tokens may go negative: callers queue up behind each other
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+    
+    def acquire(self) -> None:
+        """Block the calling thread until a token is available."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+    
+    async def acquire_async(self) -> None:
+        """Wait on the event loop until a token is available."""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class StoreRateLimiter:
+    """Keeps one token bucket per store, built from the store's settings."""
+    
+    def __init__(self, stores: Dict[str, Dict[str, Any]]):
+        """
+        Initialize the limiter.
+        
+        Args:
+            stores: Store settings keyed by store name; each entry may have
+                'delay', 'burst' and 'max_concurrency'
+        """
+        self.stores = stores
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+    
+    def bucket(self, store: str) -> TokenBucket:
+        """Get the token bucket for a store, creating it on first use."""
+        with self._lock:
+            bucket = self._buckets.get(store)
+            if bucket is None:
+                config = self.stores.get(store, {})
+                bucket = TokenBucket.from_delay(
+                    config.get('delay', DEFAULT_DELAY),
+                    config.get('burst', DEFAULT_BURST)
+                )
+                self._buckets[store] = bucket
+            return bucket
+    
+    def max_concurrency(self, store: str) -> int:
+        """Get the maximum number of in-flight requests allowed for a store."""
+        config = self.stores.get(store, {})
+        return max(1, int(config.get('max_concurrency', DEFAULT_MAX_CONCURRENCY)))
+    
+    def reset(self, store: Optional[str] = None) -> None:
+        """Drop cached buckets so changed store settings take effect."""
+        with self._lock:
+            if store is None:
+                self._buckets.clear()
+            else:
+                self._buckets.pop(store, None)
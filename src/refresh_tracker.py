@@ -0,0 +1,122 @@
+"""
+Refresh Tracker Module
+Decides which (product, store) prices are stale enough to re-scrape.
+"""
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from durable_io import atomic_write_json
+
+
+class RefreshTracker:
+    """
+    Tracks when each (product, store) price was last fetched and how much
+    it tends to move, and gives each pair a staleness budget (TTL).
+    
+    Volatility is an exponentially weighted average of the relative price
+    change between fetches. Pairs whose price moves get shorter TTLs;
+    pairs that never change are refreshed every ``base_ttl`` seconds.
+    """
+    
+    def __init__(self, path: Optional[Union[str, Path]] = None,
+                 base_ttl: float = 2 * 3600, min_ttl: float = 15 * 60,
+                 max_ttl: float = 24 * 3600, volatility_scale: float = 0.01,
+                 smoothing: float = 0.3):
+        """
+        Initialize the tracker.
+        
+        Args:
+            path: JSON file to persist fetch state to, or None to keep it in memory
+            base_ttl: Seconds before a price that never changes is re-fetched
+            min_ttl: Shortest TTL for the most volatile prices
+            max_ttl: Longest TTL for any price
+            volatility_scale: Relative change per fetch that halves the TTL
+            smoothing: Weight of the newest change in the volatility average
+        """
+        self.path = Path(path) if path else None
+        self.base_ttl = base_ttl
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.volatility_scale = volatility_scale
+        self.smoothing = smoothing
+        self.entries: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self.load()
+    
+    @staticmethod
+    def _key(product_name: str, store: str) -> str:
+        """Build the state key for a (product, store) pair."""
+        return f"{store}\x1f{product_name}"
+    
+    def load(self) -> None:
+        """Load fetch state from disk."""
+        if not self.path or not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable refresh state {self.path}: {e}")
+    
+    def save(self) -> None:
+        """Write fetch state to disk."""
+        if not self.path:
+            return
+        with self._lock:
+            entries = dict(self.entries)
+        atomic_write_json(self.path, entries)
+    
+    def ttl(self, product_name: str, store: str) -> float:
+        """Get the staleness budget of a pair, in seconds."""
+        entry = self.entries.get(self._key(product_name, store))
+        if entry and entry['price'] is None:
+            # Nothing was found last time; check back soon
+            return self.min_ttl
+        volatility = entry['volatility'] if entry else 0.0
+        ttl = self.base_ttl / (1 + volatility / self.volatility_scale)
+        return max(self.min_ttl, min(self.max_ttl, ttl))
+    
+    def is_due(self, product_name: str, store: str, now: Optional[float] = None) -> bool:
+        """Check whether a pair has used up its staleness budget."""
+        entry = self.entries.get(self._key(product_name, store))
+        if entry is None:
+            return True
+        now = time.time() if now is None else now
+        return now - entry['fetched_at'] >= self.ttl(product_name, store)
+    
+    def due_pairs(self, pairs: Iterable[Tuple[str, str]],
+                  now: Optional[float] = None) -> List[Tuple[str, str]]:
+        """Get the pairs that need re-fetching, in input order."""
+        now = time.time() if now is None else now
+        return [pair for pair in pairs if self.is_due(pair[0], pair[1], now)]
+    
+    def cached_price(self, product_name: str, store: str) -> Optional[float]:
+        """Get the last fetched price of a pair."""
+        entry = self.entries.get(self._key(product_name, store))
+        return entry['price'] if entry else None
+    
+    def age(self, product_name: str, store: str, now: Optional[float] = None) -> Optional[float]:
+        """Get the seconds since a pair was last fetched, or None if never."""
+        entry = self.entries.get(self._key(product_name, store))
+        if entry is None:
+            return None
+        now = time.time() if now is None else now
+        return now - entry['fetched_at']
+    
+    def record(self, product_name: str, store: str, price: Optional[float],
+               now: Optional[float] = None) -> None:
+        """Record a fetch result (None if no price was found) and update volatility."""
+        key = self._key(product_name, store)
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self.entries.get(key)
+            volatility = entry['volatility'] if entry else 0.0
+            if entry is not None and price is not None and entry['price'] is not None:
+                previous = entry['price']
+                change = abs(price - previous) / previous if previous else 0.0
+                volatility = (1 - self.smoothing) * entry['volatility'] + self.smoothing * change
+            self.entries[key] = {'price': price, 'fetched_at': now, 'volatility': volatility}
@@ -4,14 +4,31 @@ Generates formatted reports of price comparisons.
 """
 
 from datetime import datetime
-from typing import Dict, Any
+from typing import Collection, Dict, Any, Iterable, TextIO, Tuple, Union
+
+from comparison_engine import ComparisonEngine
+from price_snapshot import PriceSnapshot
 
 
 class ReportGenerator:
     """Generates price comparison reports."""
     
-    def generate(self, comparison_results: Dict[str, Any]) -> str:
-        """Generate a comprehensive price comparison report."""
+    def _results(self, comparison_results: Union[Dict[str, Any], PriceSnapshot]) -> Dict[str, Any]:
+        """Accept either comparison results or a price snapshot to compare."""
+        if isinstance(comparison_results, PriceSnapshot):
+            return ComparisonEngine().compare(comparison_results)
+        return comparison_results
+    
+    def generate(self, comparison_results: Union[Dict[str, Any], PriceSnapshot],
+                 stale: Collection[Tuple[str, str]] = ()) -> str:
+        """
+        Generate a comprehensive price comparison report.
+        
+        ``stale`` holds the (product, store) pairs whose price is the last
+        known one from an earlier scrape (the store was down); they are
+        marked in the report and counted in the summary.
+        """
+        comparison_results = self._results(comparison_results)
         report = []
         
         # Header
@@ -23,15 +40,20 @@ class ReportGenerator:
         
         # Summary
         total_products = len(comparison_results)
-        total_savings = sum(
-            r['statistics']['price_range'] 
-            for r in comparison_results.values()
-        )
+        if hasattr(comparison_results, 'total_savings'):
+            total_savings = comparison_results.total_savings()
+        else:
+            total_savings = sum(
+                r['statistics']['price_range'] 
+                for r in comparison_results.values()
+            )
         
         report.append("SUMMARY")
         report.append("-" * 70)
         report.append(f"Total Products: {total_products}")
         report.append(f"Total Potential Savings: ${total_savings:.2f}")
+        if stale:
+            report.append(f"Stale Prices: {len(stale)} (stores down, last known prices shown)")
         report.append("")
         
         # Detailed comparisons
@@ -39,21 +61,7 @@ class ReportGenerator:
         report.append("-" * 70)
         
         for product, result in sorted(comparison_results.items()):
-            report.append(f"\n{product.upper()}")
-            report.append("  Best Deal:")
-            best = result['best_deal']
-            report.append(f"    Store: {best['store']}")
-            report.append(f"    Price: ${best['price']:.2f}")
-            
-            report.append("  All Prices:")
-            for store, price in sorted(result['all_prices'].items(), key=lambda x: x[1]):
-                report.append(f"    {store}: ${price:.2f}")
-            
-            stats = result['statistics']
-            report.append("  Statistics:")
-            report.append(f"    Average Price: ${stats['average_price']:.2f}")
-            report.append(f"    Price Range: ${stats['min_price']:.2f} - ${stats['max_price']:.2f}")
-            report.append(f"    Potential Savings: ${stats['price_range']:.2f} ({stats['savings_percentage']:.1f}%)")
+            report.extend(self._product_section(product, result, stale))
         
         # Footer
         report.append("\n" + "=" * 70)
@@ -62,8 +70,91 @@ class ReportGenerator:
         
         return "\n".join(report)
     
-    def generate_csv(self, comparison_results: Dict[str, Any]) -> str:
+    def _product_section(self, product: str, result: Dict[str, Any],
+                         stale: Collection[Tuple[str, str]] = ()) -> list:
+        """Format the detailed report lines for one product, marking stale prices."""
+        def mark(store):
+            return " (stale)" if (product, store) in stale else ""
+        
+        lines = [f"\n{product.upper()}", "  Best Deal:"]
+        best = result['best_deal']
+        lines.append(f"    Store: {best['store']}")
+        lines.append(f"    Price: ${best['price']:.2f}{mark(best['store'])}")
+        
+        lines.append("  All Prices:")
+        for store, price in sorted(result['all_prices'].items(), key=lambda x: x[1]):
+            lines.append(f"    {store}: ${price:.2f}{mark(store)}")
+        
+        stats = result['statistics']
+        lines.append("  Statistics:")
+        lines.append(f"    Average Price: ${stats['average_price']:.2f}")
+        lines.append(f"    Price Range: ${stats['min_price']:.2f} - ${stats['max_price']:.2f}")
+        lines.append(f"    Potential Savings: ${stats['price_range']:.2f} ({stats['savings_percentage']:.1f}%)")
+        if 'median_price' in stats:
+            lines.append(f"    Median Price: ${stats['median_price']:.2f}")
+            lines.append(f"    Std Deviation: ${stats['std_dev']:.2f} (dispersion {stats['dispersion_score']:.1f}%)")
+        return lines
+    
+    def write_stream(self, results: Iterable[Tuple[str, Dict[str, Any]]], out: TextIO,
+                     stale: Collection[Tuple[str, str]] = ()) -> int:
+        """
+        Write a text report while comparison results are still arriving.
+        
+        Products are written in arrival order as they are yielded (e.g. by
+        ComparisonEngine.compare_stream), and the summary, which needs every
+        product, goes at the end of the report instead of the top.
+        
+        Args:
+            results: Iterable of (product name, comparison result) pairs
+            out: Text file to write to
+            stale: Pairs with stale prices; may still be filling up, as long
+                as a product's pairs are in before its result is yielded
+            
+        Returns:
+            Number of products written
+        """
+        header = [
+            "=" * 70,
+            "PRICE COMPARISON REPORT".center(70),
+            "=" * 70,
+            f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            "",
+            "DETAILED COMPARISONS",
+            "-" * 70
+        ]
+        out.write("\n".join(header) + "\n")
+        
+        total_products = 0
+        total_savings = 0.0
+        stale_count = 0
+        for product, result in results:
+            out.write("\n".join(self._product_section(product, result, stale)) + "\n")
+            total_products += 1
+            total_savings += result['statistics']['price_range']
+            if stale:
+                stale_count += sum((product, store) in stale for store in result['all_prices'])
+        
+        footer = [
+            "",
+            "SUMMARY",
+            "-" * 70,
+            f"Total Products: {total_products}",
+            f"Total Potential Savings: ${total_savings:.2f}"
+        ]
+        if stale_count:
+            footer.append(f"Stale Prices: {stale_count} (stores down, last known prices shown)")
+        footer += [
+            "",
+            "=" * 70,
+            "END OF REPORT".center(70),
+            "=" * 70
+        ]
+        out.write("\n".join(footer))
+        return total_products
+    
+    def generate_csv(self, comparison_results: Union[Dict[str, Any], PriceSnapshot]) -> str:
         """Generate a CSV format report."""
+        comparison_results = self._results(comparison_results)
         lines = ["Product,Best Store,Best Price,Average Price,Max Price,Savings Amount,Savings %"]
         
         for product, result in sorted(comparison_results.items()):
@@ -83,7 +174,7 @@ class ReportGenerator:
         
         return "\n".join(lines)
     
-    def generate_json(self, comparison_results: Dict[str, Any]) -> str:
+    def generate_json(self, comparison_results: Union[Dict[str, Any], PriceSnapshot]) -> str:
         """Generate a JSON format report."""
         import json
-        return json.dumps(comparison_results, indent=2)
+        return json.dumps(dict(self._results(comparison_results)), indent=2)
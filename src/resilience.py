@@ -0,0 +1,110 @@
+"""
+Resilience Module
+Retries with jittered exponential backoff and per-store circuit breakers.
+"""
+
+import random
+import threading
+import time
+from typing import Any, Callable, Tuple, Type
+
+
+class RetryPolicy:
+    """Bounded retries with full-jitter exponential backoff."""
+    
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.2,
+                 max_delay: float = 5.0, jitter: bool = True):
+        """
+        Initialize the policy.
+        
+        Args:
+            max_attempts: Total attempts including the first one
+            base_delay: Backoff before the first retry, in seconds
+            max_delay: Upper bound on any single backoff, in seconds
+            jitter: Randomize each backoff between 0 and its bound
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+    
+    def backoff(self, attempt: int) -> float:
+        """Get the delay before retry number ``attempt`` (starting at 1)."""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, delay) if self.jitter else delay
+    
+    def call(self, func: Callable[..., Any], *args: Any,
+             retry_on: Tuple[Type[BaseException], ...] = (Exception,)) -> Any:
+        """Call ``func`` until it succeeds, retrying only on ``retry_on`` errors."""
+        attempt = 1
+        while True:
+            try:
+                return func(*args)
+            except retry_on:
+                if attempt >= self.max_attempts:
+                    raise
+                time.sleep(self.backoff(attempt))
+                attempt += 1
+
+
+class CircuitBreaker:
+    """
+    Stops calls to a failing dependency for a cool-down window.
+    
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    rejects calls. Once the cool-down has passed it lets a single trial
+    call through (half-open); success closes it, failure reopens it.
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 60.0):
+        """
+        Initialize the breaker.
+        
+        Args:
+            failure_threshold: Consecutive failures that open the breaker
+            cooldown: Seconds to stay open before allowing a trial call
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self._lock = threading.Lock()
+    
+    def is_open(self) -> bool:
+        """Check whether calls are currently being rejected."""
+        with self._lock:
+            if self.state == self.OPEN:
+                return time.monotonic() - self.opened_at < self.cooldown
+            return self.state == self.HALF_OPEN
+    
+    def allow(self) -> bool:
+        """Check whether a call may go through, moving to half-open if due."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+    
+    def record_success(self) -> None:
+        """Record a successful call."""
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+    
+    def record_failure(self) -> None:
+        """Record a failed call, opening the breaker if needed."""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.trips += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
@@ -0,0 +1,136 @@
+"""
+Response Cache Module
+On-disk cache of HTTP validators and parsed prices for conditional requests.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from durable_io import atomic_write_json
+
+
+class ResponseCache:
+    """
+    LRU cache of ETag/Last-Modified validators and the last parsed price
+    for each (product, store), persisted as JSON.
+    """
+    
+    def __init__(self, path: Optional[Union[str, Path]] = None, max_entries: int = 10000):
+        """
+        Initialize the cache.
+        
+        Args:
+            path: JSON file to persist the cache to, or None to keep it in memory
+            max_entries: Maximum number of entries before the least recently
+                used ones are evicted
+        """
+        self.path = Path(path) if path else None
+        self.max_entries = max(1, max_entries)
+        self.entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+        self.bytes_downloaded = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+        self.load()
+    
+    @staticmethod
+    def _key(product_name: str, store: str) -> str:
+        """Build the cache key for a (product, store) pair."""
+        return f"{store}\x1f{product_name}"
+    
+    def load(self) -> None:
+        """Load cached entries from disk."""
+        if not self.path or not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r') as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable response cache {self.path}: {e}")
+            return
+        with self._lock:
+            self.entries = OrderedDict(entries)
+            self._evict()
+    
+    def save(self) -> None:
+        """Write cached entries to disk."""
+        if not self.path:
+            return
+        with self._lock:
+            entries = dict(self.entries)
+        atomic_write_json(self.path, entries)
+    
+    def lookup(self, product_name: str, store: str) -> Optional[Dict[str, Any]]:
+        """Get the cached entry for a pair, counting a hit or a miss."""
+        key = self._key(product_name, store)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+    
+    @staticmethod
+    def conditional_headers(entry: Dict[str, Any]) -> Dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers from an entry."""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+    
+    def record_not_modified(self, entry: Dict[str, Any]) -> None:
+        """Count a 304 response served from an entry."""
+        with self._lock:
+            self.not_modified += 1
+            self.bytes_saved += entry.get('size', 0)
+    
+    def store(self, product_name: str, store: str, etag: Optional[str],
+              last_modified: Optional[str], price: Optional[float], size: int) -> None:
+        """Remember the validators and parsed price of a full response."""
+        with self._lock:
+            self.bytes_downloaded += size
+            if not etag and not last_modified:
+                return
+            key = self._key(product_name, store)
+            self.entries[key] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'price': price,
+                'size': size
+            }
+            self.entries.move_to_end(key)
+            self._evict()
+    
+    def _evict(self) -> None:
+        """Drop least recently used entries beyond the size bound."""
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+    
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        with self._lock:
+            self.entries.clear()
+    
+    def stats(self) -> Dict[str, int]:
+        """Get cache counters."""
+        with self._lock:
+            return {
+                'entries': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified,
+                'evictions': self.evictions,
+                'bytes_downloaded': self.bytes_downloaded,
+                'bytes_saved': self.bytes_saved
+            }
@@ -0,0 +1,158 @@
+"""
+Scrape Scheduler Module
+Orders scraping work so the prices users watch are refreshed first.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from refresh_tracker import RefreshTracker
+
+
+class ScrapeScheduler:
+    """
+    Priority queue of (product, store) pairs to scrape.
+    
+    A pair's priority grows with the number of users who favorite the
+    product or the store, and with how far past its staleness budget it
+    is. Each pair also falls into a band ('high' for favorited products,
+    'normal' for favorited stores, 'low' otherwise) used for latency metrics.
+    """
+    
+    BANDS = ('high', 'normal', 'low')
+    
+    def __init__(self, tracker: Optional[RefreshTracker] = None,
+                 product_weight: float = 1.0, store_weight: float = 0.25,
+                 staleness_cap: float = 4.0):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            tracker: Refresh tracker used to measure staleness
+            product_weight: Priority added per user favoriting the product
+            store_weight: Priority added per user favoriting the store
+            staleness_cap: Upper bound on the staleness multiplier
+        """
+        self.tracker = tracker
+        self.product_weight = product_weight
+        self.store_weight = store_weight
+        self.staleness_cap = staleness_cap
+        self.product_favorites: Dict[str, int] = {}
+        self.store_favorites: Dict[str, int] = {}
+        self._heap: List[tuple] = []
+        self._counter = itertools.count()
+        self._latencies: Dict[str, List[float]] = {band: [] for band in self.BANDS}
+        self._lock = threading.Lock()
+    
+    def set_favorites(self, product_counts: Dict[str, int], store_counts: Dict[str, int]) -> None:
+        """Set how many users favorite each product and each store."""
+        self.product_favorites = dict(product_counts)
+        self.store_favorites = dict(store_counts)
+    
+    def band(self, product_name: str, store: str) -> str:
+        """Get the priority band of a pair."""
+        if self.product_favorites.get(product_name):
+            return 'high'
+        if self.store_favorites.get(store):
+            return 'normal'
+        return 'low'
+    
+    def priority(self, product_name: str, store: str, now: Optional[float] = None) -> float:
+        """Get the priority of a pair; higher is scraped sooner."""
+        weight = (
+            1.0
+            + self.product_weight * self.product_favorites.get(product_name, 0)
+            + self.store_weight * self.store_favorites.get(store, 0)
+        )
+        
+        staleness = self.staleness_cap
+        if self.tracker is not None:
+            age = self.tracker.age(product_name, store, now)
+            if age is not None:
+                staleness = min(self.staleness_cap, age / self.tracker.ttl(product_name, store))
+        return weight * max(staleness, 0.0)
+    
+    def push(self, product_name: str, store: str, now: Optional[float] = None) -> None:
+        """Queue a pair for scraping."""
+        now = time.time() if now is None else now
+        entry = (
+            -self.priority(product_name, store, now),
+            next(self._counter),
+            product_name,
+            store,
+            self.band(product_name, store),
+            time.monotonic()
+        )
+        with self._lock:
+            heapq.heappush(self._heap, entry)
+    
+    def extend(self, pairs: Iterable[Tuple[str, str]]) -> None:
+        """Queue many pairs for scraping."""
+        now = time.time()
+        for product_name, store in pairs:
+            self.push(product_name, store, now)
+    
+    def pop(self) -> Optional[Tuple[str, str, str, float]]:
+        """Take the highest-priority pair as (product, store, band, enqueued_at)."""
+        with self._lock:
+            if not self._heap:
+                return None
+            _, _, product_name, store, band, enqueued_at = heapq.heappop(self._heap)
+        return product_name, store, band, enqueued_at
+    
+    def complete(self, band: str, enqueued_at: float) -> None:
+        """Record that a popped pair finished scraping."""
+        with self._lock:
+            self._latencies[band].append(time.monotonic() - enqueued_at)
+    
+    def drain(self, fetch: Callable[[str, str], Optional[float]],
+              time_budget: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Scrape queued pairs in priority order.
+        
+        Args:
+            fetch: Function returning the price of a (product, store) pair
+            time_budget: Seconds after which to stop, leaving the rest queued
+            
+        Returns:
+            Dictionary with product names as keys and store prices as values
+        """
+        deadline = time.monotonic() + time_budget if time_budget is not None else None
+        prices = {}
+        while deadline is None or time.monotonic() < deadline:
+            item = self.pop()
+            if item is None:
+                break
+            product_name, store, band, enqueued_at = item
+            price = fetch(product_name, store)
+            self.complete(band, enqueued_at)
+            if price:
+                prices.setdefault(product_name, {})[store] = price
+        return prices
+    
+    def depth(self) -> int:
+        """Number of pairs still queued."""
+        with self._lock:
+            return len(self._heap)
+    
+    def clear(self) -> None:
+        """Drop all queued pairs."""
+        with self._lock:
+            self._heap = []
+    
+    def metrics(self) -> Dict[str, object]:
+        """Get queue depth and per-band scrape latency (seconds from enqueue to done)."""
+        with self._lock:
+            bands = {}
+            for band, latencies in self._latencies.items():
+                ordered = sorted(latencies)
+                bands[band] = {
+                    'completed': len(ordered),
+                    'avg_latency': sum(ordered) / len(ordered) if ordered else 0.0,
+                    'p95_latency': ordered[int(0.95 * (len(ordered) - 1))] if ordered else 0.0,
+                    'max_latency': ordered[-1] if ordered else 0.0
+                }
+            return {'queue_depth': len(self._heap), 'bands': bands}
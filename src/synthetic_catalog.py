@@ -0,0 +1,137 @@
+"""
+Synthetic Catalog Module
+Generates large, reproducible price catalogs for benchmarking.
+
+Seeded prices here and in PriceScraper (``PriceScraper(seed=...)``) share
+one fluctuation function; see ``fluctuation``.
+"""
+
+import hashlib
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+STORE_NAMES = ['Amazon', 'Walmart', 'Best Buy', 'Target', 'eBay']
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _splitmix64(x: np.ndarray) -> np.ndarray:
+    """Hash uint64 values with the SplitMix64 finalizer (wrapping arithmetic)."""
+    with np.errstate(over='ignore'):
+        x = x + _GOLDEN
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _uniform(*keys: np.ndarray) -> np.ndarray:
+    """Map broadcast uint64 keys to deterministic uniforms in [0, 1)."""
+    state = np.uint64(0)
+    for key in keys:
+        state = _splitmix64(state ^ np.asarray(key, dtype=np.uint64))
+    return (state >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+
+def name_key(*names: str) -> int:
+    """Hash names to a stable uint64 key (not randomized per process like ``hash``)."""
+    digest = hashlib.blake2b('\x1f'.join(names).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def fluctuation(seed: int, epoch: int, cell_keys) -> np.ndarray:
+    """
+    Seeded +/-10% price fluctuation per (seed, epoch, cell).
+    
+    This is the one seeded price function: generate_catalog keys cells by
+    (product, store) position and PriceScraper by ``name_key(store,
+    product)``, so the two draw from the same stream but a scraper does not
+    reproduce a catalog's prices.
+    
+    Args:
+        seed: Seed of the generated prices
+        epoch: Scrape epoch
+        cell_keys: uint64 key (or array of keys) per (product, store) cell
+        
+    Returns:
+        Fluctuations in [0.9, 1.1), shaped like ``cell_keys``
+    """
+    seed_key = np.uint64(seed & 0xFFFFFFFFFFFFFFFF)
+    return 0.9 + 0.2 * _uniform(seed_key, 3, np.uint64(epoch), cell_keys)
+
+
+class SyntheticCatalog:
+    """A product × store price matrix with NaN where a store lacks a product."""
+    
+    def __init__(self, products: List[str], stores: List[str], prices: np.ndarray):
+        self.products = products
+        self.stores = stores
+        self.prices = prices
+    
+    def to_price_dict(self) -> Dict[str, Dict[str, float]]:
+        """Convert to the ``{product: {store: price}}`` form (small catalogs only)."""
+        prices = {}
+        for product_name, row in zip(self.products, self.prices.tolist()):
+            store_prices = {
+                store: price for store, price in zip(self.stores, row) if price == price
+            }
+            if store_prices:
+                prices[product_name] = store_prices
+        return prices
+    
+    def product_records(self) -> List[Dict[str, object]]:
+        """Build ``products.json``-style records listing each product's stores."""
+        available = ~np.isnan(self.prices)
+        return [
+            {
+                'name': product_name,
+                'stores': [store for store, ok in zip(self.stores, row) if ok]
+            }
+            for product_name, row in zip(self.products, available.tolist())
+        ]
+
+
+def generate_catalog(n_products: int, n_stores: int = 5, seed: int = 0, epoch: int = 0,
+                     missing_rate: float = 0.1, dtype=np.float64,
+                     stores: Optional[List[str]] = None) -> SyntheticCatalog:
+    """
+    Generate a synthetic catalog.
+    
+    Every price is a pure function of (seed, product, store, epoch), so a
+    catalog can be regenerated exactly and successive epochs only move
+    prices by their per-epoch fluctuation.
+    
+    Args:
+        n_products: Number of products
+        n_stores: Number of stores
+        seed: Seed for all generated values
+        epoch: Scrape epoch; changes the fluctuation of every price
+        missing_rate: Fraction of (product, store) cells with no price
+        dtype: Floating point dtype of the price matrix
+        stores: Store names (default: the usual stores, then numbered ones)
+        
+    Returns:
+        Synthetic catalog with an ``n_products × n_stores`` price matrix
+    """
+    if stores is None:
+        stores = STORE_NAMES[:n_stores] + [
+            f"Store {i + 1}" for i in range(len(STORE_NAMES), n_stores)
+        ]
+    products = [f"Product {i:07d}" for i in range(n_products)]
+    
+    seed_key = np.uint64(seed & 0xFFFFFFFFFFFFFFFF)
+    product_keys = np.arange(n_products, dtype=np.uint64)[:, None]
+    store_keys = np.arange(n_stores, dtype=np.uint64)[None, :]
+    
+    # Base price: log-uniform between $5 and $2000 per product
+    base = np.exp(np.log(5.0) + _uniform(seed_key, 1, product_keys) * np.log(400.0))
+    # Store variance: a fixed markup per store, like PriceScraper's 'variance'
+    variance = 0.95 + 0.25 * _uniform(seed_key, 2, store_keys)
+    # Fluctuation: +/-10% per (product, store, epoch)
+    cell_keys = product_keys * np.uint64(n_stores) + store_keys
+    
+    prices = np.round(base * variance * fluctuation(seed, epoch, cell_keys), 2).astype(dtype, copy=False)
+    missing = _uniform(seed_key, 4, cell_keys) < missing_rate
+    prices[missing] = np.nan
+    return SyntheticCatalog(products, stores, prices)
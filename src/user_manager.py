@@ -5,9 +5,11 @@ Handles user login, registration, and session management.
 
 import json
 import hashlib
+import os
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, Tuple
+from durable_io import atomic_write_json
 
 
 class UserManager:
@@ -21,21 +23,32 @@ class UserManager:
         self.load_users()
     
     def load_users(self) -> Dict:
-        """Load users from file."""
-        if self.users_file.exists():
+        """
+        Load users from file.
+        
+        An unreadable file is moved aside to ``users.json.corrupt-<time>``
+        with a warning, so the next save can't overwrite the accounts in it.
+        """
+        try:
+            with open(self.users_file, 'r') as f:
+                self.users = json.load(f)
+        except FileNotFoundError:
+            self.users = {}
+        except ValueError as e:
+            backup = self.users_file.with_name(
+                f"{self.users_file.name}.corrupt-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+            )
             try:
-                with open(self.users_file, 'r') as f:
-                    self.users = json.load(f)
-            except:
-                self.users = {}
-        else:
+                os.replace(self.users_file, backup)
+                print(f"Warning: {self.users_file} is corrupt ({e}); moved it to {backup}")
+            except OSError as move_error:
+                print(f"Warning: {self.users_file} is corrupt ({e}) and could not be moved aside: {move_error}")
             self.users = {}
         return self.users
     
     def save_users(self) -> None:
-        """Save users to file."""
-        with open(self.users_file, 'w') as f:
-            json.dump(self.users, f, indent=2)
+        """Save users to file, replacing it atomically."""
+        atomic_write_json(self.users_file, self.users, indent=2)
     
     def hash_password(self, password: str) -> str:
         """Hash a password using SHA256."""
@@ -170,3 +183,20 @@ class UserManager:
         if username in self.users:
             return self.users[username]['preferences'].get('favorite_products', [])
         return []
+    
+    def get_favorite_counts(self) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """
+        Count how many users favorite each product and each store.
+        
+        Returns:
+            (product counts: dict, store counts: dict)
+        """
+        product_counts = {}
+        store_counts = {}
+        for user in self.users.values():
+            preferences = user.get('preferences', {})
+            for product in preferences.get('favorite_products', []):
+                product_counts[product] = product_counts.get(product, 0) + 1
+            for store in preferences.get('favorite_stores', []):
+                store_counts[store] = store_counts.get(store, 0) + 1
+        return product_counts, store_counts
@@ -0,0 +1,35 @@
+"""
+Test configuration: the app's modules live flat in src/ and are imported by
+name, so put src/ (and this directory, for fake_store) on the import path.
+
+Tests marked ``slow`` assert wall-clock timings, which a loaded machine can
+fail; they only run with ``--run-slow``.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+for path in (ROOT / "src", ROOT / "tests"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+
+def pytest_addoption(parser):
+    parser.addoption('--run-slow', action='store_true', default=False,
+                     help="also run the timing tests marked 'slow'")
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', "slow: asserts wall-clock timings; run with --run-slow")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--run-slow'):
+        return
+    skip = pytest.mark.skip(reason="timing test; run with --run-slow")
+    for item in items:
+        if 'slow' in item.keywords:
+            item.add_marker(skip)
@@ -0,0 +1,194 @@
+"""
+Fake Store Module
+Local HTTP stand-in for store product pages, used by the tests and benchmarks.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+
+class FakeStoreServer:
+    """
+    Serves ``GET /<store>/search?q=<product>`` as a small JSON page with a
+    price, on a free local port.
+    
+    Connections and requests are counted so tests can check keep-alive
+    reuse. Faults can be injected per store: a fixed status for every
+    request (``down``), or a sequence of statuses for the next requests
+    (``fail_next``). ``latency`` delays every response, like a slow store.
+    
+    Pages carry an ETag (a hash of the body) and a Last-Modified date, and
+    conditional requests whose validators still match are answered with
+    an empty 304, as a real store's CDN would.
+    """
+    
+    def __init__(self, latency: float = 0.0, prices: Optional[Dict[str, float]] = None,
+                 page_size: int = 0, etag: bool = True, last_modified: bool = True):
+        """
+        Initialize the server (call ``start`` or use it as a context manager).
+        
+        Args:
+            latency: Seconds to wait before answering each request
+            prices: Fixed prices by product name; others get a hash-derived price
+            page_size: Pad pages with filler up to this many bytes
+            etag: Send ETag headers and honour If-None-Match
+            last_modified: Send Last-Modified headers and honour If-Modified-Since
+        """
+        self.latency = latency
+        self.prices = dict(prices or {})
+        self.page_size = page_size
+        self.etag = etag
+        self.last_modified = last_modified
+        self.connections = 0
+        self.requests = 0
+        self.not_modified = 0
+        self.store_requests: Dict[str, int] = {}
+        # Whole seconds, like HTTP dates; set_price moves a product's date on
+        self._created = int(time.time()) - 3600
+        self._modified: Dict[str, int] = {}
+        self._down: Dict[str, int] = {}
+        self._faults: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def url(self) -> str:
+        """Base URL of the running server."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def url_template(self, store: str) -> str:
+        """URL template for a RegexStoreAdapter scraping ``store`` from this server."""
+        return f"{self.url}/{quote(store)}/search?q={{query}}"
+    
+    def price(self, product_name: str) -> float:
+        """Price served for a product."""
+        if product_name in self.prices:
+            return self.prices[product_name]
+        digest = hashlib.blake2b(product_name.encode('utf-8'), digest_size=4).digest()
+        return round(5 + int.from_bytes(digest, 'little') % 100000 / 100, 2)
+    
+    def set_price(self, product_name: str, price: float) -> None:
+        """Change a product's price, moving its Last-Modified date forward."""
+        with self._lock:
+            self.prices[product_name] = price
+            self._modified[product_name] = self._modified.get(product_name, self._created) + 1
+    
+    def down(self, store: str, status: Optional[int] = 503) -> None:
+        """Answer every request for a store with ``status`` (None: back up)."""
+        with self._lock:
+            if status is None:
+                self._down.pop(store, None)
+            else:
+                self._down[store] = status
+    
+    def fail_next(self, store: str, *statuses: int) -> None:
+        """Answer the next requests for a store with these statuses, in order."""
+        with self._lock:
+            self._faults.setdefault(store, []).extend(statuses)
+    
+    def _validators(self, product_name: str, body: bytes) -> Dict[str, str]:
+        """Get the ETag and Last-Modified headers of a page."""
+        headers = {}
+        if self.etag:
+            headers['ETag'] = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+        if self.last_modified:
+            with self._lock:
+                modified = self._modified.get(product_name, self._created)
+            headers['Last-Modified'] = formatdate(modified, usegmt=True)
+        return headers
+    
+    def _is_fresh(self, request_headers, validators: Dict[str, str]) -> bool:
+        """Check a conditional request's validators; If-None-Match wins when sent."""
+        if_none_match = request_headers.get('If-None-Match')
+        if if_none_match is not None:
+            return 'ETag' in validators and validators['ETag'] in (tag.strip() for tag in if_none_match.split(','))
+        if_modified_since = request_headers.get('If-Modified-Since')
+        if if_modified_since is not None and 'Last-Modified' in validators:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            return parsedate_to_datetime(validators['Last-Modified']) <= since
+        return False
+    
+    def _respond(self, path: str, request_headers=None):
+        """Get the (status, body, headers) for a request."""
+        parts = urlsplit(path)
+        store = unquote(parts.path.strip('/').split('/')[0])
+        product_name = parse_qs(parts.query).get('q', [''])[0]
+        with self._lock:
+            self.requests += 1
+            self.store_requests[store] = self.store_requests.get(store, 0) + 1
+            status = self._down.get(store)
+            if status is None and self._faults.get(store):
+                status = self._faults[store].pop(0)
+        if status is not None:
+            return status, b'{"error": "injected fault"}', {}
+        
+        body = json.dumps({'name': product_name, 'price': f"{self.price(product_name):.2f}"}).encode('utf-8')
+        if len(body) < self.page_size:
+            body += b" " * (self.page_size - len(body))
+        validators = self._validators(product_name, body)
+        if request_headers is not None and self._is_fresh(request_headers, validators):
+            with self._lock:
+                self.not_modified += 1
+            return 304, b"", validators
+        return 200, body, validators
+    
+    def start(self) -> 'FakeStoreServer':
+        """Start serving on a background thread."""
+        fake = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 keeps connections open between requests
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out in separate writes; without NODELAY
+            # each response waits ~40 ms for the client's delayed ACK
+            disable_nagle_algorithm = True
+            
+            def setup(self):
+                super().setup()
+                with fake._lock:
+                    fake.connections += 1
+            
+            def do_GET(self):
+                if fake.latency:
+                    time.sleep(fake.latency)
+                status, body, headers = fake._respond(self.path, self.headers)
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        """Stop the server."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+    
+    def __enter__(self) -> 'FakeStoreServer':
+        return self.start()
+    
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
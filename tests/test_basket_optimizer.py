@@ -0,0 +1,41 @@
+"""
+Tests for BasketOptimizer and ComparisonEngine.optimize_basket.
+"""
+
+import pytest
+
+from basket_optimizer import BasketOptimizer
+from comparison_engine import ComparisonEngine
+from price_snapshot import PriceSnapshot
+
+
+PRICES = {
+    'Laptop': {'Amazon': 900.0, 'Walmart': 950.0, 'eBay': 870.0},
+    'Mouse': {'Amazon': 20.0, 'Walmart': 18.0},
+    'Cable': {'Walmart': 5.0, 'eBay': 7.0},
+}
+
+
+@pytest.mark.parametrize('quantity', [0, -1, float('nan')])
+def test_non_positive_quantities_are_rejected(quantity):
+    with pytest.raises(ValueError, match='Mouse'):
+        BasketOptimizer(PRICES).optimize({'Laptop': 1, 'Mouse': quantity})
+
+
+def test_quantities_scale_line_costs():
+    plan = BasketOptimizer(PRICES).optimize({'Laptop': 1, 'Mouse': 2, 'Cable': 3}, max_stores=2)
+    
+    assert plan['items']['Mouse'] == {'store': 'Walmart', 'price': 18.0, 'quantity': 2, 'cost': 36.0}
+    assert plan['total'] == 870.0 + 36.0 + 15.0
+
+
+def test_vectorized_results_keep_their_optimizer(tmp_path):
+    path = tmp_path / 'prices.snap'
+    PriceSnapshot.from_dict(PRICES).save_binary(path)
+    engine = ComparisonEngine()
+    results = engine.compare_file(path)
+    
+    plan = engine.optimize_basket(results, ['Laptop', 'Mouse', 'Cable'])
+    
+    assert engine.compare_file(path).basket_optimizer() is results.basket_optimizer()
+    assert plan == engine.optimize_basket(PRICES, ['Laptop', 'Mouse', 'Cable'])
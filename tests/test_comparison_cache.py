@@ -0,0 +1,146 @@
+"""
+Tests for ComparisonEngine's memoized results: hit/miss counting,
+invalidation when a prices file changes, and concurrent lookups.
+"""
+
+import os
+import threading
+
+from comparison_engine import ComparisonEngine, MatrixComparison
+from durable_io import atomic_write_json
+from price_snapshot import PriceSnapshot
+
+
+PRICES = {
+    'Laptop': {'Amazon': 899.99, 'Walmart': 949.99},
+    'Mouse': {'Amazon': 19.99, 'Target': 24.99},
+    'Cable': {'eBay': 9.99, 'Walmart': 9.99},
+}
+
+
+def save(path, prices):
+    """Save prices as prices.json or a binary snapshot, replacing the file."""
+    if path.suffix == '.snap':
+        PriceSnapshot.from_dict(prices).save_binary(path)
+    else:
+        atomic_write_json(path, {'timestamp': '2026-01-01T00:00:00', 'prices': prices})
+
+
+def test_hits_and_misses_are_counted():
+    engine = ComparisonEngine()
+    snapshot = PriceSnapshot.from_dict(PRICES)
+    
+    first = engine.compare(snapshot)
+    again = engine.compare(PriceSnapshot.from_dict(PRICES))
+    other = engine.compare(PriceSnapshot.from_dict({'Laptop': {'Amazon': 1.0}}))
+    
+    assert again is first and other is not first
+    assert engine.cache_stats() == {'entries': 2, 'max_entries': 32, 'hits': 1, 'misses': 2}
+    # Dict input is never memoized
+    engine.compare(PRICES)
+    assert engine.cache_stats()['entries'] == 2
+
+
+def test_least_recently_used_results_are_evicted():
+    engine = ComparisonEngine(cache_size=2)
+    snapshots = [PriceSnapshot.from_dict({'Laptop': {'Amazon': float(price)}}) for price in (1, 2, 3)]
+    
+    first = engine.compare(snapshots[0])
+    engine.compare(snapshots[1])
+    engine.compare(snapshots[0])
+    engine.compare(snapshots[2])
+    
+    assert engine.compare(snapshots[0]) is first
+    assert engine.cache_stats()['hits'] == 2
+    engine.compare(snapshots[1])
+    assert engine.cache_stats() == {'entries': 2, 'max_entries': 2, 'hits': 2, 'misses': 4}
+
+
+def test_disabled_cache_counts_misses_only():
+    engine = ComparisonEngine(cache_size=0)
+    snapshot = PriceSnapshot.from_dict(PRICES)
+    
+    assert engine.compare(snapshot) is not engine.compare(snapshot)
+    assert engine.cache_stats() == {'entries': 0, 'max_entries': 0, 'hits': 0, 'misses': 2}
+
+
+def test_changed_files_are_compared_again(tmp_path):
+    for name in ('prices.json', 'prices.snap'):
+        path = tmp_path / name
+        save(path, PRICES)
+        engine = ComparisonEngine()
+        
+        first = engine.compare_file(path)
+        assert engine.compare_file(path) is first
+        
+        # A replaced file has a new version; the old results are dropped
+        save(path, {**PRICES, 'Laptop': {'Amazon': 799.99}})
+        changed = engine.compare_file(path)
+        assert changed['Laptop']['best_deal']['price'] == 799.99
+        assert engine.cache_stats() == {'entries': 1, 'max_entries': 32, 'hits': 1, 'misses': 2}
+        
+        # So is one touched in place
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert engine.compare_file(path) is not changed
+        assert engine.cache_stats()['misses'] == 3
+
+
+def test_invalidate_drops_one_file_or_everything(tmp_path):
+    engine = ComparisonEngine()
+    paths = [tmp_path / 'a.json', tmp_path / 'b.json']
+    for path in paths:
+        save(path, PRICES)
+    first = [engine.compare_file(path) for path in paths]
+    snapshot = engine.compare(PriceSnapshot.from_dict(PRICES))
+    
+    engine.invalidate(str(paths[0]))
+    assert engine.compare_file(paths[0]) is not first[0]
+    assert engine.compare_file(paths[1]) is first[1]
+    
+    engine.invalidate()
+    assert engine.cache_stats()['entries'] == 0
+    assert engine.compare(PriceSnapshot.from_dict(PRICES)) is not snapshot
+
+
+def test_concurrent_compare_file_calls_agree(tmp_path):
+    path = tmp_path / 'prices.json'
+    save(path, PRICES)
+    engine = ComparisonEngine()
+    results = []
+    barrier = threading.Barrier(8)
+    
+    def compare():
+        barrier.wait()
+        for _ in range(20):
+            results.append(engine.compare_file(path))
+    
+    threads = [threading.Thread(target=compare) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    stats = engine.cache_stats()
+    assert len(results) == 160
+    assert stats['hits'] + stats['misses'] == 160 and stats['entries'] == 1
+    expected = ComparisonEngine().compare(PRICES, dispersion=True)
+    assert all(result.to_dict() == expected for result in results)
+    # The cached object is one that a caller was given
+    cached = engine.compare_file(path)
+    assert any(result is cached for result in results)
+
+
+def test_membership_is_a_row_lookup(monkeypatch):
+    results = ComparisonEngine().compare(PriceSnapshot.from_dict({**PRICES, 'Gadget': {}}))
+    
+    def no_result(row):
+        raise AssertionError("membership built a result dict")
+    
+    assert 'Gadget' in results.products
+    monkeypatch.setattr(results, 'result', no_result)
+    assert 'Laptop' in results and 'Cable' in results
+    # Products without prices are not results
+    assert 'Gadget' not in results and 'Keyboard' not in results
+    assert ['unhashable'] not in results
+    assert isinstance(results, MatrixComparison)
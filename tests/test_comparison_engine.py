@@ -0,0 +1,75 @@
+"""
+Tests for ComparisonEngine's dict, matrix and parallel comparison paths.
+"""
+
+import itertools
+
+from comparison_engine import ComparisonEngine, IncrementalComparisonEngine
+from price_snapshot import PriceSnapshot
+
+
+TIES = {
+    'Laptop': {'Walmart': 9.0, 'Amazon': 9.0},
+    'Mouse': {'Amazon': 5.0, 'Walmart': 5.0, 'eBay': 5.0},
+    'Monitor': {'eBay': 4.0, 'Target': 7.0, 'Amazon': 4.0},
+}
+
+
+def test_ties_pick_the_same_store_in_every_path():
+    engine = ComparisonEngine()
+    snapshot = PriceSnapshot.from_dict(TIES)
+    paths = {
+        'dict': engine.compare(TIES),
+        'snapshot': engine.compare(snapshot),
+        'matrix': engine.compare_matrix(snapshot.products, snapshot.stores, snapshot.prices),
+        'parallel': engine.compare_parallel(snapshot, workers=1, shards=2),
+    }
+    
+    for name, results in paths.items():
+        best = {product: results[product]['best_deal']['store'] for product in TIES}
+        assert best == {'Laptop': 'Amazon', 'Mouse': 'Amazon', 'Monitor': 'Amazon'}, name
+
+
+def test_dict_ties_ignore_the_order_stores_are_listed_in():
+    # Breaking change: dict input used to give a tie to the first store listed
+    engine = ComparisonEngine()
+    
+    for stores in itertools.permutations(['Walmart', 'eBay', 'Amazon', 'Target']):
+        store_prices = {store: 9.0 if store != 'Target' else 12.0 for store in stores}
+        records = [('Laptop', store, price) for store, price in store_prices.items()]
+        
+        assert engine.compare({'Laptop': store_prices})['Laptop']['best_deal']['store'] == 'Amazon'
+        assert dict(engine.compare_stream(records))['Laptop']['best_deal']['store'] == 'Amazon'
+        incremental = IncrementalComparisonEngine()
+        incremental.apply_updates(records)
+        assert incremental.results['Laptop']['best_deal']['store'] == 'Amazon'
+
+
+def test_dispersion_statistics_are_opt_in_for_dicts():
+    prices = {
+        'Laptop': {'Amazon': 900.0, 'Walmart': 950.0, 'eBay': 870.0, 'Target': 910.0},
+        'Mouse': {'Amazon': 20.0, 'Walmart': 22.0, 'eBay': 27.0},
+    }
+    engine = ComparisonEngine()
+    plain = engine.compare(prices)
+    full = engine.compare(prices, dispersion=True)
+    matrix = engine.compare(PriceSnapshot.from_dict(prices))
+    
+    assert 'median_price' not in plain['Laptop']['statistics']
+    for product in prices:
+        assert full[product]['statistics'] == matrix[product]['statistics']
+        extras = {'median_price', 'std_dev', 'dispersion_score'}
+        assert {key: value for key, value in full[product]['statistics'].items()
+                if key not in extras} == plain[product]['statistics']
+
+
+def test_averages_round_the_same_whatever_the_tie_order():
+    # Summed in store name order these average 19.595..., which rounds up
+    prices = {'Laptop': {'eBay': 18.76, 'Walmart': 27.48, 'Target': 16.31, 'Amazon': 15.83}}
+    snapshot = PriceSnapshot.from_dict(prices)
+    engine = ComparisonEngine()
+    
+    expected = engine.compare(prices)['Laptop']['statistics']['average_price']
+    results = engine.compare_matrix(snapshot.products, snapshot.stores, snapshot.prices)
+    assert expected == 19.59
+    assert results['Laptop']['statistics']['average_price'] == expected
@@ -0,0 +1,42 @@
+"""
+Tests for the crash-safe writes in durable_io.
+"""
+
+import os
+import stat
+
+from durable_io import atomic_write, atomic_write_json
+
+
+def test_new_file_mode_follows_umask(tmp_path):
+    old = os.umask(0o027)
+    try:
+        atomic_write(tmp_path / 'new.txt', 'data')
+        assert os.umask(0o027) == 0o027
+    finally:
+        os.umask(old)
+    
+    assert stat.S_IMODE(os.stat(tmp_path / 'new.txt').st_mode) == 0o640
+
+
+def test_replacing_keeps_mode_and_leaves_no_temp_files(tmp_path):
+    path = tmp_path / 'data.json'
+    atomic_write_json(path, {'a': 1})
+    os.chmod(path, 0o604)
+    atomic_write_json(path, {'a': 2})
+    
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o604
+    assert path.read_text() == '{"a": 2}'
+    assert os.listdir(tmp_path) == ['data.json']
+
+
+def test_failed_write_keeps_old_contents(tmp_path):
+    path = tmp_path / 'data.txt'
+    atomic_write(path, 'old')
+    try:
+        atomic_write(path, object())
+    except TypeError:
+        pass
+    
+    assert path.read_text() == 'old'
+    assert os.listdir(tmp_path) == ['data.txt']
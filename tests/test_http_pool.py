@@ -0,0 +1,65 @@
+"""
+Tests that store requests reuse pooled keep-alive connections over full
+scrape runs, against a local HTTP stand-in server that counts connections.
+"""
+
+import asyncio
+
+import pytest
+
+from fake_store import FakeStoreServer
+from main import PriceComparisonApp
+from price_scraper import PriceScraper, RegexStoreAdapter, add_store
+
+
+STORES = ['Amazon', 'Walmart', 'Best Buy', 'Target', 'eBay']
+PRODUCTS = [{'name': f"Product {i}", 'stores': STORES} for i in range(20)]
+
+
+def live_app(tmp_path, server, pool_size):
+    """App whose scraper fetches every store from ``server``, without rate limits."""
+    app = PriceComparisonApp(str(tmp_path))
+    app.scraper = PriceScraper(pool_size=pool_size)
+    for store in STORES:
+        add_store(app.scraper, store, delay=0, max_concurrency=8,
+                  adapter=RegexStoreAdapter(server.url_template(store)))
+    return app
+
+
+@pytest.fixture
+def server():
+    with FakeStoreServer() as fake:
+        yield fake
+
+
+def test_sequential_run_uses_one_connection(tmp_path, server):
+    app = live_app(tmp_path, server, pool_size=4)
+    prices = app.scrape_prices(PRODUCTS)
+    
+    assert server.requests == len(PRODUCTS) * len(STORES)
+    assert app.scraper.http.connections_created() == 1
+    assert server.connections == 1
+    assert prices['Product 3']['Target'] == server.price('Product 3')
+
+
+def test_async_run_stays_within_pool_size(tmp_path, server):
+    app = live_app(tmp_path, server, pool_size=3)
+    prices = asyncio.run(app.scrape_prices_async(PRODUCTS, concurrency=8))
+    
+    assert server.requests == len(PRODUCTS) * len(STORES)
+    # Eight fetches in flight share at most three connections to the host
+    assert 1 <= app.scraper.http.connections_created() <= 3
+    assert server.connections == app.scraper.http.connections_created()
+    assert prices == live_app(tmp_path, server, pool_size=1).scrape_prices(PRODUCTS)
+
+
+def test_pools_are_per_host(tmp_path, server):
+    with FakeStoreServer() as other:
+        app = live_app(tmp_path, server, pool_size=4)
+        add_store(app.scraper, 'Other', delay=0, adapter=RegexStoreAdapter(other.url_template('Other')))
+        products = [{'name': f"Product {i}", 'stores': ['Amazon', 'Other']} for i in range(10)]
+        app.scrape_prices(products)
+        
+        assert len(app.scraper.http.pools) == 2
+        assert server.connections == 1 and other.connections == 1
+        assert app.scraper.http.connections_created() == 2
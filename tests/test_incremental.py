@@ -0,0 +1,49 @@
+"""
+Tests for incremental scrapes driven by the scrape scheduler.
+"""
+
+import time
+
+import pytest
+
+from fake_store import FakeStoreServer
+from main import PriceComparisonApp
+from price_scraper import PriceScraper, RegexStoreAdapter, add_store
+
+
+PRODUCTS = [{'name': f"Product {i}", 'stores': ['Slow']} for i in range(20)]
+
+
+@pytest.fixture
+def app(tmp_path):
+    with FakeStoreServer(latency=0.05) as server:
+        app = PriceComparisonApp(str(tmp_path))
+        app.scraper = PriceScraper()
+        add_store(app.scraper, 'Slow', delay=0, max_concurrency=2,
+                  adapter=RegexStoreAdapter(server.url_template('Slow')))
+        yield app
+        app.scraper.close()
+
+
+@pytest.mark.parametrize('concurrency', [None, 2])
+def test_time_budget_cuts_the_cycle_short(app, concurrency):
+    start = time.perf_counter()
+    prices = app.scrape_prices_incremental(PRODUCTS, concurrency, time_budget=0.2)
+    elapsed = time.perf_counter() - start
+    
+    # 20 fetches of 50 ms would take 0.5 s even two at a time
+    assert elapsed < 0.4
+    completed = app.scheduler.metrics()['bands']['low']['completed']
+    assert 0 < len(prices) == completed < len(PRODUCTS)
+    assert app.scheduler.depth() == 0
+    # Only the fetched prices are fresh; the rest are due next cycle
+    due = app.tracker.due_pairs([(product['name'], 'Slow') for product in PRODUCTS])
+    assert len(due) == len(PRODUCTS) - completed
+
+
+def test_concurrent_cycle_completes_every_pair(app):
+    prices = app.scrape_prices_incremental(PRODUCTS, concurrency=2)
+    
+    assert len(prices) == len(PRODUCTS)
+    assert app.scheduler.metrics()['bands']['low']['completed'] == len(PRODUCTS)
+    assert app.tracker.due_pairs([(product['name'], 'Slow') for product in PRODUCTS]) == []
@@ -0,0 +1,76 @@
+"""
+Tests for IncrementalComparisonEngine against full comparisons.
+"""
+
+import random
+
+import pytest
+
+from comparison_engine import ComparisonEngine, IncrementalComparisonEngine
+from price_index import PriceIndex
+
+
+STORES = ['Amazon', 'Walmart', 'Best Buy', 'Target', 'eBay']
+
+
+def random_updates(rng, products, count):
+    """Adds, changes and removals over a small catalog, with repeated prices for ties."""
+    updates = []
+    for _ in range(count):
+        product_name = f"Product {rng.randrange(products)}"
+        store = rng.choice(STORES)
+        price = None if rng.random() < 0.3 else rng.choice([9.99, 19.99, round(rng.uniform(5, 100), 2)])
+        updates.append((product_name, store, price))
+    return updates
+
+
+def assert_matches_full_compare(engine):
+    expected = ComparisonEngine().compare(engine.prices)
+    assert engine.results == expected
+    
+    deals = engine.get_best_deals_by_store()
+    expected_deals = ComparisonEngine().get_best_deals_by_store(expected)
+    assert {store: sorted(d['product'] for d in items) for store, items in deals.items()} == \
+        {store: sorted(d['product'] for d in items) for store, items in expected_deals.items()}
+    assert engine.total_savings == pytest.approx(
+        sum(result['statistics']['price_range'] for result in expected.values()), abs=1e-6
+    )
+    
+    # Ties on a key are in name order, so the incremental index matches a fresh build exactly
+    full = PriceIndex.build(expected)
+    for low, high in [(0, 1000), (9.99, 19.99), (20, 60)]:
+        assert engine.index.in_price_range(low, high) == full.in_price_range(low, high)
+    for k in (1, 5, 100):
+        assert engine.index.top_savings(k) == full.top_savings(k)
+        assert engine.index.cheapest(k) == full.cheapest(k)
+    assert len(engine.index) == len(expected)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_apply_updates_matches_a_full_compare(seed):
+    rng = random.Random(seed)
+    engine = IncrementalComparisonEngine()
+    engine.apply_updates(random_updates(rng, 20, 60))
+    assert_matches_full_compare(engine)
+    
+    for _ in range(20):
+        updates = random_updates(rng, 25, rng.randint(1, 8))
+        changed = engine.apply_updates(updates)
+        assert changed <= {product_name for product_name, _, _ in updates}
+        assert_matches_full_compare(engine)
+    
+    # A fresh load of the same prices ends up in the same state
+    reloaded = IncrementalComparisonEngine(engine.prices)
+    assert reloaded.results == engine.results
+    assert_matches_full_compare(reloaded)
+
+
+def test_removing_prices_of_unknown_products_leaves_no_entry():
+    engine = IncrementalComparisonEngine({'Laptop': {'Amazon': 900.0}})
+    
+    changed = engine.apply_updates([('Mouse', 'Amazon', None), ('Laptop', 'eBay', None)])
+    
+    assert changed == set()
+    assert engine.prices == {'Laptop': {'Amazon': 900.0}}
+    assert engine.apply_updates([('Laptop', 'Amazon', None)]) == {'Laptop'}
+    assert engine.prices == {} and engine.results == {} and len(engine.index) == 0
@@ -0,0 +1,23 @@
+"""
+Tests that compare_parallel matches the serial matrix comparison.
+"""
+
+import numpy as np
+import pytest
+
+from comparison_engine import ComparisonEngine
+from parallel_compare import compare_parallel
+from synthetic_catalog import generate_catalog
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_parallel_matches_compare_matrix(dtype):
+    catalog = generate_catalog(3000, 7, seed=11, missing_rate=0.3, dtype=dtype)
+    serial = ComparisonEngine().compare_matrix(catalog.products, catalog.stores, catalog.prices)
+    
+    parallel = compare_parallel(catalog.products, catalog.stores, catalog.prices, workers=2, shards=7)
+    
+    for name in ('min_price', 'max_price', 'best_store_index', 'count', 'average_price',
+                 'std_dev', 'median_price', 'rows'):
+        assert np.array_equal(getattr(parallel, name), getattr(serial, name), equal_nan=True), name
+    assert parallel.to_dict() == serial.to_dict()
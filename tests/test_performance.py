@@ -0,0 +1,123 @@
+"""
+Regression tests for the speed claims, on generate_catalog catalogs.
+
+Each fast path is checked against the slow path it replaced for the same
+answers. The timing checks are marked ``slow`` and only run with
+``--run-slow``, since wall-clock margins fail on a loaded machine;
+bench/bench_catalog.py reruns the claims at full size.
+"""
+
+import itertools
+import time
+
+import numpy as np
+import pytest
+
+from basket_optimizer import BasketOptimizer
+from comparison_engine import ComparisonEngine
+from keyword_matcher import KeywordMatcher
+from price_snapshot import PriceSnapshot
+from synthetic_catalog import generate_catalog
+
+
+def best_time(func, repeat: int = 3) -> float:
+    """Best of ``repeat`` runs of ``func``, in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def linear_scan(table, name):
+    """Base-price lookup as PriceScraper did it before KeywordMatcher."""
+    for key, price in table.items():
+        if key in name.lower():
+            return price
+    return None
+
+
+def keyword_setup():
+    """A 2000-name base-price table and 500 store titles naming catalog products."""
+    catalog = generate_catalog(2200, seed=1)
+    table = {
+        name.lower(): float(price)
+        for name, price in zip(catalog.products[:2000], np.nanmin(catalog.prices, axis=1).tolist())
+    }
+    rng = np.random.default_rng(1)
+    titles = [f"{catalog.stores[row % 5]} {catalog.products[row]} (refurbished)"
+              for row in rng.integers(0, 2200, 500).tolist()]
+    return KeywordMatcher(table, cache_size=0), table, titles
+
+
+def test_keyword_matcher_agrees_with_the_linear_scan():
+    matcher, table, titles = keyword_setup()
+    
+    assert [matcher.match(title) for title in titles] == [linear_scan(table, title) for title in titles]
+
+
+@pytest.mark.slow
+def test_keyword_matcher_beats_the_linear_scan():
+    matcher, table, titles = keyword_setup()
+    
+    scan = best_time(lambda: [linear_scan(table, title) for title in titles])
+    automaton = best_time(lambda: [matcher.match(title) for title in titles])
+    assert automaton * 5 < scan
+
+
+def test_compare_matrix_matches_dict_compare():
+    catalog = generate_catalog(5000, 20, seed=2)
+    engine = ComparisonEngine()
+    results = engine.compare_matrix(catalog.products, catalog.stores, catalog.prices)
+    
+    assert results.to_dict() == engine.compare(catalog.to_price_dict(), dispersion=True)
+
+
+@pytest.mark.slow
+def test_compare_matrix_beats_dict_compare():
+    catalog = generate_catalog(5000, 20, seed=2)
+    prices = catalog.to_price_dict()
+    engine = ComparisonEngine()
+    
+    dict_time = best_time(lambda: engine.compare(prices, dispersion=True))
+    matrix_time = best_time(lambda: engine.compare_matrix(
+        catalog.products, catalog.stores, catalog.prices
+    ).median_price)
+    assert matrix_time * 5 < dict_time
+
+
+@pytest.mark.slow
+def test_dict_compare_skips_the_dispersion_cost_unless_asked():
+    prices = generate_catalog(5000, 20, seed=3).to_price_dict()
+    engine = ComparisonEngine()
+    
+    plain = best_time(lambda: engine.compare(prices))
+    full = best_time(lambda: engine.compare(prices, dispersion=True))
+    assert plain < 0.8 * full
+
+
+def test_exact_basket_search_matches_brute_force():
+    catalog = generate_catalog(12, 8, seed=4, missing_rate=0.3)
+    snapshot = PriceSnapshot(catalog.products, catalog.stores, catalog.prices)
+    costs = np.where(np.isnan(catalog.prices), np.inf, catalog.prices)
+    
+    for max_stores in (1, 2, 3):
+        plan = BasketOptimizer(snapshot).optimize(catalog.products, max_stores)
+        best = min(
+            (np.isinf(totals).sum(), totals[np.isfinite(totals)].sum())
+            for subset in itertools.combinations(range(8), max_stores)
+            for totals in [costs[:, list(subset)].min(axis=1)]
+        )
+        assert plan['method'] == 'exact'
+        assert len(plan['unavailable']) == best[0]
+        assert plan['total'] == pytest.approx(best[1])
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize('max_stores', [1, 2, 3, 4, 5, 8])
+def test_basket_of_200_items_at_20_stores_takes_under_100_ms(max_stores):
+    catalog = generate_catalog(200, 20, seed=5)
+    optimizer = BasketOptimizer(PriceSnapshot(catalog.products, catalog.stores, catalog.prices))
+    
+    assert best_time(lambda: optimizer.optimize(catalog.products, max_stores)) < 0.1
@@ -0,0 +1,99 @@
+"""
+Tests for PriceDropDetector's baselines over a price history.
+"""
+
+import warnings
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from comparison_engine import ComparisonEngine, PriceDropDetector
+
+
+ZONES = [timezone.utc, timezone(timedelta(hours=2)), timezone(timedelta(hours=-5, minutes=-30))]
+
+
+def random_history(seed, rows=80, products=6):
+    """Aware timestamps in mixed zones a few hours to two days apart, and best prices with gaps."""
+    rng = np.random.default_rng(seed)
+    moment = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    timestamps = []
+    for row in range(rows):
+        moment += timedelta(hours=int(rng.integers(3, 48)))
+        timestamps.append(moment.astimezone(ZONES[row % len(ZONES)]))
+    prices = rng.uniform(50, 150, (rows, products)).round(2)
+    prices[rng.random((rows, products)) < 0.25] = np.nan
+    # One product only shows up late, one never before the last row
+    prices[:rows // 2, 0] = np.nan
+    prices[:-1, 1] = np.nan
+    return timestamps, prices
+
+
+def brute_force(timestamps, prices, at, week_days=7, month_days=30):
+    """Baselines from per-row time comparisons and nanmin/nanmedian per product."""
+    now = timestamps[at]
+    earlier = list(range(at))
+    week = [row for row in earlier if timestamps[row] >= now - timedelta(days=week_days)]
+    month = [row for row in earlier if timestamps[row] >= now - timedelta(days=month_days)]
+    
+    def reduce(rows, func):
+        values = prices[rows] if rows else np.empty((0, prices.shape[1]))
+        result = np.full(prices.shape[1], np.nan)
+        for column in range(prices.shape[1]):
+            present = values[:, column][~np.isnan(values[:, column])]
+            if len(present):
+                result[column] = func(present)
+        return result
+    
+    return {
+        'current': prices[at],
+        'week_low': reduce(week, np.min),
+        'month_median': reduce(month, np.median),
+        'all_time_low': reduce(earlier, np.min),
+    }
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_baselines_match_brute_force_with_aware_timestamps(seed):
+    timestamps, prices = random_history(seed)
+    detector = PriceDropDetector()
+    
+    for at in (1, 10, 40, 79, -1):
+        expected = brute_force(timestamps, prices, at % len(timestamps))
+        for stamps in (timestamps, [t.isoformat() for t in timestamps]):
+            with warnings.catch_warnings():
+                warnings.simplefilter('error')
+                stats = detector.baselines(stamps, prices, at)
+            for name, values in expected.items():
+                np.testing.assert_array_equal(stats[name], values, err_msg=f"{name} at {at}")
+
+
+def test_detected_drops_agree_with_the_baselines():
+    timestamps, prices = random_history(7)
+    # A record low for product 2 in the latest snapshot
+    prices[-1, 2] = 1.0
+    expected = brute_force(timestamps, prices, len(timestamps) - 1)
+    
+    drops = ComparisonEngine().find_price_drops_over_history(timestamps, [f"P{i}" for i in range(6)], prices)
+    
+    for column in range(6):
+        current = expected['current'][column]
+        flagged = any(current < expected[name][column] for name in ('week_low', 'month_median', 'all_time_low'))
+        assert (f"P{column}" in drops) == flagged
+    entry = drops['P2']
+    assert entry['is_all_time_low'] and entry['current_price'] == 1.0
+    assert entry['all_time_low'] == round(float(expected['all_time_low'][2]), 2)
+    low = expected['all_time_low'][2]
+    assert entry['drop_vs_all_time_low'] == round((low - 1.0) / low * 100, 2)
+    # No history before the last row: nothing to compare against
+    assert 'P1' not in drops
+
+
+def test_naive_timestamps_are_taken_as_utc():
+    aware = [datetime(2026, 1, 1, 12, tzinfo=timezone(timedelta(hours=2))),
+             datetime(2026, 1, 2, tzinfo=timezone.utc)]
+    naive = [datetime(2026, 1, 1, 10), datetime(2026, 1, 2)]
+    
+    np.testing.assert_array_equal(PriceDropDetector.to_seconds(aware), PriceDropDetector.to_seconds(naive))
+    np.testing.assert_array_equal(PriceDropDetector.to_seconds(aware), [t.timestamp() for t in aware])
@@ -0,0 +1,202 @@
+"""
+Tests for PriceHistory: segments, replay and compaction.
+"""
+
+import json
+import random
+import threading
+from datetime import datetime, timedelta
+
+from main import PriceComparisonApp
+from price_history import PriceHistory
+
+
+STORES = ['Amazon', 'Walmart', 'Best Buy', 'Target', 'eBay']
+
+
+def random_snapshots(seed, days=3, per_day=8, products=12):
+    """Timestamped snapshots where prices change, disappear and come back."""
+    rng = random.Random(seed)
+    prices = {}
+    start = datetime(2026, 1, 1, 6)
+    snapshots = []
+    for day in range(days):
+        for hour in range(per_day):
+            for _ in range(rng.randint(0, 10)):
+                product_name = f"Product {rng.randrange(products)}"
+                store = rng.choice(STORES)
+                if rng.random() < 0.3:
+                    prices.get(product_name, {}).pop(store, None)
+                else:
+                    prices.setdefault(product_name, {})[store] = round(rng.uniform(5, 50), 2)
+            prices = {product_name: store_prices for product_name, store_prices in prices.items() if store_prices}
+            stamp = start + timedelta(days=day, hours=hour)
+            snapshots.append((stamp.isoformat(), {product_name: dict(store_prices)
+                                                  for product_name, store_prices in prices.items()}))
+    return snapshots
+
+
+def test_compacted_days_replay_as_their_last_snapshot(tmp_path):
+    for seed in range(5):
+        history = PriceHistory(tmp_path / str(seed), keyframe_every=3, keyframe_chunk=4, raw_days=1)
+        for stamp, prices in random_snapshots(seed):
+            history.append(prices, stamp)
+        before = list(history.snapshots())
+        
+        assert history.compact(now='2026-02-01T00:00:00') == {'downsampled': 3, 'deleted': 0}
+        
+        last_of_day = {}
+        for stamp, prices in before:
+            last_of_day[stamp[:10]] = (stamp, prices)
+        assert list(history.snapshots()) == sorted(last_of_day.values())
+
+
+def kinds(history, day):
+    """Block kinds in a day's index, in append order."""
+    return [entry[3] for entry in history._entries(history._index(day))]
+
+
+def test_snapshots_round_trip_through_reopen(tmp_path):
+    snapshots = random_snapshots(1, days=2)
+    history = PriceHistory(tmp_path, keyframe_every=3, keyframe_chunk=4)
+    for stamp, prices in snapshots[:10]:
+        history.append(prices, stamp)
+    
+    # A new instance picks up the day's replay state and keeps writing deltas
+    reopened = PriceHistory(tmp_path, keyframe_every=3, keyframe_chunk=4)
+    for stamp, prices in snapshots[10:]:
+        reopened.append(prices, stamp)
+    
+    expected = [(stamp, prices) for stamp, prices in snapshots if prices]
+    assert list(PriceHistory(tmp_path).snapshots()) == expected
+    assert reopened.days() == ['2026-01-01', '2026-01-02']
+
+
+def test_days_replay_from_keyframes_and_deltas(tmp_path):
+    history = PriceHistory(tmp_path, keyframe_every=3, keyframe_chunk=2)
+    prices = {'Laptop': {'Amazon': 900.0, 'Walmart': 950.0}, 'Mouse': {'Amazon': 20.0},
+              'Monitor': {'eBay': 300.0}}
+    steps = [
+        dict(prices),
+        {**prices, 'Laptop': {'Amazon': 880.0, 'Walmart': 950.0}},
+        {'Laptop': {'Amazon': 880.0}, 'Monitor': {'eBay': 300.0}},
+        {'Laptop': {'Amazon': 870.0}, 'Monitor': {'eBay': 310.0}, 'Cable': {'Target': 5.0}},
+        {'Laptop': {'Amazon': 870.0}, 'Cable': {'Target': 5.0}},
+    ]
+    for hour, snapshot in enumerate(steps):
+        history.append(snapshot, f"2026-01-01T{hour:02d}:00:00")
+    
+    # Two keyframe chunks, two deltas, then a keyframe and a delta
+    assert kinds(history, '2026-01-01') == ['k', 'k', 'd', 'd', 'k', 'k', 'd']
+    assert [prices for _, prices in history.snapshots()] == steps
+    assert history.product_history('Laptop') == [
+        ('2026-01-01T00:00:00', 'Amazon', 900.0), ('2026-01-01T00:00:00', 'Walmart', 950.0),
+        ('2026-01-01T01:00:00', 'Amazon', 880.0), ('2026-01-01T01:00:00', 'Walmart', 950.0),
+        ('2026-01-01T02:00:00', 'Amazon', 880.0),
+        ('2026-01-01T03:00:00', 'Amazon', 870.0),
+        ('2026-01-01T04:00:00', 'Amazon', 870.0),
+    ]
+
+
+def test_torn_last_index_line_is_skipped_and_terminated(tmp_path):
+    history = PriceHistory(tmp_path)
+    history.append({'Laptop': {'Amazon': 900.0}}, '2026-01-01T00:00:00')
+    # An append interrupted while writing its index line
+    with open(tmp_path / '2026-01-01.idx', 'ab') as f:
+        f.write(b'2026-01-01T01:00:00\t999\t4')
+    
+    reopened = PriceHistory(tmp_path)
+    assert list(reopened.snapshots()) == [('2026-01-01T00:00:00', {'Laptop': {'Amazon': 900.0}})]
+    
+    reopened.append({'Laptop': {'Amazon': 880.0}}, '2026-01-01T02:00:00')
+    assert list(PriceHistory(tmp_path).snapshots()) == [
+        ('2026-01-01T00:00:00', {'Laptop': {'Amazon': 900.0}}),
+        ('2026-01-01T02:00:00', {'Laptop': {'Amazon': 880.0}}),
+    ]
+    # A line missing its closing tab is torn even if a newline follows it
+    with open(tmp_path / '2026-01-01.idx', 'ab') as f:
+        f.write(b'2026-01-01T03:00:00\t9999\t4\tk\t""\n')
+    assert len(list(PriceHistory(tmp_path).snapshots())) == 2
+
+
+def test_product_history_filters_by_product_and_time(tmp_path):
+    history = PriceHistory(tmp_path, keyframe_chunk=1)
+    for day in (1, 2, 3):
+        history.append({'Laptop': {'Amazon': 900.0 - day}, 'Mouse': {'Walmart': 20.0 + day}},
+                       f"2026-01-0{day}T12:00:00")
+    
+    assert history.product_history('Mouse') == [
+        ('2026-01-01T12:00:00', 'Walmart', 21.0),
+        ('2026-01-02T12:00:00', 'Walmart', 22.0),
+        ('2026-01-03T12:00:00', 'Walmart', 23.0),
+    ]
+    assert history.product_history('Laptop', since='2026-01-02T00:00:00',
+                                   until='2026-01-02T23:59:59') == [('2026-01-02T12:00:00', 'Amazon', 898.0)]
+    # The bounds are timestamps, not just days
+    assert history.product_history('Laptop', since='2026-01-03T12:00:01') == []
+    assert history.product_history('Keyboard') == []
+
+
+def test_retention_downsamples_then_deletes_old_days(tmp_path):
+    history = PriceHistory(tmp_path, raw_days=2, daily_days=5)
+    for day in range(1, 9):
+        for hour in (9, 18):
+            history.append({'Laptop': {'Amazon': 900.0 + day + hour}}, f"2026-01-{day:02d}T{hour:02d}:00:00")
+    
+    result = history.compact(now='2026-01-09T00:00:00')
+    
+    # Days 1-3 are older than five days, days 4-6 older than two
+    assert result == {'downsampled': 3, 'deleted': 3}
+    assert history.days() == [f"2026-01-{day:02d}" for day in range(4, 9)]
+    assert sorted(path.name for path in tmp_path.iterdir() if path.name < '2026-01-07') == [
+        '2026-01-04.daily', '2026-01-05.daily', '2026-01-06.daily'
+    ]
+    assert history.product_history('Laptop', until='2026-01-06T23:59:59') == [
+        (f"2026-01-{day:02d}T18:00:00", 'Amazon', 918.0 + day) for day in (4, 5, 6)
+    ]
+    assert history.compact(now='2026-01-09T00:00:00') == {'downsampled': 0, 'deleted': 0}
+
+
+def test_daily_bars_survive_compaction(tmp_path):
+    history = PriceHistory(tmp_path, keyframe_every=2, raw_days=1)
+    for hour, price in enumerate([900.0, 880.0, 940.0, 910.0]):
+        history.append({'Laptop': {'Amazon': price, 'Walmart': 950.0}, 'Mouse': {'Amazon': 20.0}},
+                       f"2026-01-01T{hour:02d}:00:00")
+    history.append({'Laptop': {'Amazon': 930.0}}, '2026-01-02T00:00:00')
+    
+    expected = [
+        ('2026-01-01', 'Amazon', 880.0, 940.0, 910.0),
+        ('2026-01-01', 'Walmart', 950.0, 950.0, 950.0),
+        ('2026-01-02', 'Amazon', 930.0, 930.0, 930.0),
+    ]
+    assert sorted(history.daily_bars('Laptop')) == expected
+    history.compact(now='2026-02-01T00:00:00')
+    assert sorted(history.daily_bars('Laptop')) == expected
+    assert history.daily_bars('Laptop', since='2026-01-02') == [expected[2]]
+    assert history.daily_bars('Mouse') == [('2026-01-01', 'Amazon', 20.0, 20.0, 20.0)]
+
+
+def test_background_compaction_runs_until_stopped(tmp_path):
+    history = PriceHistory(tmp_path, raw_days=1)
+    history.append({'Laptop': {'Amazon': 900.0}}, '2020-01-01T12:00:00')
+    
+    thread = history.start_compaction(interval=60)
+    assert history.start_compaction(interval=60) is thread
+    history.stop_compaction()
+    
+    # The first pass runs as the thread starts, and stopping waits for it
+    assert not thread.is_alive()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['2020-01-01.daily']
+    assert list(history.snapshots()) == [('2020-01-01T12:00:00', {'Laptop': {'Amazon': 900.0}})]
+
+
+def test_app_run_stops_compaction_when_nothing_is_scraped(tmp_path):
+    products = tmp_path / 'products.json'
+    products.write_text(json.dumps([{'name': 'Gadget', 'stores': ['Amazon']}]))
+    app = PriceComparisonApp(str(tmp_path / 'data'))
+    
+    app.run(str(products))
+    
+    # No mock base price matches 'Gadget', so the run returns early
+    assert app.history._compactor is None
+    assert not any(thread.name == 'price-history-compaction' for thread in threading.enumerate())
@@ -0,0 +1,56 @@
+"""
+Tests for PriceIndex over dict and vectorized comparison results.
+"""
+
+import numpy as np
+
+from comparison_engine import ComparisonEngine
+from price_index import PriceIndex
+from price_snapshot import PriceSnapshot
+
+
+PRICES = {
+    'Laptop': {'Amazon': 899.99, 'Walmart': 949.99},
+    'Mouse': {'Amazon': 19.99, 'Target': 24.99},
+    'Cable': {'eBay': 9.99, 'Walmart': 9.99},
+}
+
+
+def test_float32_keys_are_whole_cents():
+    engine = ComparisonEngine()
+    results = engine.compare(PriceSnapshot.from_dict(PRICES, dtype=np.float32))
+    index = engine.build_index(results)
+    
+    # Bounds at exact cents must include the float32 prices stored there
+    assert list(index.in_price_range(19.99, 19.99)) == ['Mouse']
+    exact = engine.build_index(engine.compare(PRICES))
+    assert list(index.in_price_range(9.99, 899.99)) == list(exact.in_price_range(9.99, 899.99))
+
+
+def test_memoized_results_keep_their_index(tmp_path):
+    path = tmp_path / 'prices.snap'
+    PriceSnapshot.from_dict(PRICES).save_binary(path)
+    engine = ComparisonEngine()
+    
+    first = engine.build_index(engine.compare_file(path))
+    again = engine.build_index(engine.compare_file(path))
+    
+    assert again is first
+    assert list(engine.top_deals(engine.compare_file(path), 1, again)) == ['Laptop']
+
+
+def test_updates_among_tied_keys_keep_name_order():
+    results = ComparisonEngine().compare({f"Product {i}": {'Amazon': 5.0, 'Walmart': 7.0} for i in range(50)})
+    # Built from results in reverse name order
+    index = PriceIndex.build(dict(reversed(list(results.items()))))
+    names = sorted(results)
+    assert index.cheapest(50) == names and index.top_savings(50) == names
+    
+    index.update('Product 17', None)
+    index.update('Product 3', {'best_deal': {'price': 5.0}, 'statistics': {'price_range': 2.0}})
+    index.update('Product 40', {'best_deal': {'price': 4.0}, 'statistics': {'price_range': 3.0}})
+    
+    rest = [name for name in names if name not in ('Product 17', 'Product 40')]
+    assert index.cheapest(50) == ['Product 40'] + rest
+    assert index.top_savings(50) == ['Product 40'] + rest
+    assert 'Product 17' not in index and len(index) == 49
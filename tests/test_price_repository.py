@@ -0,0 +1,39 @@
+"""
+Tests for PriceRepository writes.
+"""
+
+from main import PriceComparisonApp
+from price_repository import PriceRepository
+
+
+def test_upsert_keeps_rows_missing_from_the_update(tmp_path):
+    repository = PriceRepository(tmp_path / 'prices.db')
+    repository.upsert_prices({'Laptop': {'Amazon': 900.0, 'Walmart': 950.0}}, '2024-01-01T00:00:00')
+    repository.upsert_prices({'Laptop': {'Amazon': 880.0}}, '2024-01-02T00:00:00')
+    
+    assert repository.product_prices('Laptop') == {'Amazon': 880.0, 'Walmart': 950.0}
+
+
+def test_replace_deletes_rows_missing_from_the_snapshot(tmp_path):
+    repository = PriceRepository(tmp_path / 'prices.db', batch_size=2)
+    repository.upsert_prices({
+        'Laptop': {'Amazon': 900.0, 'Walmart': 950.0},
+        'Mouse': {'Amazon': 20.0},
+    }, '2024-01-01T00:00:00')
+    count = repository.upsert_prices({
+        'Laptop': {'Amazon': 880.0, 'Walmart': None},
+        'Keyboard': {'Target': 45.0},
+    }, '2024-01-02T00:00:00', replace=True)
+    
+    assert count == 2
+    assert repository.get_prices() == {'Laptop': {'Amazon': 880.0}, 'Keyboard': {'Target': 45.0}}
+    assert repository.summary()['prices'] == 2
+    assert repository.last_updated() == '2024-01-02T00:00:00'
+
+
+def test_save_prices_replaces_the_database_contents(tmp_path):
+    app = PriceComparisonApp(str(tmp_path))
+    app.save_prices({'Laptop': {'Amazon': 900.0}, 'Mouse': {'Walmart': 20.0}})
+    app.save_prices({'Laptop': {'Amazon': 880.0}})
+    
+    assert app.repository.get_prices() == {'Laptop': {'Amazon': 880.0}}
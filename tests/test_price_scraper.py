@@ -0,0 +1,172 @@
+"""
+Tests for PriceScraper's async mode, rate limits and resilience.
+"""
+
+import asyncio
+import json
+import time
+
+from fake_store import FakeStoreServer
+from main import PriceComparisonApp
+from price_scraper import PriceScraper, RegexStoreAdapter, add_store
+from resilience import CircuitBreaker, RetryPolicy
+from synthetic_catalog import fluctuation, name_key
+
+
+STORES = ['Amazon', 'Walmart', 'Best Buy', 'Target', 'eBay']
+
+
+def mock_pairs(count):
+    """(product, store) pairs over products with a mock base price."""
+    kinds = ['Laptop', 'Monitor', 'Keyboard', 'Mouse', 'Headphones']
+    pairs = [(f"{kinds[i % len(kinds)]} {i}", store) for i in range(count // len(STORES) + 1) for store in STORES]
+    return pairs[:count]
+
+
+def test_async_mock_stores_skip_rate_limits():
+    scraper = PriceScraper(seed=7)
+    pairs = mock_pairs(248)
+    
+    start = time.perf_counter()
+    prices = asyncio.run(scraper.get_prices_async(pairs, concurrency=50))
+    elapsed = time.perf_counter() - start
+    
+    expected = {}
+    for product_name, store in pairs:
+        expected.setdefault(product_name, {})[store] = scraper.get_price(product_name, store)
+    assert prices == expected
+    # Paced by the shipped limits, this would take about 25 s
+    assert elapsed < 2.0
+
+
+def test_seeded_mock_prices_use_the_catalog_fluctuation():
+    scraper = PriceScraper(seed=7, epoch=3)
+    
+    for product_name, store in mock_pairs(20):
+        expected = float(fluctuation(7, 3, name_key(store, product_name)))
+        assert scraper._fluctuation(product_name, store) == expected
+        assert 0.9 <= expected < 1.1
+    # Another epoch moves the price
+    assert PriceScraper(seed=7, epoch=4).get_price('Laptop 0', 'Amazon') != scraper.get_price('Laptop 0', 'Amazon')
+
+
+def test_async_live_stores_are_rate_limited():
+    with FakeStoreServer() as server:
+        scraper = PriceScraper()
+        add_store(scraper, 'Paced', delay=0.05, burst=1, max_concurrency=4,
+                  adapter=RegexStoreAdapter(server.url_template('Paced')))
+        pairs = [(f"Product {i}", 'Paced') for i in range(6)]
+        
+        start = time.perf_counter()
+        prices = asyncio.run(scraper.get_prices_async(pairs, concurrency=8))
+        elapsed = time.perf_counter() - start
+        scraper.close()
+    
+    assert len(prices) == 6
+    # One token up front, then one every 50 ms
+    assert elapsed >= 0.24
+
+
+def count_tokens(scraper, store):
+    """Record each token taken from a store's bucket; returns the list of records."""
+    bucket = scraper.rate_limiter.bucket(store)
+    taken = []
+    reserve = bucket.reserve
+    bucket.reserve = lambda: taken.append(1) or reserve()
+    return taken
+
+
+def test_every_live_fetch_takes_one_token():
+    with FakeStoreServer() as server:
+        scraper = PriceScraper()
+        add_store(scraper, 'Paced', delay=0.05, burst=1, max_concurrency=4,
+                  adapter=RegexStoreAdapter(server.url_template('Paced')))
+        taken = count_tokens(scraper, 'Paced')
+        pairs = [(f"Product {i}", 'Paced') for i in range(6)]
+        
+        start = time.perf_counter()
+        prices = [scraper.get_price(product_name, store) for product_name, store in pairs]
+        elapsed = time.perf_counter() - start
+        assert len(taken) == 6
+        # The async workers take their tokens themselves, not again per fetch
+        asyncio.run(scraper.get_prices_async(pairs, concurrency=8))
+        assert len(taken) == 12
+        scraper.close()
+    
+    assert prices == [server.price(product_name) for product_name, _ in pairs]
+    # Sequential calls are paced like async ones: one token up front, then one every 50 ms
+    assert elapsed >= 0.24
+
+
+def test_sequential_app_scrapes_are_rate_limited(tmp_path):
+    with FakeStoreServer() as server:
+        app = PriceComparisonApp(str(tmp_path))
+        app.scraper = PriceScraper()
+        add_store(app.scraper, 'Paced', delay=0.05, burst=1,
+                  adapter=RegexStoreAdapter(server.url_template('Paced')))
+        taken = count_tokens(app.scraper, 'Paced')
+        products = [{'name': f"Product {i}", 'stores': ['Paced', 'Amazon']} for i in range(4)]
+        
+        app.scrape_prices(products)
+        list(app.iter_price_records(products))
+        app.scrape_prices_incremental(products)
+        app.scraper.close()
+    
+    # Only the live store's fetches take tokens; mock Amazon prices don't
+    assert len(taken) == 12
+
+
+def live_scraper(server, store, **kwargs):
+    """Scraper fetching ``store`` from ``server``, one attempt per call."""
+    scraper = PriceScraper(retry_policy=RetryPolicy(max_attempts=1), **kwargs)
+    add_store(scraper, store, delay=0, adapter=RegexStoreAdapter(server.url_template(store)))
+    return scraper
+
+
+def test_half_open_trial_settles_on_non_retryable_error():
+    with FakeStoreServer() as server:
+        scraper = live_scraper(server, 'Flaky', breaker_threshold=1, breaker_cooldown=0.05)
+        server.down('Flaky', 503)
+        assert scraper.get_price('Laptop', 'Flaky') is None
+        assert scraper.breaker('Flaky').state == CircuitBreaker.OPEN
+        
+        # The trial call gets a 404: the store answered, so the circuit closes
+        time.sleep(0.06)
+        server.down('Flaky', 404)
+        assert scraper.get_price('Laptop', 'Flaky') is None
+        assert scraper.breaker('Flaky').state == CircuitBreaker.CLOSED
+        
+        server.down('Flaky', None)
+        assert scraper.get_price('Laptop', 'Flaky') == server.price('Laptop')
+        scraper.close()
+
+
+def test_stale_prices_reach_saved_outputs(tmp_path):
+    with FakeStoreServer() as server:
+        app = PriceComparisonApp(str(tmp_path))
+        app.scraper = live_scraper(server, 'Flaky', breaker_threshold=1)
+        products = [{'name': 'Laptop', 'stores': ['Flaky', 'Amazon']}]
+        
+        first = app.scrape_prices(products)
+        app.save_prices(first, app.stale_pairs(first))
+        server.down('Flaky', 503)
+        prices = app.scrape_prices(products)
+        stale = app.stale_pairs(prices)
+        app.save_prices(prices, stale)
+        app.scraper.close()
+    
+    assert prices['Laptop']['Flaky'] == first['Laptop']['Flaky']
+    assert stale == {('Laptop', 'Flaky')}
+    with open(app.prices_file) as f:
+        assert json.load(f)['stale'] == [['Laptop', 'Flaky']]
+    # The outage is a gap in the history, not a repeat of the old price
+    stamps = {}
+    for stamp, store, _ in app.history.product_history('Laptop'):
+        stamps.setdefault(store, []).append(stamp)
+    assert len(stamps['Amazon']) == 2 and len(stamps['Flaky']) == 1
+    # The repository keeps the time the price was last actually scraped
+    rows = dict(app.repository._query("SELECT store, updated_at FROM prices WHERE product = 'Laptop'"))
+    assert rows['Flaky'] < rows['Amazon']
+    report = app.generate_report(app.compare_prices(prices), stale)
+    assert f"Flaky: ${prices['Laptop']['Flaky']:.2f} (stale)" in report
+    assert "Stale Prices: 1" in report
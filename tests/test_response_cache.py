@@ -0,0 +1,107 @@
+"""
+Tests for ResponseCache and conditional store requests, against the local
+stand-in server's ETag/Last-Modified validators.
+"""
+
+import pytest
+
+from fake_store import FakeStoreServer
+from price_scraper import PriceScraper, RegexStoreAdapter, add_store
+from response_cache import ResponseCache
+
+
+def cached_scraper(server, cache):
+    """Scraper fetching 'Live' from ``server`` through ``cache``."""
+    scraper = PriceScraper(cache=cache)
+    add_store(scraper, 'Live', delay=0, adapter=RegexStoreAdapter(server.url_template('Live')))
+    return scraper
+
+
+@pytest.mark.parametrize('etag, last_modified', [(True, False), (False, True), (True, True)])
+def test_second_fetch_is_revalidated_and_served_from_the_cache(etag, last_modified):
+    with FakeStoreServer(etag=etag, last_modified=last_modified) as server:
+        cache = ResponseCache()
+        scraper = cached_scraper(server, cache)
+        
+        first = scraper.get_price('Laptop', 'Live')
+        second = scraper.get_price('Laptop', 'Live')
+        scraper.close()
+    
+    assert first == second == server.price('Laptop')
+    assert server.requests == 2 and server.not_modified == 1
+    entry = cache.lookup('Laptop', 'Live')
+    stats = cache.stats()
+    assert stats['misses'] == 1 and stats['hits'] == 2 and stats['not_modified'] == 1
+    assert stats['bytes_saved'] == entry['size'] and stats['bytes_downloaded'] == entry['size']
+    assert bool(entry['etag']) == etag and bool(entry['last_modified']) == last_modified
+
+
+@pytest.mark.parametrize('etag', [True, False])
+def test_changed_page_is_downloaded_again(etag):
+    with FakeStoreServer(etag=etag) as server:
+        cache = ResponseCache()
+        scraper = cached_scraper(server, cache)
+        scraper.get_price('Laptop', 'Live')
+        
+        server.set_price('Laptop', 123.45)
+        changed = scraper.get_price('Laptop', 'Live')
+        again = scraper.get_price('Laptop', 'Live')
+        scraper.close()
+    
+    assert changed == again == 123.45
+    assert server.not_modified == 1
+    assert cache.lookup('Laptop', 'Live')['price'] == 123.45
+
+
+def test_server_without_validators_is_not_cached():
+    with FakeStoreServer(etag=False, last_modified=False) as server:
+        cache = ResponseCache()
+        scraper = cached_scraper(server, cache)
+        scraper.get_price('Laptop', 'Live')
+        scraper.get_price('Laptop', 'Live')
+        scraper.close()
+    
+    assert server.not_modified == 0
+    assert cache.stats()['entries'] == 0 and cache.stats()['misses'] == 2
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.store('Laptop', 'Amazon', '"a"', None, 900.0, 100)
+    cache.store('Mouse', 'Amazon', '"b"', None, 20.0, 100)
+    cache.lookup('Laptop', 'Amazon')
+    cache.store('Monitor', 'Amazon', '"c"', None, 300.0, 100)
+    
+    assert cache.lookup('Mouse', 'Amazon') is None
+    assert cache.lookup('Laptop', 'Amazon')['price'] == 900.0
+    assert cache.stats()['evictions'] == 1 and cache.stats()['entries'] == 2
+
+
+def test_cache_persists_between_runs(tmp_path):
+    path = tmp_path / 'http_cache.json'
+    with FakeStoreServer() as server:
+        scraper = cached_scraper(server, ResponseCache(path))
+        price = scraper.get_price('Laptop', 'Live')
+        # close() saves the cache
+        scraper.close()
+        
+        cache = ResponseCache(path)
+        scraper = cached_scraper(server, cache)
+        assert scraper.get_price('Laptop', 'Live') == price
+        scraper.close()
+    
+    # The next run's first request was already conditional
+    assert server.not_modified == 1
+    assert cache.stats()['not_modified'] == 1
+
+
+def test_unreadable_cache_file_is_ignored(tmp_path):
+    path = tmp_path / 'http_cache.json'
+    path.write_text('{"truncated')
+    
+    cache = ResponseCache(path)
+    
+    assert cache.stats()['entries'] == 0
+    cache.store('Laptop', 'Amazon', '"a"', None, 900.0, 100)
+    cache.save()
+    assert ResponseCache(path).lookup('Laptop', 'Amazon')['etag'] == '"a"'
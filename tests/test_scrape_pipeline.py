@@ -0,0 +1,81 @@
+"""
+Tests for ScrapePipeline's fetch and parse stages.
+"""
+
+from multiprocessing import shared_memory
+
+import pytest
+
+import price_scraper
+from fake_store import FakeStoreServer
+from price_scraper import PriceScraper, RegexStoreAdapter, ScrapePipeline, add_store
+
+
+def test_mock_only_run_never_starts_parsers(monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("process pool started with no pages to parse")
+    
+    monkeypatch.setattr(price_scraper, 'ProcessPoolExecutor', no_pool)
+    scraper = PriceScraper(seed=3)
+    pairs = [(f"Laptop {i}", store) for i in range(10) for store in ('Amazon', 'Walmart')]
+    
+    prices = ScrapePipeline(scraper).run(pairs)
+    
+    assert prices == {
+        product_name: {store: scraper.get_price(product_name, store) for store in ('Amazon', 'Walmart')}
+        for product_name, _ in pairs
+    }
+
+
+def test_live_pages_are_parsed_in_the_fetch_threads_by_default(monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("process pool started without parse_workers")
+    
+    monkeypatch.setattr(price_scraper, 'ProcessPoolExecutor', no_pool)
+    with FakeStoreServer() as server:
+        scraper = PriceScraper()
+        add_store(scraper, 'Live', delay=0, adapter=RegexStoreAdapter(server.url_template('Live')))
+        pairs = [(f"Product {i}", 'Live') for i in range(6)]
+        
+        prices = ScrapePipeline(scraper, fetch_workers=3).run(pairs)
+        scraper.close()
+    
+    assert prices == {product_name: {'Live': server.price(product_name)} for product_name, _ in pairs}
+
+
+def test_pool_parses_pages_from_shared_memory_batches(monkeypatch):
+    shared = []
+    
+    def share_pages(pages):
+        block, spans = share(pages)
+        shared.append((block.name, len(pages)))
+        return block, spans
+    
+    share = price_scraper._share_pages
+    monkeypatch.setattr(price_scraper, '_share_pages', share_pages)
+    with FakeStoreServer(page_size=50_000) as server:
+        scraper = PriceScraper()
+        add_store(scraper, 'Live', delay=0, adapter=RegexStoreAdapter(server.url_template('Live')))
+        pairs = [(f"Product {i}", 'Live') for i in range(10)]
+        
+        prices = ScrapePipeline(scraper, fetch_workers=4, parse_workers=2, batch_bytes=120_000).run(pairs)
+        scraper.close()
+    
+    assert prices == {product_name: {'Live': server.price(product_name)} for product_name, _ in pairs}
+    # Three pages per block, then what is left; every block is freed after the run
+    assert [count for _, count in shared] == [3, 3, 3, 1]
+    for name, _ in shared:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+
+def test_live_pages_are_parsed_in_the_pool():
+    with FakeStoreServer(page_size=200_000) as server:
+        scraper = PriceScraper()
+        add_store(scraper, 'Live', delay=0, adapter=RegexStoreAdapter(server.url_template('Live')))
+        pairs = [(f"Product {i}", 'Live') for i in range(12)]
+        
+        prices = ScrapePipeline(scraper, fetch_workers=4, parse_workers=2).run(pairs)
+        scraper.close()
+    
+    assert prices == {product_name: {'Live': server.price(product_name)} for product_name, _ in pairs}
@@ -0,0 +1,135 @@
+"""
+Tests for streamed comparisons and reports: compare_stream, write_stream
+and PriceComparisonApp.run_stream.
+"""
+
+import io
+import random
+
+from comparison_engine import ComparisonEngine
+from main import PriceComparisonApp
+from price_scraper import PriceScraper
+from report_generator import ReportGenerator
+
+
+STORES = ['Amazon', 'Walmart', 'Best Buy', 'Target', 'eBay']
+
+
+def random_prices(seed, products=30):
+    """Prices at one to five stores per product, keyed in name order."""
+    rng = random.Random(seed)
+    return {
+        f"Product {i:02d}": {store: round(rng.uniform(5, 500), 2)
+                             for store in rng.sample(STORES, rng.randint(1, len(STORES)))}
+        for i in range(products)
+    }
+
+
+def grouped_records(prices):
+    """Records grouped by product, each starting with a failed scrape (None)."""
+    for product_name, store_prices in prices.items():
+        yield product_name, 'Failed', None
+        for store, price in store_prices.items():
+            yield product_name, store, price
+
+
+def report_parts(report):
+    """Split a text report into its product sections and summary lines, dropping the layout."""
+    lines = report.splitlines()
+    start = lines.index("DETAILED COMPARISONS") + 2
+    end = start
+    while lines[end] not in ("SUMMARY", "=" * 70):
+        end += 1
+    sections = "\n".join(lines[start:end]).strip()
+    summary = [line for line in lines if line.startswith(("Total ", "Stale Prices"))]
+    return sections, summary
+
+
+def test_grouped_stream_matches_compare():
+    prices = random_prices(1)
+    engine = ComparisonEngine()
+    
+    for dispersion in (False, True):
+        streamed = list(engine.compare_stream(grouped_records(prices), dispersion=dispersion))
+        assert [product_name for product_name, _ in streamed] == list(prices)
+        assert dict(streamed) == engine.compare(prices, dispersion=dispersion)
+
+
+def test_interleaved_stream_with_expected_stores_matches_compare():
+    prices = random_prices(2)
+    records = list(grouped_records(prices))
+    random.Random(2).shuffle(records)
+    counts = {product_name: len(store_prices) + 1 for product_name, store_prices in prices.items()}
+    
+    streamed = list(ComparisonEngine().compare_stream(records, expected_stores=counts))
+    
+    assert len(streamed) == len(prices)
+    assert dict(streamed) == ComparisonEngine().compare(prices)
+
+
+def test_interleaved_stream_without_expected_stores_yields_partial_results():
+    engine = ComparisonEngine()
+    records = [
+        ('Laptop', 'Amazon', 900.0),
+        ('Mouse', 'Amazon', 20.0),
+        ('Laptop', 'Walmart', 880.0),
+        ('Laptop', 'eBay', 870.0),
+    ]
+    
+    streamed = list(engine.compare_stream(records))
+    
+    # Each run of Laptop records is compared on its own
+    assert streamed == [
+        ('Laptop', engine._compare_product({'Amazon': 900.0})),
+        ('Mouse', engine._compare_product({'Amazon': 20.0})),
+        ('Laptop', engine._compare_product({'Walmart': 880.0, 'eBay': 870.0})),
+    ]
+
+
+def test_streamed_report_matches_generate():
+    prices = random_prices(3)
+    engine = ComparisonEngine()
+    reporter = ReportGenerator()
+    stale = {('Product 03', store) for store in prices['Product 03']} | {('Product 07', 'Nowhere')}
+    
+    out = io.StringIO()
+    count = reporter.write_stream(engine.compare_stream(grouped_records(prices), dispersion=True), out, stale)
+    # generate() is given the stale pairs that have a price, as run() does
+    priced = {(product_name, store) for product_name, store in stale if store in prices[product_name]}
+    expected = reporter.generate(engine.compare(prices, dispersion=True), priced)
+    
+    assert count == len(prices)
+    assert report_parts(out.getvalue()) == report_parts(expected)
+    assert "(stale)" in out.getvalue()
+
+
+def test_run_stream_writes_the_report_of_a_full_run(tmp_path):
+    # generate() sorts products by name; the stream keeps their order
+    names = ['4K Monitor', 'Gadget', 'Gaming Mouse', 'Laptop Pro']
+    products = [{'name': name, 'stores': STORES} for name in names]
+    app = PriceComparisonApp(str(tmp_path))
+    app.scraper = PriceScraper(seed=5)
+    
+    app.run_stream(products)
+    
+    with open(tmp_path / 'price_report.txt') as f:
+        streamed = f.read()
+    app.scraper = PriceScraper(seed=5)
+    prices = app.scrape_prices(products)
+    expected = app.generate_report(app.compare_prices(prices))
+    # 'Gadget' has no mock base price, so it is left out of both
+    assert 'GADGET' not in streamed
+    assert report_parts(streamed) == report_parts(expected)
+
+
+def test_app_opens_its_stores_only_when_needed(tmp_path):
+    app = PriceComparisonApp(str(tmp_path))
+    assert list(tmp_path.iterdir()) == []
+    app.scraper = PriceScraper(seed=5)
+    
+    app.run_stream([{'name': 'Laptop Pro', 'stores': STORES}])
+    
+    # Streaming needs no repository, history, tracker or user database
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['price_report.txt']
+    assert app.repository is app.repository
+    assert (tmp_path / 'prices.db').exists()